@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Headless stand-in for the Revit API so pyTal buttons can run (and be timed) without Revit.
+
+install() registers fake clr / System / Autodesk.Revit / pyrevit modules in
+sys.modules; run_button() then executes a pushbutton script.py against a
+synthetic document exactly the way pyRevit would.
+Author: Arbel Tal"""
+
+import io
+import os
+import runpy
+import sys
+import types
+from contextlib import redirect_stdout
+
+from . import db, ui, system, pyrevit as fake_pyrevit
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+LIB_DIR = os.path.join(REPO_DIR, "lib")
+HOOKS_DIR = os.path.join(REPO_DIR, "hooks")
+
+CALLS = db.CALLS
+
+
+def _module(name, source=None, **attrs):
+    module = types.ModuleType(name)
+    if source is not None:
+        module.__dict__.update((k, v) for k, v in vars(source).items() if not k.startswith("__"))
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install():
+    """Register the fake modules. Safe to call repeatedly."""
+    _module("clr", AddReference=system.AddReference)
+    generic = _module("System.Collections.Generic", List=system.List, HashSet=system.HashSet)
+    collections = _module("System.Collections", Generic=generic)
+    _module("System", system, Collections=collections)
+
+    db_module = _module("Autodesk.Revit.DB", db)
+    selection = _module("Autodesk.Revit.UI.Selection", ui)
+    ui_module = _module("Autodesk.Revit.UI", ui, Selection=selection)
+    exceptions = _module("Autodesk.Revit.Exceptions",
+                         InvalidOperationException=db.InvalidOperationException,
+                         ArgumentException=db.ArgumentException,
+                         OperationCanceledException=db.OperationCanceledException)
+    revit_ns = _module("Autodesk.Revit", DB=db_module, UI=ui_module, Exceptions=exceptions)
+    _module("Autodesk", Revit=revit_ns)
+
+    for name in ("revit", "script", "forms"):
+        sys.modules["pyrevit." + name] = getattr(fake_pyrevit, name)
+    _module("pyrevit", revit=fake_pyrevit.revit, DB=db_module, script=fake_pyrevit.script,
+            forms=fake_pyrevit.forms, EXEC_PARAMS=fake_pyrevit.EXEC_PARAMS)
+
+    if LIB_DIR not in sys.path:
+        sys.path.insert(0, LIB_DIR)
+
+
+def run_hook(name, event_args):
+    """Run an extension hook (e.g. 'doc-changed') the way pyRevit does, if the extension has one."""
+    hook_path = os.path.join(HOOKS_DIR, name + ".py")
+    if os.path.exists(hook_path):
+        runpy.run_path(hook_path, init_globals={"__eventargs__": event_args, "__eventsender__": None})
+
+
+def reset(doc, keep_data=False):
+    """Point the fakes at doc and clear every cross-run cache (counters, AppDomain, dialogs).
+
+    keep_data keeps what buttons stored with script.store_data, like a new Revit session would."""
+    CALLS.clear()
+    doc.on_changed = lambda args: run_hook("doc-changed", args)
+    system.AppDomain.CurrentDomain = system._AppDomainData()
+    fake_pyrevit.reset(keep_data)
+    uiapp = ui.UIApplication(doc)
+    fake_pyrevit.revit.doc = doc
+    fake_pyrevit.revit.uidoc = uiapp.ActiveUIDocument
+    return uiapp
+
+
+def run_button(script_path, uiapp, shiftclick=False):
+    """Execute a pushbutton script like pyRevit does. Returns whatever the script printed."""
+    init_globals = {"__revit__": uiapp, "__shiftclick__": shiftclick}
+    stdout = io.StringIO()
+    with redirect_stdout(stdout):
+        try:
+            runpy.run_path(script_path, init_globals=init_globals, run_name="__main__")
+        except SystemExit:
+            pass
+    return stdout.getvalue()
@@ -0,0 +1,1766 @@
+# -*- coding: utf-8 -*-
+"""Pure-Python stand-in for the Autodesk.Revit.DB surface used by pyTal buttons.
+
+Only the members the buttons touch are modelled. Every API entry point bumps
+a counter in CALLS so benchmarks can report how many API calls a button makes;
+collectors also count how many elements they had to scan.
+Author: Arbel Tal"""
+
+import math
+import os
+import uuid
+from collections import Counter
+from enum import IntEnum
+
+from .system import Guid
+
+CALLS = Counter()
+
+
+def _call(name, n=1):
+    CALLS[name] += n
+
+
+# ╔═╗╔╗╔╦ ╦╔╦╗╔═╗
+# ║╣ ║║║║ ║║║║╚═╗
+# ╚═╝╝╚╝╚═╝╩ ╩╚═╝ ENUMS
+#====================================================================================================
+
+class BuiltInCategory(IntEnum):
+    INVALID = -1
+    OST_Walls = -2000011
+    OST_Windows = -2000014
+    OST_Doors = -2000023
+    OST_Floors = -2000032
+    OST_Ceilings = -2000038
+    OST_Lines = -2000051
+    OST_Furniture = -2000080
+    OST_GenericModel = -2000151
+    OST_Rooms = -2000160
+    OST_Grids = -2000220
+    OST_Levels = -2000240
+    OST_Dimensions = -2000260
+    OST_Views = -2000279
+    OST_RvtLinks = -2001352
+    OST_ElectricalFixtures = -2001060
+    OST_LightingFixtures = -2001120
+    OST_DetailComponents = -2002000
+    OST_Sheets = -2003100
+    OST_Areas = -2003200
+    OST_ScopeBoxes = -2006000
+
+
+class BuiltInParameter(IntEnum):
+    INVALID = -1
+    ELEM_PARTITION_PARAM = -1002067
+    PHASE_CREATED = -1012101
+    PHASE_DEMOLISHED = -1012102
+    ELEM_TYPE_PARAM = -1002052
+    ALL_MODEL_TYPE_NAME = -1002002
+    ALL_MODEL_FAMILY_NAME = -1002003
+    DATUM_VOLUME_OF_INTEREST = -1007403
+    EDITED_BY = -1002068
+
+
+class BuiltInParameterGroup(IntEnum):
+    INVALID = -1
+    PG_IDENTITY_DATA = -5000100
+    PG_GEOMETRY = -5000101
+    PG_CONSTRAINTS = -5000102
+    PG_TEXT = -5000103
+    PG_GRAPHICS = -5000104
+    PG_DATA = -5000105
+    PG_IFC = -5000106
+    PG_MATERIALS = -5000107
+    PG_GENERAL = -5000108
+
+
+class CategoryType(IntEnum):
+    Invalid = 0
+    Model = 1
+    Annotation = 2
+    Internal = 3
+    AnalyticalModel = 4
+
+
+class StorageType(IntEnum):
+    None_ = 0
+    Integer = 1
+    Double = 2
+    String = 3
+    ElementId = 4
+
+
+class ViewType(IntEnum):
+    Undefined = 0
+    FloorPlan = 1
+    CeilingPlan = 2
+    Elevation = 3
+    ThreeD = 4
+    Schedule = 5
+    DrawingSheet = 6
+    DraftingView = 10
+    Legend = 11
+
+
+class WorksetKind(IntEnum):
+    OtherWorkset = 0
+    UserWorkset = 1
+
+
+class ShellLayerType(IntEnum):
+    Exterior = 0
+    Interior = 1
+
+
+class FamilyInstanceReferenceType(IntEnum):
+    CenterLeftRight = 0
+    CenterFrontBack = 1
+
+
+class DetachFromCentralOption(IntEnum):
+    DoNotDetach = 0
+    DetachAndPreserveWorksets = 1
+    ClearTransmittedSaveAsNewCentral = 2
+    DetachAndDiscardWorksets = 3
+
+
+class WorksetConfigurationOption(IntEnum):
+    OpenAllWorksets = 0
+    CloseAllWorksets = 1
+    OpenLastViewed = 2
+
+
+class ViewDuplicateOption(IntEnum):
+    Duplicate = 0
+    AsDependent = 1
+    WithDetailing = 2
+
+
+class DuplicateTypeAction(IntEnum):
+    Abort = 0
+    UseDestinationTypes = 1
+
+
+class TransactionStatus(IntEnum):
+    Uninitialized = 0
+    Started = 1
+    RolledBack = 2
+    Committed = 3
+
+
+class FailureSeverity(IntEnum):
+    NoSeverity = 0
+    Warning = 1
+    Error = 2
+    DocumentCorruption = 3
+
+
+class FailureProcessingResult(IntEnum):
+    Continue = 0
+    ProceedWithRollBack = 1
+    ProceedWithCommit = 2
+    WaitForUserInput = 3
+
+
+# ╦╔╦╗╔═╗
+# ║ ║║╚═╗
+# ╩═╩╝╚═╝ IDS
+#====================================================================================================
+
+class ElementId(object):
+    __slots__ = ("Value",)
+
+    def __init__(self, value):
+        self.Value = int(value)
+
+    @property
+    def IntegerValue(self):
+        return self.Value
+
+    def __eq__(self, other):
+        return isinstance(other, ElementId) and other.Value == self.Value
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.Value)
+
+    def ToString(self):
+        return str(self.Value)
+
+    def __repr__(self):
+        return "ElementId({})".format(self.Value)
+
+
+ElementId.InvalidElementId = ElementId(-1)
+
+
+class WorksetId(object):
+    __slots__ = ("IntegerValue",)
+
+    def __init__(self, value):
+        self.IntegerValue = int(value)
+
+    def __eq__(self, other):
+        return isinstance(other, WorksetId) and other.IntegerValue == self.IntegerValue
+
+    def __hash__(self):
+        return hash(self.IntegerValue)
+
+
+# ╔═╗╔═╗╔═╗╔╦╗╔═╗╔╦╗╦═╗╦ ╦
+# ║ ╦║╣ ║ ║║║║║╣  ║ ╠╦╝╚╦╝
+# ╚═╝╚═╝╚═╝╩ ╩╚═╝ ╩ ╩╚═ ╩  GEOMETRY
+#====================================================================================================
+
+class XYZ(object):
+    __slots__ = ("X", "Y", "Z")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.X, self.Y, self.Z = float(x), float(y), float(z)
+
+    def __add__(self, o):
+        return XYZ(self.X + o.X, self.Y + o.Y, self.Z + o.Z)
+
+    def __sub__(self, o):
+        return XYZ(self.X - o.X, self.Y - o.Y, self.Z - o.Z)
+
+    def __mul__(self, k):
+        return XYZ(self.X * k, self.Y * k, self.Z * k)
+
+    def __neg__(self):
+        return XYZ(-self.X, -self.Y, -self.Z)
+
+    Add = __add__
+    Subtract = __sub__
+    Multiply = __mul__
+    Negate = __neg__
+
+    def DotProduct(self, o):
+        return self.X * o.X + self.Y * o.Y + self.Z * o.Z
+
+    def CrossProduct(self, o):
+        return XYZ(self.Y * o.Z - self.Z * o.Y, self.Z * o.X - self.X * o.Z, self.X * o.Y - self.Y * o.X)
+
+    def GetLength(self):
+        return math.sqrt(self.DotProduct(self))
+
+    def DistanceTo(self, o):
+        return (self - o).GetLength()
+
+    def IsZeroLength(self):
+        return self.GetLength() < 1e-9
+
+    def Normalize(self):
+        length = self.GetLength()
+        return XYZ(self.X / length, self.Y / length, self.Z / length) if length else XYZ()
+
+    def IsAlmostEqualTo(self, o, tolerance=1e-9):
+        return self.DistanceTo(o) <= tolerance
+
+    def __repr__(self):
+        return "XYZ({:.3f}, {:.3f}, {:.3f})".format(self.X, self.Y, self.Z)
+
+
+XYZ.Zero = XYZ(0, 0, 0)
+XYZ.BasisX = XYZ(1, 0, 0)
+XYZ.BasisY = XYZ(0, 1, 0)
+XYZ.BasisZ = XYZ(0, 0, 1)
+
+
+class IntersectionResult(object):
+    def __init__(self, point, distance, parameter=0.0):
+        self.XYZPoint = point
+        self.Distance = distance
+        self.Parameter = parameter
+
+
+class Curve(object):
+    pass
+
+
+class Line(Curve):
+    def __init__(self, p0, p1, bound=True):
+        self._p0, self._p1 = p0, p1
+        self.IsBound = bound
+
+    @staticmethod
+    def CreateBound(p0, p1):
+        _call("Line.CreateBound")
+        if p0.DistanceTo(p1) < 1e-6:
+            raise InvalidOperationException("Curve length is too small.")
+        return Line(p0, p1)
+
+    @staticmethod
+    def CreateUnbound(origin, direction):
+        return Line(origin, origin + direction, bound=False)
+
+    @property
+    def Origin(self):
+        return self._p0
+
+    @property
+    def Direction(self):
+        return (self._p1 - self._p0).Normalize()
+
+    @property
+    def Length(self):
+        return self._p0.DistanceTo(self._p1)
+
+    def GetEndPoint(self, i):
+        return self._p0 if i == 0 else self._p1
+
+    def Project(self, pt):
+        _call("Curve.Project")
+        d = self.Direction
+        t = (pt - self._p0).DotProduct(d)
+        if self.IsBound:
+            t = max(0.0, min(self.Length, t))
+        proj = self._p0 + d * t
+        return IntersectionResult(proj, proj.DistanceTo(pt), t)
+
+    def CreateReversed(self):
+        return Line(self._p1, self._p0, self.IsBound)
+
+    def Tessellate(self):
+        return [self._p0, self._p1]
+
+
+class CurveLoop(object):
+    def __init__(self):
+        self._curves = []
+
+    def Append(self, curve):
+        if self._curves and not self._curves[-1].GetEndPoint(1).IsAlmostEqualTo(curve.GetEndPoint(0), 1e-6):
+            raise ArgumentException("The curve is not contiguous with the loop.")
+        self._curves.append(curve)
+
+    def IsOpen(self):
+        return not self._curves or not self._curves[-1].GetEndPoint(1).IsAlmostEqualTo(
+            self._curves[0].GetEndPoint(0), 1e-6)
+
+    def __iter__(self):
+        return iter(self._curves)
+
+    def __len__(self):
+        return len(self._curves)
+
+
+class Transform(object):
+    """Translation-only transform, enough for link instances."""
+
+    def __init__(self, origin=None):
+        self.Origin = origin or XYZ()
+
+    @property
+    def Inverse(self):
+        return Transform(-self.Origin)
+
+    def OfPoint(self, pt):
+        return pt + self.Origin
+
+    def OfVector(self, v):
+        return v
+
+    @staticmethod
+    def CreateTranslation(v):
+        return Transform(v)
+
+
+Transform.Identity = Transform()
+
+
+class PlanarFace(object):
+    """A vertical wall side face, modelled by the wall's offset location line."""
+
+    def __init__(self, line, normal):
+        self._line = line
+        self.FaceNormal = normal
+        self.Origin = line.Origin
+
+    def Project(self, pt):
+        _call("Face.Project")
+        res = Line(self._line.Origin, self._line.GetEndPoint(1), bound=False).Project(XYZ(pt.X, pt.Y, self._line.Origin.Z))
+        return IntersectionResult(res.XYZPoint, res.Distance)
+
+
+class Options(object):
+    pass
+
+
+# ╔═╗╦═╗╔═╗╔═╗╦ ╦╦╔═╗╔═╗
+# ║ ╦╠╦╝╠═╣╠═╝╠═╣║║  ╚═╗
+# ╚═╝╩╚═╩ ╩╩  ╩ ╩╩╚═╝╚═╝ GRAPHICS
+#====================================================================================================
+
+class Color(object):
+    __slots__ = ("Red", "Green", "Blue")
+
+    def __init__(self, r, g, b):
+        self.Red, self.Green, self.Blue = r, g, b
+
+
+class OverrideGraphicSettings(object):
+    def __init__(self, other=None):
+        self.values = dict(other.values) if other is not None else {}
+
+    def _set(self, key, value):
+        self.values[key] = value
+        return self
+
+    def SetProjectionLineColor(self, color):
+        return self._set("projection_line_color", color)
+
+    def SetSurfaceForegroundPatternColor(self, color):
+        return self._set("surface_foreground_color", color)
+
+    def SetSurfaceForegroundPatternId(self, pattern_id):
+        return self._set("surface_foreground_pattern", pattern_id)
+
+    def SetHalftone(self, halftone):
+        return self._set("halftone", halftone)
+
+
+# ╔═╗╦  ╔═╗╔╦╗╔═╗╔╗╔╔╦╗╔═╗
+# ║╣ ║  ║╣ ║║║║╣ ║║║ ║ ╚═╗
+# ╚═╝╩═╝╚═╝╩ ╩╚═╝╝╚╝ ╩ ╚═╝ ELEMENTS
+#====================================================================================================
+
+# Named parameters with this prefix behave like shared parameters (GUID derived from the name)
+SHARED_PREFIX = "SN_"
+# Built-in parameters every element reports in Element.Parameters besides its named ones
+BUILT_IN_PARAMETER_COUNT = 60
+
+
+def shared_guid(name):
+    return Guid(uuid.uuid5(uuid.NAMESPACE_URL, "pytal/" + name))
+
+
+class Definition(object):
+    def __init__(self, name, built_in=None):
+        self.Name = name
+        self.BuiltInParameter = built_in if built_in is not None else BuiltInParameter.INVALID
+
+
+class Parameter(object):
+    """Parameter view over an element value slot."""
+
+    def __init__(self, element, name, storage, getter, setter=None, built_in=None):
+        self.Element = element
+        self.Definition = Definition(name, built_in)
+        self.IsShared = built_in is None and name.startswith(SHARED_PREFIX)
+        self.GUID = shared_guid(name) if self.IsShared else None
+        self.StorageType = storage
+        self._getter = getter
+        self._setter = setter
+        self.IsReadOnly = setter is None
+
+    @property
+    def HasValue(self):
+        return self._getter() is not None
+
+    def AsInteger(self):
+        _call("Parameter.AsInteger")
+        return int(self._getter() or 0)
+
+    def AsDouble(self):
+        _call("Parameter.AsDouble")
+        return float(self._getter() or 0.0)
+
+    def AsString(self):
+        _call("Parameter.AsString")
+        value = self._getter()
+        return value if self.StorageType == StorageType.String else None
+
+    def AsValueString(self):
+        _call("Parameter.AsValueString")
+        value = self._getter()
+        return None if value is None else str(value)
+
+    def AsElementId(self):
+        _call("Parameter.AsElementId")
+        value = self._getter()
+        return value if isinstance(value, ElementId) else ElementId.InvalidElementId
+
+    def Set(self, value):
+        _call("Parameter.Set")
+        if self._setter is None:
+            raise InvalidOperationException("Parameter is read-only.")
+        doc = self.Element.Document
+        doc._require_transaction()
+        old = self._getter()
+        doc._log(lambda: self._setter(old))
+        self._setter(value)
+        return True
+
+
+class Category(object):
+    def __init__(self, bic, name, category_type=CategoryType.Model):
+        self.Id = ElementId(int(bic))
+        self.Name = name
+        self.CategoryType = category_type
+        self.BuiltInCategory = bic
+
+
+class Element(object):
+    __slots__ = ("Document", "_id", "Category", "Name", "_workset", "_phase_created", "_phase_demolished",
+                 "_type_id", "_owner_view", "params", "last_changed_by", "Pinned", "VersionGuid")
+
+    def __init__(self, doc, category=None, name="", workset=0, phase_created=-1, phase_demolished=-1,
+                 type_id=-1, owner_view=-1, params=None):
+        self.Document = doc
+        self._id = doc._next_id()
+        self.Category = category
+        self.Name = name
+        self._workset = workset
+        self._phase_created = phase_created
+        self._phase_demolished = phase_demolished
+        self._type_id = type_id
+        self._owner_view = owner_view
+        self.params = params
+        self.last_changed_by = ""
+        self.Pinned = False
+        self.VersionGuid = None
+        doc._add(self)
+
+    @property
+    def Id(self):
+        return ElementId(self._id)
+
+    @property
+    def WorksetId(self):
+        return WorksetId(self._workset)
+
+    @property
+    def CreatedPhaseId(self):
+        return ElementId(self._phase_created)
+
+    @property
+    def DemolishedPhaseId(self):
+        return ElementId(self._phase_demolished)
+
+    @property
+    def OwnerViewId(self):
+        return ElementId(self._owner_view)
+
+    @property
+    def ViewSpecific(self):
+        return self._owner_view != -1
+
+    def GetTypeId(self):
+        _call("Element.GetTypeId")
+        return ElementId(self._type_id)
+
+    def _set_workset(self, value):
+        self._workset = int(value)
+        self.Document._touch(self)
+
+    def get_Parameter(self, key):
+        _call("Element.get_Parameter")
+        if key == BuiltInParameter.ELEM_PARTITION_PARAM:
+            return Parameter(self, "Workset", StorageType.Integer, lambda: self._workset, self._set_workset,
+                             built_in=key)
+        if key == BuiltInParameter.PHASE_CREATED:
+            if self._phase_created == -1:
+                return None
+            return Parameter(self, "Phase Created", StorageType.ElementId, lambda: ElementId(self._phase_created),
+                             built_in=key)
+        if key == BuiltInParameter.PHASE_DEMOLISHED:
+            if self._phase_created == -1:
+                return None
+            return Parameter(self, "Phase Demolished", StorageType.ElementId,
+                             lambda: ElementId(self._phase_demolished), built_in=key)
+        if isinstance(key, Guid):
+            for name in (self.params or {}):
+                if name.startswith(SHARED_PREFIX) and shared_guid(name) == key:
+                    return self._named_parameter(name)
+            return None
+        return self._named_parameter(key) if not isinstance(key, IntEnum) else None
+
+    def _named_parameter(self, name):
+        if not self.params or name not in self.params:
+            return None
+        value = self.params[name]
+        if isinstance(value, float):
+            storage = StorageType.Double
+        elif isinstance(value, int):
+            storage = StorageType.Integer
+        elif isinstance(value, ElementId):
+            storage = StorageType.ElementId
+        else:
+            storage = StorageType.String
+
+        def setter(v, name=name):
+            self.params[name] = v
+            self.Document._touch(self)
+        return Parameter(self, name, storage, lambda: self.params.get(name), setter)
+
+    def LookupParameter(self, name):
+        _call("Element.LookupParameter")
+        return self._named_parameter(name)
+
+    @property
+    def Parameters(self):
+        _call("Element.Parameters")
+        params = [Parameter(self, "Built-in {}".format(i), StorageType.String, lambda: None,
+                            built_in=BuiltInParameter.INVALID)
+                  for i in range(BUILT_IN_PARAMETER_COUNT)]
+        for _ in params:
+            _call("Element.Parameters.item")
+        return params + [self._named_parameter(n) for n in (self.params or {})]
+
+    def GetGeometryObjectFromReference(self, ref):
+        _call("Element.GetGeometryObjectFromReference")
+        return None
+
+
+class ElementType(Element):
+    __slots__ = ("FamilyName",)
+
+    def __init__(self, doc, category=None, name="", family_name="", **kw):
+        Element.__init__(self, doc, category, name, **kw)
+        self.FamilyName = family_name
+
+
+class FamilySymbol(ElementType):
+    __slots__ = ()
+
+
+class FilledRegionType(ElementType):
+    __slots__ = ()
+
+
+class LocationPoint(object):
+    def __init__(self, point):
+        self.Point = point
+
+
+class LocationCurve(object):
+    def __init__(self, curve):
+        self.Curve = curve
+
+
+class Reference(object):
+    def __init__(self, element_id, linked_element_id=None, tag=None, link_instance_id=None):
+        self.ElementId = element_id
+        self.LinkedElementId = linked_element_id or ElementId.InvalidElementId
+        self.tag = tag
+        self.link_instance_id = link_instance_id
+
+    def CreateLinkReference(self, link_instance):
+        _call("Reference.CreateLinkReference")
+        return Reference(link_instance.Id, self.ElementId, self.tag, link_instance.Id)
+
+
+class ReferenceArray(object):
+    def __init__(self):
+        self._refs = []
+
+    def Append(self, ref):
+        self._refs.append(ref)
+
+    @property
+    def Size(self):
+        return len(self._refs)
+
+    def __iter__(self):
+        return iter(self._refs)
+
+
+class FamilyInstance(Element):
+    __slots__ = ("Location",)
+
+    def __init__(self, doc, point, **kw):
+        Element.__init__(self, doc, **kw)
+        self.Location = LocationPoint(point)
+
+    def GetReferences(self, ref_type):
+        _call("FamilyInstance.GetReferences")
+        return [Reference(self.Id, tag=("center", int(ref_type)))]
+
+
+class HostObject(Element):
+    __slots__ = ()
+
+
+class Wall(HostObject):
+    __slots__ = ("Location", "Width")
+
+    def __init__(self, doc, curve, width=0.5, **kw):
+        HostObject.__init__(self, doc, **kw)
+        self.Location = LocationCurve(curve)
+        self.Width = width
+
+    def GetGeometryObjectFromReference(self, ref):
+        _call("Element.GetGeometryObjectFromReference")
+        side = ref.tag[1] if ref.tag and ref.tag[0] == "side" else None
+        if side is None:
+            return None
+        line = self.Location.Curve
+        d = line.Direction
+        normal = XYZ(-d.Y, d.X, 0)
+        if side == ShellLayerType.Interior:
+            normal = -normal
+        offset = normal * (self.Width / 2.0)
+        return PlanarFace(Line(line.Origin + offset, line.GetEndPoint(1) + offset), normal)
+
+
+class HostObjectUtils(object):
+    @staticmethod
+    def GetSideFaces(host, side):
+        _call("HostObjectUtils.GetSideFaces")
+        if not isinstance(host, HostObject):
+            raise ArgumentException("Element is not a HostObject.")
+        return [Reference(host.Id, tag=("side", side))]
+
+
+class Level(Element):
+    __slots__ = ("Elevation", "monitored")
+
+    def __init__(self, doc, elevation=0.0, monitored=False, **kw):
+        Element.__init__(self, doc, **kw)
+        self.Elevation = elevation
+        self.monitored = monitored
+
+    def GetMonitoredLinkElementIds(self):
+        _call("Element.GetMonitoredLinkElementIds")
+        return [ElementId(1)] if self.monitored else []
+
+
+class Grid(Element):
+    __slots__ = ("Curve", "monitored")
+
+    def __init__(self, doc, curve, monitored=False, **kw):
+        Element.__init__(self, doc, **kw)
+        self.Curve = curve
+        self.monitored = monitored
+
+    def GetMonitoredLinkElementIds(self):
+        _call("Element.GetMonitoredLinkElementIds")
+        return [ElementId(1)] if self.monitored else []
+
+
+class Phase(Element):
+    __slots__ = ()
+
+
+class Dimension(Element):
+    """Single-segment linear dimension; like Revit, Curve is unbound and the extent is Origin +/- Value / 2."""
+    __slots__ = ("_line", "References")
+
+    def __init__(self, doc, curve, references=None, **kw):
+        Element.__init__(self, doc, **kw)
+        self._line = curve
+        self.References = references
+
+    @property
+    def Curve(self):
+        return Line(self._line.Origin, self._line.GetEndPoint(1), bound=False)
+
+    @property
+    def Origin(self):
+        return (self._line.Origin + self._line.GetEndPoint(1)) * 0.5
+
+    @property
+    def Value(self):
+        return self._line.Length
+
+    NumberOfSegments = 0
+    Segments = ()
+
+
+class CurveElement(Element):
+    __slots__ = ("GeometryCurve",)
+
+    def __init__(self, doc, curve, **kw):
+        Element.__init__(self, doc, **kw)
+        self.GeometryCurve = curve
+
+
+class DetailLine(CurveElement):
+    __slots__ = ()
+
+
+class FilledRegion(Element):
+    __slots__ = ("loops",)
+
+    @staticmethod
+    def Create(doc, type_id, view_id, loops):
+        _call("FilledRegion.Create")
+        doc._require_transaction()
+        region = FilledRegion(doc, type_id=type_id.Value, owner_view=view_id.Value)
+        region.loops = list(loops)
+        # Like Revit, a boundary that encloses nothing fails after the element is made: the caller rolls back
+        for loop in region.loops:
+            points = [p for curve in loop for p in list(curve.Tessellate())[:-1]]
+            area = sum(a.X * b.Y - b.X * a.Y for a, b in zip(points, points[1:] + points[:1]))
+            if loop.IsOpen() or abs(area) < 1e-9:
+                raise ArgumentException("The boundary of the filled region does not enclose an area.")
+        return region
+
+
+class SpatialElementBoundaryOptions(object):
+    def __init__(self):
+        self.SpatialElementBoundaryLocation = 0
+
+
+class BoundarySegment(object):
+    def __init__(self, curve):
+        self._curve = curve
+
+    def GetCurve(self):
+        return self._curve
+
+
+class SpatialElement(Element):
+    """Room / area: boundary is a list of loops of curves (first loop outer), [] when not enclosed."""
+    __slots__ = ("boundary",)
+
+    def __init__(self, doc, boundary=None, **kw):
+        Element.__init__(self, doc, **kw)
+        self.boundary = boundary or []
+
+    def GetBoundarySegments(self, options):
+        _call("SpatialElement.GetBoundarySegments")
+        return [[BoundarySegment(curve) for curve in loop] for loop in self.boundary]
+
+
+class FilterElement(Element):
+    __slots__ = ()
+
+    @staticmethod
+    def IsNameUnique(doc, name):
+        _call("FilterElement.IsNameUnique")
+        return not any(isinstance(el, FilterElement) and el.Name == name for el in doc._elements.values())
+
+
+class SelectionFilterElement(FilterElement):
+    __slots__ = ("ids",)
+
+    @staticmethod
+    def Create(doc, name):
+        _call("SelectionFilterElement.Create")
+        doc._require_transaction()
+        if not FilterElement.IsNameUnique(doc, name):
+            raise ArgumentException("The name is already in use.")
+        selection_filter = SelectionFilterElement(doc, name=name)
+        selection_filter.ids = set()
+        return selection_filter
+
+    def SetElementIds(self, ids):
+        _call("SelectionFilterElement.SetElementIds")
+        self.Document._require_transaction()
+        self.ids = set(i.Value for i in ids)
+
+
+class View(Element):
+    __slots__ = ("ViewType", "GenLevel", "overrides", "visible_ids", "IsTemplate", "filters", "filters_locked",
+                 "RightDirection", "UpDirection")
+
+    def __init__(self, doc, view_type=ViewType.FloorPlan, gen_level=None, **kw):
+        Element.__init__(self, doc, **kw)
+        self.ViewType = view_type
+        self.GenLevel = gen_level
+        self.overrides = {}
+        self.visible_ids = set()
+        self.IsTemplate = False
+        self.filters = {}
+        self.filters_locked = False
+        self.RightDirection = XYZ.BasisX
+        self.UpDirection = XYZ.BasisY
+
+    def SetElementOverrides(self, element_id, settings):
+        _call("View.SetElementOverrides")
+        self.Document._require_transaction()
+        old = self.overrides.get(element_id.Value)
+        self.Document._log(lambda: self.overrides.__setitem__(element_id.Value, old) if old
+                           else self.overrides.pop(element_id.Value, None))
+        if settings.values:
+            self.overrides[element_id.Value] = settings
+        else:
+            self.overrides.pop(element_id.Value, None)
+
+    def GetElementOverrides(self, element_id):
+        _call("View.GetElementOverrides")
+        return self.overrides.get(element_id.Value, OverrideGraphicSettings())
+
+    def AddFilter(self, filter_id):
+        _call("View.AddFilter")
+        self.Document._require_transaction()
+        if self.filters_locked:
+            raise InvalidOperationException("Filters are controlled by the view template.")
+        self.filters[filter_id.Value] = OverrideGraphicSettings()
+        self.Document._log(lambda: self.filters.pop(filter_id.Value, None))
+
+    def SetFilterOverrides(self, filter_id, settings):
+        _call("View.SetFilterOverrides")
+        self.Document._require_transaction()
+        old = self.filters[filter_id.Value]
+        self.filters[filter_id.Value] = settings
+        self.Document._log(lambda: self.filters.__setitem__(filter_id.Value, old))
+
+    def RemoveFilter(self, filter_id):
+        _call("View.RemoveFilter")
+        self.Document._require_transaction()
+        old = self.filters.pop(filter_id.Value)
+        self.Document._log(lambda: self.filters.__setitem__(filter_id.Value, old))
+
+    def GetFilters(self):
+        return [ElementId(i) for i in self.filters]
+
+
+class ViewPlan(View):
+    __slots__ = ()
+
+
+class IDuplicateTypeNamesHandler(object):
+    def OnDuplicateTypeNamesFound(self, args):
+        raise NotImplementedError
+
+
+class CopyPasteOptions(object):
+    def __init__(self):
+        self.handler = None
+
+    def SetDuplicateTypeNamesHandler(self, handler):
+        self.handler = handler
+
+
+class ElementTransformUtils(object):
+    @staticmethod
+    def CopyElements(source_doc, element_ids, doc, transform, options):
+        """Copies views between documents. Each call reconciles the types of the copied
+        content once; without a handler Revit shows the duplicate types dialog."""
+        _call("ElementTransformUtils.CopyElements")
+        doc._require_transaction()
+        _call("CopyElements.ReconcileTypes")
+        if options is None or options.handler is None:
+            _call("CopyElements.DuplicateTypesDialog")
+        elif options.handler.OnDuplicateTypeNamesFound(None) != DuplicateTypeAction.UseDestinationTypes:
+            raise InvalidOperationException("Copy aborted by the duplicate type names handler.")
+        taken = {}
+        new_ids = []
+        for el_id in element_ids:
+            source = source_doc._elements[el_id.Value]
+            # View names are unique per view type; templates share one namespace
+            key = "template" if source.IsTemplate else source.ViewType
+            if key not in taken:
+                taken[key] = set(v.Name for v in doc._elements.values() if isinstance(v, View) and
+                                 ("template" if v.IsTemplate else v.ViewType) == key)
+            # Like Revit, a taken view name gets a number appended
+            name, number = source.Name, 1
+            while name in taken[key]:
+                name = "{} {}".format(source.Name, number)
+                number += 1
+            taken[key].add(name)
+            copy = type(source)(doc, view_type=source.ViewType, category=source.Category, name=name)
+            copy.IsTemplate = source.IsTemplate
+            new_ids.append(copy.Id)
+        return new_ids
+
+
+class RevitLinkInstance(Element):
+    __slots__ = ("link_document", "transform")
+
+    def __init__(self, doc, link_document, transform=None, **kw):
+        Element.__init__(self, doc, **kw)
+        self.link_document = link_document
+        self.transform = transform or Transform()
+
+    def GetLinkDocument(self):
+        _call("RevitLinkInstance.GetLinkDocument")
+        return self.link_document
+
+    def GetTransform(self):
+        _call("RevitLinkInstance.GetTransform")
+        return self.transform
+
+    def GetTotalTransform(self):
+        return self.GetTransform()
+
+
+class Workset(object):
+    def __init__(self, workset_id, name, kind=WorksetKind.UserWorkset):
+        self.Id = WorksetId(workset_id)
+        self.Name = name
+        self.Kind = kind
+
+    @staticmethod
+    def Create(doc, name):
+        _call("Workset.Create")
+        doc._require_transaction()
+        new_id = max(doc.worksets) + 1 if doc.worksets else 1
+        ws = Workset(new_id, name)
+        doc.worksets[new_id] = ws
+        doc._log(lambda: doc.worksets.pop(new_id, None))
+        return ws
+
+
+class WorksetTable(object):
+    def __init__(self, doc):
+        self._doc = doc
+
+    def GetWorkset(self, workset_id):
+        _call("WorksetTable.GetWorkset")
+        return self._doc.worksets.get(workset_id.IntegerValue)
+
+
+class WorksharingTooltipInfo(object):
+    def __init__(self, element):
+        self.Creator = element.last_changed_by
+        self.Owner = ""
+        self.LastChangedBy = element.last_changed_by
+
+
+class WorksharingUtils(object):
+    @staticmethod
+    def GetWorksharingTooltipInfo(doc, element_id):
+        _call("WorksharingUtils.GetWorksharingTooltipInfo")
+        el = doc._elements.get(element_id.Value)
+        if el is None:
+            raise ArgumentException("Element does not exist.")
+        return WorksharingTooltipInfo(el)
+
+    @staticmethod
+    def GetUserWorksetInfo(model_path):
+        _call("WorksharingUtils.GetUserWorksetInfo")
+        doc = _model_file(model_path._path)()
+        return [WorksetPreview(ws) for ws in doc.worksets.values() if ws.Kind == WorksetKind.UserWorkset]
+
+
+# ╔╦╗╦═╗╔═╗╔╗╔╔═╗╔═╗╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+#  ║ ╠╦╝╠═╣║║║╚═╗╠═╣║   ║ ║║ ║║║║╚═╗
+#  ╩ ╩╚═╩ ╩╝╚╝╚═╝╩ ╩╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ TRANSACTIONS
+#====================================================================================================
+
+class Transaction(object):
+    def __init__(self, doc, name=""):
+        self._doc = doc
+        self.name = name
+        self._status = TransactionStatus.Uninitialized
+
+    def Start(self, name=None):
+        _call("Transaction.Start")
+        if self._doc._open_transaction is not None:
+            raise InvalidOperationException("A transaction is already open.")
+        self._doc._open_transaction = self
+        self._doc._journal = []
+        self._status = TransactionStatus.Started
+        return self._status
+
+    def _close(self, status):
+        doc = self._doc
+        if status == TransactionStatus.RolledBack:
+            doc._undo(0)
+            doc._added, doc._modified, doc._deleted = set(), set(), set()
+        if status == TransactionStatus.Committed:
+            doc._unsaved.extend(doc._journal)
+        doc._open_transaction = None
+        doc._journal = None
+        self._status = status
+        if status == TransactionStatus.Committed:
+            doc._regenerate()
+        return status
+
+    def Commit(self):
+        _call("Transaction.Commit")
+        return self._close(TransactionStatus.Committed)
+
+    def RollBack(self):
+        _call("Transaction.RollBack")
+        return self._close(TransactionStatus.RolledBack)
+
+    def GetStatus(self):
+        return self._status
+
+    def HasStarted(self):
+        return self._status == TransactionStatus.Started
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._status == TransactionStatus.Started:
+            self.RollBack()
+        return False
+
+
+class SubTransaction(object):
+    def __init__(self, doc):
+        self._doc = doc
+        self._mark = None
+
+    def Start(self):
+        _call("SubTransaction.Start")
+        self._doc._require_transaction()
+        self._mark = len(self._doc._journal)
+        return TransactionStatus.Started
+
+    def Commit(self):
+        return TransactionStatus.Committed
+
+    def RollBack(self):
+        _call("SubTransaction.RollBack")
+        self._doc._undo(self._mark)
+        return TransactionStatus.RolledBack
+
+
+# ╔═╗╔═╗╦  ╦  ╔═╗╔═╗╔╦╗╔═╗╦═╗╔═╗
+# ║  ║ ║║  ║  ║╣ ║   ║ ║ ║╠╦╝╚═╗
+# ╚═╝╚═╝╩═╝╩═╝╚═╝╚═╝ ╩ ╚═╝╩╚═╚═╝ COLLECTORS
+#====================================================================================================
+
+class ElementFilter(object):
+    def passes(self, el):
+        raise NotImplementedError
+
+
+class ElementMulticategoryFilter(ElementFilter):
+    def __init__(self, categories, inverted=False):
+        self._cats = set(int(c) if not isinstance(c, ElementId) else c.Value for c in categories)
+        self._inverted = inverted
+
+    def passes(self, el):
+        inside = el.Category is not None and el.Category.Id.Value in self._cats
+        return inside != self._inverted
+
+
+class FilterRule(object):
+    """Equality rule on an ElementId valued built-in parameter (evaluated natively - no API calls counted)."""
+
+    def __init__(self, parameter_id, value):
+        self.parameter = parameter_id.Value
+        self.value = value.Value
+
+    def passes(self, el):
+        if self.parameter in (BuiltInParameter.PHASE_CREATED, BuiltInParameter.PHASE_DEMOLISHED):
+            # Elements without phases do not have the parameters
+            if el._phase_created == -1:
+                return False
+            current = el._phase_created if self.parameter == BuiltInParameter.PHASE_CREATED else el._phase_demolished
+            return current == self.value
+        return False
+
+
+class ParameterFilterRuleFactory(object):
+    @staticmethod
+    def CreateEqualsRule(parameter_id, value):
+        return FilterRule(parameter_id, value)
+
+
+class ElementParameterFilter(ElementFilter):
+    def __init__(self, rules, inverted=False):
+        self._rules = list(rules) if isinstance(rules, (list, tuple)) else [rules]
+        self._inverted = inverted
+
+    def passes(self, el):
+        return all(rule.passes(el) for rule in self._rules) != self._inverted
+
+
+class FilteredElementCollector(object):
+    def __init__(self, doc, view_id=None):
+        _call("FilteredElementCollector")
+        self._doc = doc
+        self._view_id = view_id
+        self._filters = []
+
+    def _where(self, predicate):
+        self._filters.append(predicate)
+        return self
+
+    def OfClass(self, cls):
+        return self._where(lambda el: isinstance(el, cls))
+
+    def OfCategory(self, bic):
+        value = int(bic)
+        return self._where(lambda el: el.Category is not None and el.Category.Id.Value == value)
+
+    def OfCategoryId(self, cat_id):
+        return self.OfCategory(cat_id.Value)
+
+    def WhereElementIsNotElementType(self):
+        return self._where(lambda el: not isinstance(el, ElementType))
+
+    def WhereElementIsElementType(self):
+        return self._where(lambda el: isinstance(el, ElementType))
+
+    def WhereElementIsViewIndependent(self):
+        return self._where(lambda el: el._owner_view == -1)
+
+    def WherePasses(self, element_filter):
+        return self._where(element_filter.passes)
+
+    def _source(self):
+        if self._view_id is None:
+            return self._doc._elements.values()
+        view = self._doc._elements[self._view_id.Value]
+        return [self._doc._elements[i] for i in view.visible_ids if i in self._doc._elements]
+
+    def __iter__(self):
+        scanned = 0
+        for el in list(self._source()):
+            scanned += 1
+            if all(f(el) for f in self._filters):
+                yield el
+        _call("FilteredElementCollector.scanned", scanned)
+
+    def ToElements(self):
+        return list(self)
+
+    def ToElementIds(self):
+        return [el.Id for el in self]
+
+    def GetElementIdIterator(self):
+        return iter(self.ToElementIds())
+
+    def FirstElement(self):
+        return next(iter(self), None)
+
+    def GetElementCount(self):
+        return sum(1 for _ in self)
+
+
+class FilteredWorksetCollector(object):
+    def __init__(self, doc):
+        _call("FilteredWorksetCollector")
+        self._doc = doc
+        self._kind = None
+
+    def OfKind(self, kind):
+        self._kind = kind
+        return self
+
+    def __iter__(self):
+        return iter([w for w in self._doc.worksets.values() if self._kind is None or w.Kind == self._kind])
+
+    def ToWorksets(self):
+        return list(self)
+
+
+# ╔╦╗╔═╗╔═╗╦ ╦╔╦╗╔═╗╔╗╔╔╦╗
+#  ║║║ ║║  ║ ║║║║║╣ ║║║ ║
+# ═╩╝╚═╝╚═╝╚═╝╩ ╩╚═╝╝╚╝ ╩  DOCUMENT
+#====================================================================================================
+
+class Settings(object):
+    def __init__(self):
+        self.Categories = []
+
+
+class DocumentCreation(object):
+    def __init__(self, doc):
+        self._doc = doc
+
+    def NewDimension(self, view, line, references):
+        _call("Document.Create.NewDimension")
+        self._doc._require_transaction()
+        if references.Size < 2:
+            raise ArgumentException("At least two references are required.")
+        dim = Dimension(self._doc, line, references,
+                        category=self._doc.category(BuiltInCategory.OST_Dimensions), owner_view=view.Id.Value)
+        view.visible_ids.add(dim._id)
+        return dim
+
+
+class Document(object):
+    def __init__(self, title="Synthetic", path="", workshared=True):
+        self.Title = title
+        self.PathName = path
+        self.IsWorkshared = workshared
+        self.IsFamilyDocument = False
+        self.FamilyManager = None
+        self.Application = None
+        self.closed = False
+        self.ActiveView = None
+        self.Settings = Settings()
+        self.Create = DocumentCreation(self)
+        self.worksets = {}
+        self._elements = {}
+        self._last_id = 1000
+        self._open_transaction = None
+        self._journal = None
+        self._added = set()
+        self._modified = set()
+        self._deleted = set()
+        self._categories = {}
+        self.regenerations = 0
+        # Called with a DocumentChangedEventArgs after every committed change (see fake_revit.reset)
+        self.on_changed = None
+        # Saved versions: [(guid, created, modified, deleted)], see sync()
+        self._versions = [("00000000-0000-0000-0000-000000000000", set(), set(), set())]
+        self._unsynced = (set(), set(), set())
+        # Undo steps of the changes committed since the last sync (see reopen_without_saving)
+        self._unsaved = []
+        # What Revit raises while this file opens: FailureMessages and (dialog id, message) dialogs
+        self.open_failures = []
+        self.open_dialogs = []
+
+    # -- internal helpers used by the fake elements / generators
+    def _next_id(self):
+        self._last_id += 1
+        return self._last_id
+
+    def _log(self, undo):
+        """Remember how to undo a change made inside the open transaction."""
+        if self._journal is not None:
+            self._journal.append(undo)
+
+    def _undo(self, mark):
+        while len(self._journal) > mark:
+            self._journal.pop()()
+
+    def _add(self, el):
+        self._elements[el._id] = el
+        self._added.add(el._id)
+        self._log(lambda: (self._elements.pop(el._id, None), self._added.discard(el._id)))
+
+    def _touch(self, el):
+        if el._id not in self._added:
+            self._modified.add(el._id)
+
+    def _require_transaction(self):
+        if self._open_transaction is None:
+            raise InvalidOperationException("Modification of the document is forbidden outside of a transaction.")
+
+    def _regenerate(self):
+        self.regenerations += 1
+        for pending, new in zip(self._unsynced, (self._added, self._modified, self._deleted)):
+            pending.update(new)
+        if self.on_changed is not None and (self._added or self._modified or self._deleted):
+            self.on_changed(DocumentChangedEventArgs(self, self._added, self._modified, self._deleted))
+        self._added, self._modified, self._deleted = set(), set(), set()
+
+    def category(self, bic, name=None, category_type=CategoryType.Model):
+        cat = self._categories.get(int(bic))
+        if cat is None:
+            cat = Category(bic, name or bic.name.replace("OST_", ""), category_type)
+            self._categories[int(bic)] = cat
+            self.Settings.Categories.append(cat)
+        return cat
+
+    def sync(self):
+        """Simulate a save / synchronize: starts a new document version."""
+        guid = "{:08d}-0000-0000-0000-000000000000".format(len(self._versions))
+        self._versions.append((guid,) + self._unsynced)
+        self._unsynced = (set(), set(), set())
+        self._unsaved = []
+        return guid
+
+    def reopen_without_saving(self):
+        """Simulate closing without saving and opening the model again: the changes made since
+        the last sync are lost and the document version is the saved one."""
+        while self._unsaved:
+            self._unsaved.pop()()
+        self._unsynced = (set(), set(), set())
+        self._added, self._modified, self._deleted = set(), set(), set()
+
+    # -- public API surface
+    @property
+    def IsModified(self):
+        return bool(self._unsaved) or any(self._unsynced)
+
+    @staticmethod
+    def GetDocumentVersion(doc):
+        _call("Document.GetDocumentVersion")
+        return DocumentVersion(doc._versions[-1][0], len(doc._versions) - 1)
+
+    def GetChangedElements(self, guid):
+        _call("Document.GetChangedElements")
+        guids = [v[0] for v in self._versions]
+        if str(guid) not in guids:
+            raise ArgumentException("The version is not a previous version of this document.")
+        created, modified, deleted = set(), set(), set()
+        for _, c, m, d in self._versions[guids.index(str(guid)) + 1:]:
+            created |= c
+            modified |= m
+            deleted |= d
+        return ChangedElements(created - deleted, modified - deleted, deleted)
+
+    def GetElement(self, key):
+        _call("Document.GetElement")
+        if isinstance(key, Reference):
+            key = key.ElementId
+        return self._elements.get(key.Value)
+
+    def GetWorksetTable(self):
+        _call("Document.GetWorksetTable")
+        return WorksetTable(self)
+
+    def Delete(self, element_id):
+        _call("Document.Delete")
+        self._require_transaction()
+        ids = element_id if isinstance(element_id, (list, tuple, set)) else [element_id]
+        for el_id in ids:
+            el = self._elements.pop(el_id.Value, None)
+            if el is not None:
+                self._log(lambda el=el: self._elements.__setitem__(el._id, el))
+                self._deleted.add(el_id.Value)
+                self._added.discard(el_id.Value)
+                self._modified.discard(el_id.Value)
+        return ids
+
+    def Regenerate(self):
+        # Regeneration inside a transaction does not raise DocumentChanged; committing does
+        _call("Document.Regenerate")
+        self.regenerations += 1
+
+    def Save(self):
+        _call("Document.Save")
+        if self.PathName and os.path.exists(self.PathName):
+            os.utime(self.PathName, None)
+
+    def Close(self, save_modified=True):
+        _call("Document.Close")
+        if self.closed:
+            raise InvalidOperationException("The document is already closed.")
+        self.closed = True
+        return True
+
+
+class DocumentVersion(object):
+    def __init__(self, guid, number_of_saves):
+        self.VersionGUID = guid
+        self.NumberOfSaves = number_of_saves
+
+
+class ChangedElements(object):
+    def __init__(self, created, modified, deleted):
+        self._ids = [[ElementId(i) for i in ids] for ids in (created, modified, deleted)]
+
+    def GetCreatedElementIds(self):
+        return self._ids[0]
+
+    def GetModifiedElementIds(self):
+        return self._ids[1]
+
+    def GetDeletedElementIds(self):
+        return self._ids[2]
+
+
+class DocumentChangedEventArgs(object):
+    def __init__(self, doc, added, modified, deleted):
+        self._doc = doc
+        self._ids = [[ElementId(i) for i in ids] for ids in (added, modified, deleted)]
+
+    def GetDocument(self):
+        return self._doc
+
+    def GetAddedElementIds(self):
+        return self._ids[0]
+
+    def GetModifiedElementIds(self):
+        return self._ids[1]
+
+    def GetDeletedElementIds(self):
+        return self._ids[2]
+
+
+# ╔═╗╔═╗╔╦╗╦╦ ╦ ╦  ╔═╗╔═╗╦═╗╔═╗╔╦╗╔═╗╔╦╗╔═╗╦═╗╔═╗
+# ╠╣ ╠═╣║║║║║ ╚╦╝  ╠═╝╠═╣╠╦╝╠═╣║║║║╣  ║ ║╣ ╠╦╝╚═╗
+# ╚  ╩ ╩╩ ╩╩╩═╝╩   ╩  ╩ ╩╩╚═╩ ╩╩ ╩╚═╝ ╩ ╚═╝╩╚═╚═╝ FAMILY PARAMETERS
+#====================================================================================================
+
+class IFamilyLoadOptions(object):
+    pass
+
+
+class ExternalDefinition(object):
+    def __init__(self, name, guid=None):
+        self.Name = name
+        self.GUID = guid or shared_guid(SHARED_PREFIX + name)
+
+
+class _NamedItems(list):
+    """DefinitionGroups / Definitions: iterable, get_Item(name) returns None when missing."""
+
+    def get_Item(self, name):
+        _call("Definitions.get_Item")
+        return next((item for item in self if item.Name == name), None)
+
+
+class DefinitionGroup(object):
+    def __init__(self, name, definitions):
+        self.Name = name
+        self.Definitions = _NamedItems(definitions)
+
+
+class DefinitionFile(object):
+    def __init__(self, filename, groups):
+        self.Filename = filename
+        self.Groups = _NamedItems(groups)
+
+    def write(self):
+        """Write Filename the way Revit does (UTF-16, tab separated)."""
+        lines = ["# This is a Revit shared parameter file.", "# Do not edit manually.",
+                 "*META\tVERSION\tMINVERSION", "META\t2\t1", "*GROUP\tID\tNAME"]
+        lines += ["GROUP\t{}\t{}".format(i + 1, g.Name) for i, g in enumerate(self.Groups)]
+        lines.append("*PARAM\tGUID\tNAME\tDATATYPE\tDATACATEGORY\tGROUP\tVISIBLE\tDESCRIPTION\tUSERMODIFIABLE"
+                     "\tHIDEONPROPERTIESPALETTE")
+        for i, group in enumerate(self.Groups):
+            lines += ["PARAM\t{}\t{}\tTEXT\t\t{}\t1\t\t1\t0".format(d.GUID, d.Name, i + 1)
+                      for d in group.Definitions]
+        with open(self.Filename, "wb") as f:
+            f.write("\r\n".join(lines).encode("utf-16"))
+
+
+class SharedParameterElement(Element):
+    __slots__ = ("GuidValue",)
+
+    def __init__(self, doc, definition, **kw):
+        Element.__init__(self, doc, name=definition.Name, **kw)
+        self.GuidValue = definition.GUID
+
+    def GetDefinition(self):
+        _call("SharedParameterElement.GetDefinition")
+        return Definition(self.Name)
+
+
+class FamilyParameter(object):
+    def __init__(self, name, guid=None, is_instance=False):
+        self.Definition = Definition(name)
+        self.IsShared = guid is not None
+        self.GUID = guid
+        self.IsInstance = is_instance
+
+
+class FamilyManager(object):
+    def __init__(self, doc, parameters=()):
+        self._doc = doc
+        self._parameters = list(parameters)
+
+    @property
+    def Parameters(self):
+        _call("FamilyManager.Parameters")
+        return list(self._parameters)
+
+    def AddParameter(self, definition, group, is_instance):
+        _call("FamilyManager.AddParameter")
+        self._doc._require_transaction()
+        if any(p.Definition.Name == definition.Name for p in self._parameters):
+            raise InvalidOperationException("A parameter named '{}' already exists.".format(definition.Name))
+        param = FamilyParameter(definition.Name, definition.GUID, is_instance)
+        self._parameters.append(param)
+        self._doc._log(lambda: self._parameters.remove(param))
+        return param
+
+
+# ╔═╗╔═╗╔═╗╔╗╔  ╔═╗╦╦  ╔═╗╔═╗
+# ║ ║╠═╝║╣ ║║║  ╠╣ ║║  ║╣ ╚═╗
+# ╚═╝╩  ╚═╝╝╚╝  ╚  ╩╩═╝╚═╝╚═╝ OPEN FILES
+#====================================================================================================
+# Files on disk are opened through MODEL_FILES: {user visible path: callable returning a Document}.
+
+MODEL_FILES = {}
+
+
+class ModelPath(object):
+    def __init__(self, path):
+        self._path = path
+
+
+class ModelPathUtils(object):
+    @staticmethod
+    def ConvertUserVisiblePathToModelPath(path):
+        return ModelPath(path)
+
+    @staticmethod
+    def ConvertModelPathToUserVisiblePath(model_path):
+        return model_path._path
+
+
+def _model_file(path):
+    if path not in MODEL_FILES:
+        raise InvalidOperationException("The file '{}' does not exist or is not a Revit model.".format(path))
+    return MODEL_FILES[path]
+
+
+class BasicFileInfo(object):
+    def __init__(self, is_workshared):
+        self.IsWorkshared = is_workshared
+
+    @staticmethod
+    def Extract(path):
+        _call("BasicFileInfo.Extract")
+        return BasicFileInfo(getattr(_model_file(path), "workshared", True))
+
+
+class WorksetPreview(object):
+    def __init__(self, workset):
+        self.Id = workset.Id
+        self.Name = workset.Name
+
+
+class WorksetConfiguration(object):
+    def __init__(self, option=WorksetConfigurationOption.OpenAllWorksets):
+        self.option = option
+        self.opened = []
+
+    def Open(self, workset_ids):
+        self.opened.extend(workset_ids)
+
+
+class OpenOptions(object):
+    def __init__(self):
+        self.Audit = False
+        self.DetachFromCentralOption = DetachFromCentralOption.DoNotDetach
+        self._worksets = WorksetConfiguration()
+
+    def SetOpenWorksetsConfiguration(self, config):
+        self._worksets = config
+
+    def GetOpenWorksetsConfiguration(self):
+        return self._worksets
+
+
+class Event(object):
+    """Revit event: handlers are added / removed with += / -= and called with (sender, args)."""
+
+    def __init__(self):
+        self.handlers = []
+
+    def __iadd__(self, handler):
+        self.handlers.append(handler)
+        return self
+
+    def __isub__(self, handler):
+        self.handlers.remove(handler)
+        return self
+
+    def fire(self, sender, args):
+        for handler in list(self.handlers):
+            handler(sender, args)
+
+
+class ModalDialogWaiting(BaseException):
+    """A dialog nobody answered: Revit would wait for a click here. Not an Exception, so no
+    except Exception in a button swallows it - the run stops like it would stall."""
+
+
+class FailureMessage(object):
+    def __init__(self, text, severity=FailureSeverity.Warning, has_resolutions=False):
+        self._text = text
+        self._severity = severity
+        self._has_resolutions = has_resolutions
+
+    def GetDescriptionText(self):
+        return self._text
+
+    def GetSeverity(self):
+        return self._severity
+
+    def HasResolutions(self):
+        return self._has_resolutions
+
+
+class FailuresAccessor(object):
+    def __init__(self, messages):
+        self._messages = list(messages)
+        self.handled = []
+
+    def GetFailureMessages(self):
+        return list(self._messages)
+
+    def DeleteWarning(self, message):
+        if message.GetSeverity() != FailureSeverity.Warning:
+            raise InvalidOperationException("Only warnings can be deleted.")
+        self.handled.append(message)
+
+    def ResolveFailure(self, message):
+        if not message.HasResolutions():
+            raise InvalidOperationException("The failure has no resolution.")
+        self.handled.append(message)
+
+
+class FailuresProcessingEventArgs(object):
+    def __init__(self, accessor):
+        self._accessor = accessor
+        self.result = FailureProcessingResult.Continue
+
+    def GetFailuresAccessor(self):
+        return self._accessor
+
+    def SetProcessingResult(self, result):
+        self.result = result
+
+
+class DialogBoxShowingEventArgs(object):
+    """TaskDialogShowingEventArgs: the dialog id and message, OverrideResult answers it."""
+
+    def __init__(self, dialog_id, message):
+        self.DialogId = dialog_id
+        self.Message = message
+        self.result = None
+
+    def OverrideResult(self, result):
+        self.result = result
+        return True
+
+
+class Application(object):
+    """Opens MODEL_FILES. A factory may build a fresh Document per open or return the same one
+    (a file whose saved changes must survive, e.g. a family).
+
+    The open_failures of the document go through FailuresProcessing; errors left unresolved and
+    its open_dialogs are shown through the UIApplication's DialogBoxShowing (ModalDialogWaiting
+    when no handler answers)."""
+
+    def __init__(self):
+        self.SharedParametersFilename = ""
+        self.shared_parameter_file = None
+        self.FailuresProcessing = Event()
+        self.ui = None  # the UIApplication, for DialogBoxShowing
+
+    def _show_dialog(self, dialog_id, message):
+        args = DialogBoxShowingEventArgs(dialog_id, message)
+        if self.ui is not None:
+            self.ui.DialogBoxShowing.fire(self.ui, args)
+        if args.result is None:
+            raise ModalDialogWaiting("'{}' is waiting for the user: {}".format(dialog_id, message))
+
+    def _process_failures(self, messages):
+        accessor = FailuresAccessor(messages)
+        self.FailuresProcessing.fire(self, FailuresProcessingEventArgs(accessor))
+        for message in messages:
+            if message.GetSeverity() != FailureSeverity.Warning and message not in accessor.handled:
+                self._show_dialog("Dialog_Revit_Error", message.GetDescriptionText())
+
+    def OpenSharedParameterFile(self):
+        _call("Application.OpenSharedParameterFile")
+        return self.shared_parameter_file
+
+    def OpenDocumentFile(self, model_path, options=None):
+        _call("Application.OpenDocumentFile")
+        path = model_path._path if isinstance(model_path, ModelPath) else model_path
+        doc = _model_file(path)()
+        doc.closed = False
+        doc.Application = self
+        doc.open_options = options
+        if options is not None and options.DetachFromCentralOption != DetachFromCentralOption.DoNotDetach:
+            if not doc.IsWorkshared:
+                raise InvalidOperationException("The model is not workshared and cannot be detached.")
+            doc.Title += "_detached"
+            doc.PathName = ""
+        if doc.open_failures:
+            self._process_failures(doc.open_failures)
+        for dialog_id, message in doc.open_dialogs:
+            self._show_dialog(dialog_id, message)
+        return doc
+
+
+# ╔═╗═╗ ╦╔═╗╔═╗╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ║╣ ╔╩╦╝║  ║╣ ╠═╝ ║ ║║ ║║║║╚═╗
+# ╚═╝╩ ╚═╚═╝╚═╝╩   ╩ ╩╚═╝╝╚╝╚═╝ EXCEPTIONS (re-exported by Autodesk.Revit.Exceptions)
+#====================================================================================================
+
+class InvalidOperationException(Exception):
+    pass
+
+
+class ArgumentException(Exception):
+    pass
+
+
+class OperationCanceledException(Exception):
+    pass
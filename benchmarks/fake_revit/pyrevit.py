@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""Stand-in for the pyrevit package surface (revit, script, forms, EXEC_PARAMS).
+
+Dialog answers come from ANSWERS so a benchmark can drive a button without a UI:
+each entry is a callable receiving the same arguments as the real form.
+Author: Arbel Tal"""
+
+import os
+import tempfile
+
+from . import db
+
+# Dialog callbacks, replaced per benchmark
+ANSWERS = {}
+
+# Tables / markdown the button printed, for sanity checks
+OUTPUT = []
+
+# script.store_data slots
+DATA = {}
+
+
+def _answer(_name, _default, *args, **kwargs):
+    handler = ANSWERS.get(_name)
+    return handler(*args, **kwargs) if handler else _default
+
+
+def reset(keep_data=False):
+    ANSWERS.clear()
+    del OUTPUT[:]
+    if not keep_data:
+        DATA.clear()
+
+
+# ╦═╗╔═╗╦  ╦╦╔╦╗
+# ╠╦╝║╣ ╚╗╔╝║ ║
+# ╩╚═╚═╝ ╚╝ ╩ ╩  revit
+#====================================================================================================
+
+class _Revit(object):
+    uidoc = None
+    doc = None
+
+    class Transaction(object):
+        def __init__(self, name="", doc=None):
+            self._t = db.Transaction(doc or _Revit.doc, name)
+
+        def __enter__(self):
+            self._t.Start()
+            return self._t
+
+        def __exit__(self, exc_type, exc, tb):
+            if exc_type is None:
+                self._t.Commit()
+            else:
+                self._t.RollBack()
+            return False
+
+    class TransactionGroup(Transaction):
+        pass
+
+
+revit = _Revit
+
+
+# ╔═╗╔═╗╦═╗╦╔═╗╔╦╗
+# ╚═╗║  ╠╦╝║╠═╝ ║
+# ╚═╝╚═╝╩╚═╩╩   ╩  script
+#====================================================================================================
+
+class _Output(object):
+    def print_md(self, text):
+        OUTPUT.append(("md", text))
+
+    def print_html(self, text):
+        OUTPUT.append(("html", text))
+
+    def print_table(self, table_data, columns=None, **kwargs):
+        OUTPUT.append(("table", columns, list(table_data)))
+
+    def linkify(self, element_ids, title=None):
+        return title or ""
+
+    def update_progress(self, value, max_value):
+        pass
+
+    def set_title(self, title):
+        pass
+
+    def close(self):
+        pass
+
+
+class _Script(object):
+    _output = _Output()
+
+    @staticmethod
+    def get_output():
+        return _Script._output
+
+    @staticmethod
+    def get_logger():
+        import logging
+        return logging.getLogger("pytal.bench")
+
+    @staticmethod
+    def store_data(slot_name, data, this_project=True):
+        DATA[slot_name] = data
+
+    @staticmethod
+    def load_data(slot_name, this_project=True):
+        if slot_name not in DATA:
+            raise IOError("No data stored in slot {}".format(slot_name))
+        return DATA[slot_name]
+
+    @staticmethod
+    def get_document_data_file(file_id, file_ext, add_cmd_name=False):
+        return os.path.join(tempfile.gettempdir(), "pytal_bench_{}.{}".format(file_id, file_ext))
+
+    @staticmethod
+    def get_universal_data_file(file_id, file_ext, add_cmd_name=False):
+        return os.path.join(tempfile.gettempdir(), "pytal_bench_{}.{}".format(file_id, file_ext))
+
+    @staticmethod
+    def exit():
+        raise SystemExit
+
+    @staticmethod
+    def write(text):
+        OUTPUT.append(("text", text))
+
+
+script = _Script
+
+
+# ╔═╗╔═╗╦═╗╔╦╗╔═╗
+# ╠╣ ║ ║╠╦╝║║║╚═╗
+# ╚  ╚═╝╩╚═╩ ╩╚═╝ forms
+#====================================================================================================
+
+class _ProgressBar(object):
+    def __init__(self, title="", cancellable=False, step=1, **kwargs):
+        self.title = title
+        self.cancelled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def update_progress(self, value, max_value=1):
+        pass
+
+
+class _SelectFromList(object):
+    @staticmethod
+    def show(context, *args, **kwargs):
+        items = list(context)
+        default = items if kwargs.get("multiselect") else (items[0] if items else None)
+        return _answer("SelectFromList", default, items, **kwargs)
+
+
+class _CommandSwitchWindow(object):
+    @staticmethod
+    def show(context, *args, **kwargs):
+        items = list(context)
+        return _answer("CommandSwitchWindow", items[0] if items else None, items, **kwargs)
+
+
+class _Forms(object):
+    ProgressBar = _ProgressBar
+    SelectFromList = _SelectFromList
+    CommandSwitchWindow = _CommandSwitchWindow
+
+    @staticmethod
+    def alert(msg, title=None, options=None, yes=False, no=False, exitscript=False, **kwargs):
+        default = options[0] if options else True
+        result = _answer("alert", default, msg, options=options)
+        if exitscript and not options:
+            raise SystemExit
+        return result
+
+    @staticmethod
+    def pick_file(*args, **kwargs):
+        return _answer("pick_file", None, *args, **kwargs)
+
+    @staticmethod
+    def save_file(*args, **kwargs):
+        return _answer("save_file", None, *args, **kwargs)
+
+    @staticmethod
+    def pick_folder(*args, **kwargs):
+        return _answer("pick_folder", None, *args, **kwargs)
+
+    @staticmethod
+    def ask_for_string(*args, **kwargs):
+        return _answer("ask_for_string", kwargs.get("default"), *args, **kwargs)
+
+
+forms = _Forms
+
+
+class _ExecParams(object):
+    config_mode = False
+    event_args = None
+    event_sender = None
+
+
+EXEC_PARAMS = _ExecParams
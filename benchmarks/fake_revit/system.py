@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Stand-in for the .NET bits (clr, System, System.Collections.Generic) pyTal scripts import.
+Author: Arbel Tal"""
+
+
+class _AppDomainData(object):
+    def __init__(self):
+        self._data = {}
+
+    def GetData(self, name):
+        return self._data.get(name)
+
+    def SetData(self, name, value):
+        self._data[name] = value
+
+
+class AppDomain(object):
+    CurrentDomain = _AppDomainData()
+
+
+class _Generic(object):
+    """List[T] / HashSet[T] style generic factory; T is ignored."""
+
+    def __init__(self, base):
+        self._base = base
+
+    def __getitem__(self, item_type):
+        return self._base
+
+    def __getattr__(self, name):
+        return getattr(self._base, name)
+
+
+List = _Generic(list)
+HashSet = _Generic(set)
+
+
+class Enum(object):
+    @staticmethod
+    def ToObject(enum_type, value):
+        return enum_type(value)
+
+
+class Guid(object):
+    def __init__(self, value):
+        self.value = str(value)
+
+    def ToString(self):
+        return self.value
+
+    __str__ = ToString
+
+    def __eq__(self, other):
+        return isinstance(other, Guid) and other.value == self.value
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.value)
+
+
+def AddReference(name):
+    pass
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Stand-in for Autodesk.Revit.UI and Autodesk.Revit.UI.Selection (the exceptions come from db).
+
+Picks are scripted: benchmarks push references / points onto UIDocument.picks and
+an empty queue behaves like the user pressing ESC.
+Author: Arbel Tal"""
+
+from collections import deque
+from enum import IntEnum
+
+from .db import _call, Application, Event, OperationCanceledException
+
+
+class ObjectType(IntEnum):
+    Nothing = 0
+    Element = 1
+    PointOnElement = 2
+    Edge = 3
+    Face = 4
+    LinkedElement = 5
+
+
+class ISelectionFilter(object):
+    def AllowElement(self, elem):
+        return True
+
+    def AllowReference(self, reference, position):
+        return True
+
+
+class TaskDialog(object):
+    shown = []
+
+    @staticmethod
+    def Show(title, message, *args):
+        TaskDialog.shown.append((title, message))
+
+
+class Selection(object):
+    def __init__(self, uidoc):
+        self._uidoc = uidoc
+        self._selected = []
+
+    def _next(self):
+        if not self._uidoc.picks:
+            raise OperationCanceledException("Picking cancelled.")
+        return self._uidoc.picks.popleft()
+
+    def PickObject(self, object_type, *args):
+        _call("Selection.PickObject")
+        return self._next()
+
+    def PickObjects(self, object_type, *args):
+        _call("Selection.PickObjects")
+        return self._next()
+
+    def PickPoint(self, *args):
+        _call("Selection.PickPoint")
+        return self._next()
+
+    def SetElementIds(self, ids):
+        _call("Selection.SetElementIds")
+        self._selected = list(ids)
+
+    def GetElementIds(self):
+        return list(self._selected)
+
+
+class UIDocument(object):
+    def __init__(self, doc):
+        self.Document = doc
+        self.Selection = Selection(self)
+        self.picks = deque()
+
+    @property
+    def ActiveView(self):
+        return self.Document.ActiveView
+
+    def GetOpenUIViews(self):
+        return []
+
+    def RefreshActiveView(self):
+        _call("UIDocument.RefreshActiveView")
+
+
+class UIApplication(object):
+    def __init__(self, doc):
+        self.ActiveUIDocument = UIDocument(doc)
+        self.Application = Application()
+        self.Application.ui = self
+        self.DialogBoxShowing = Event()
+        doc.Application = self.Application
@@ -0,0 +1,500 @@
+# -*- coding: utf-8 -*-
+"""Run pyTal buttons headless against synthetic documents and report how they scale.
+
+Usage:
+    python benchmarks/run_benchmarks.py                          # 10k and 100k elements
+    python benchmarks/run_benchmarks.py --sizes 1000000 --buttons last_changed_by
+    python benchmarks/run_benchmarks.py --clicks 2 --json bench.json
+    python benchmarks/run_benchmarks.py --checks --sizes 10000   # scenario checks
+
+For every button / size / click it reports wall time, Revit API calls,
+elements scanned by collectors and peak Python memory (tracemalloc).
+Clicks after the first reuse the same document and session, so warm-cache
+behaviour shows up as click 2, 3...
+Author: Arbel Tal"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import fake_revit  # noqa: E402
+from fake_revit import db, pyrevit as fake_pyrevit  # noqa: E402
+from synthetic import make_document  # noqa: E402
+
+fake_revit.install()
+
+TAB_DIR = os.path.join(fake_revit.REPO_DIR, "pyTal.tab")
+
+
+def _button(*parts):
+    return os.path.join(TAB_DIR, *(parts + ("script.py",)))
+
+
+# ╔╗ ╔═╗╔╗╔╔═╗╦ ╦╔╦╗╔═╗╦═╗╦╔═╔═╗
+# ╠╩╗║╣ ║║║║  ╠═╣║║║╠═╣╠╦╝╠╩╗╚═╗
+# ╚═╝╚═╝╝╚╝╚═╝╩ ╩╩ ╩╩ ╩╩╚═╩ ╩╚═╝ BENCHMARKS
+#====================================================================================================
+# Each benchmark prepares dialog answers / picks for one click and returns the script to run.
+
+def bench_elements_to_workset(doc, uiapp, tmp_dir):
+    csv_path = os.path.join(tmp_dir, "worksets.csv")
+    with open(csv_path, "w") as f:
+        writer = csv.writer(f)
+        writer.writerow(["category", "workset"])
+        for cat, ws in [("Walls", "Architecture"), ("Doors", "Interiors"), ("Windows", "Architecture"),
+                        ("Furniture", "Bench New Workset")]:
+            writer.writerow([cat, ws])
+    fake_pyrevit.ANSWERS["pick_file"] = lambda *a, **k: csv_path
+    return _button("Worksets.panel", "worksets.stack", "Elements to Workset.pushbutton")
+
+
+def bench_last_changed_by(doc, uiapp, tmp_dir):
+    return _button("General Tools.panel", "stack03.stack", "Last Changed By.pushbutton")
+
+
+def bench_easy_dimensions(doc, uiapp, tmp_dir, clicks=20):
+    picks = uiapp.ActiveUIDocument.picks
+    dims = [el for el in doc._elements.values() if isinstance(el, db.Dimension)]
+    for i, (fixture, wall) in enumerate(doc.synthetic["fixtures"][:clicks]):
+        picks.append(db.Reference(fixture.Id))
+        picks.append(db.Reference(wall.Id))
+        if i % 2 and dims:
+            # Click right next to an existing dimension to align with it
+            origin = dims[i % len(dims)].Origin
+            picks.append(db.XYZ(origin.X + 0.05, origin.Y, 0))
+        else:
+            point = fixture.Location.Point
+            picks.append(db.XYZ(point.X + 3.0, point.Y, 0))
+    return _button("General Tools.panel", "stack02.stack", "Easy Dimensions.pushbutton")
+
+
+def bench_easy_dimensions_batch(doc, uiapp, tmp_dir, families=200):
+    # Pre-selected fixtures switch the button to batch mode
+    fixtures = [fixture.Id for fixture, _ in doc.synthetic["fixtures"][:families]]
+    uiapp.ActiveUIDocument.Selection.SetElementIds(fixtures)
+    fake_pyrevit.ANSWERS["ask_for_string"] = lambda *a, **k: "30"
+    return _button("General Tools.panel", "stack02.stack", "Easy Dimensions.pushbutton")
+
+
+def bench_lighting_length(doc, uiapp, tmp_dir):
+    return _button("General Tools.panel", "stack03.stack", "Lighting Length.pushbutton")
+
+
+def bench_level_is_monitor(doc, uiapp, tmp_dir, links=3):
+    # Grids in the host and a few loaded links (each with its own levels / grids)
+    grid_cat = doc.category(db.BuiltInCategory.OST_Grids)
+    if not doc.synthetic.get("links"):
+        for i in range(12):
+            db.Grid(doc, db.Line(db.XYZ(i * 20.0, 0, 0), db.XYZ(i * 20.0, 200, 0)), monitored=bool(i % 3),
+                    category=grid_cat, name="G{}".format(i + 1))
+        doc.synthetic["links"] = []
+        for i in range(links):
+            link_doc = make_document(2000, seed=i + 1, title="Link_{}".format(i + 1))
+            link_doc.PathName = "C:\\Models\\Link_{}.rvt".format(i + 1)
+            doc.synthetic["links"].append(db.RevitLinkInstance(doc, link_doc, db.Transform(db.XYZ(0, 0, -1.5 * i))))
+        doc.sync()
+    return _button("General Tools.panel", "Level Is Monitor.pushbutton")
+
+
+def bench_level_monitor_batch(doc, uiapp, tmp_dir, models=20):
+    # A folder of models (plus a backup and a broken file) opened through the fake Application
+    folder = os.path.join(tmp_dir, "models")
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+        names = ["Model_{:02d}".format(i + 1) for i in range(models)]
+        for i, name in enumerate(names):
+            path = os.path.join(folder, name + ".rvt")
+            db.MODEL_FILES[path] = lambda i=i, name=name: make_document(2000, seed=i, title=name)
+        for name in names + ["Model_01.0001", "Broken"]:
+            open(os.path.join(folder, name + ".rvt"), "w").close()
+    fake_pyrevit.ANSWERS["pick_folder"] = lambda *a, **k: folder
+    fake_pyrevit.ANSWERS["alert"] = lambda *a, **k: True
+    return _button("General Tools.panel", "Level Monitor Batch.pushbutton")
+
+
+def bench_insert_shared_parameter(doc, uiapp, tmp_dir, families=300):
+    # A shared parameter file, three of its parameters used in the model, a folder of families
+    app = uiapp.Application
+    if app.shared_parameter_file is None:
+        groups = [db.DefinitionGroup("Group {}".format(g), [db.ExternalDefinition("Param {}-{}".format(g, d))
+                                                            for d in range(30)]) for g in range(5)]
+        # Same name as Group 0's first parameter, another GUID
+        duplicate = db.ExternalDefinition("Param 0-0", db.Guid(uuid.uuid4()))
+        groups[1].Definitions.append(duplicate)
+        app.SharedParametersFilename = os.path.join(tmp_dir, "shared_parameters.txt")
+        app.shared_parameter_file = db.DefinitionFile(app.SharedParametersFilename, groups)
+        app.shared_parameter_file.write()
+        for definition in groups[0].Definitions[:3]:
+            db.SharedParameterElement(doc, definition)
+        db.SharedParameterElement(doc, duplicate)
+        doc.sync()
+    folder = os.path.join(tmp_dir, "families")
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+        chosen = app.shared_parameter_file.Groups[0].Definitions[:3]
+        for i in range(families):
+            path = os.path.join(folder, "Family_{:04d}.rfa".format(i))
+            open(path, "w").close()
+            if i == 7:
+                continue  # not a readable family
+            family = db.Document("Family_{:04d}".format(i), path, workshared=False)
+            family.IsFamilyDocument = True
+            # A third already has the parameters
+            params = [db.FamilyParameter(d.Name, d.GUID) for d in chosen] if i % 3 == 0 else []
+            family.FamilyManager = db.FamilyManager(family, [db.FamilyParameter("Width")] + params)
+            db.MODEL_FILES[path] = lambda family=family: family
+    fake_pyrevit.ANSWERS["pick_folder"] = lambda *a, **k: folder
+    # The three Group 0 parameters (not the same-name one of Group 1)
+    fake_pyrevit.ANSWERS["SelectFromList"] = lambda items, **k: (
+        [i for i in items if "Group 1" not in i] if k.get("title") == "Select Shared Parameters"
+        else items if k.get("multiselect") else items[0])
+    return _button("General Tools.panel", "stack02.stack", "Insert Shared Parameter.pushbutton")
+
+
+def bench_select_phase(doc, uiapp, tmp_dir):
+    # Second phase, not demolished, all model categories (the first click has no element index yet)
+    fake_pyrevit.ANSWERS["SelectFromList"] = lambda items, **k: (
+        items if k.get("multiselect") else
+        "<Not Demolished>" if k.get("title") == "Select Phase Demolished" else items[-1])
+    return _button("General Tools.panel", "stack02.stack", "Select Phase.pushbutton")
+
+
+def bench_phase_matrix(doc, uiapp, tmp_dir):
+    # Demolish a quarter of the existing elements in the second phase, then pick two cells
+    existing, new = doc.synthetic["phases"][:2]
+    if not doc.synthetic.get("demolished"):
+        for el in list(doc._elements.values()):
+            if el._phase_created == existing._id and el._id % 4 == 0:
+                el._phase_demolished = new._id
+        doc.synthetic["demolished"] = True
+    fake_pyrevit.ANSWERS["SelectFromList"] = lambda items, **k: items[:2]
+    return _button("General Tools.panel", "Phase Matrix.pushbutton")
+
+
+def bench_copy_legends(doc, uiapp, tmp_dir, links=3, legends=80):
+    # 3 links with legends, drafting views, schedules and view templates, 10 legends of each link
+    # already in the host; copy them all, renaming the clashes. Later clicks reuse the views lists.
+    if not doc.synthetic.get("legend_links"):
+        view_cat = doc.category(db.BuiltInCategory.OST_Views)
+        for i in range(0, legends, legends // 10):
+            db.View(doc, view_type=db.ViewType.Legend, category=view_cat, name="Legend {:02d}".format(i))
+        doc.synthetic["legend_links"] = []
+        for n in range(links):
+            link_doc = db.Document("Legends Link {}".format(n), "C:\\Models\\Legends Link {}.rvt".format(n))
+            link_cat = link_doc.category(db.BuiltInCategory.OST_Views)
+            for i in range(legends):
+                db.View(link_doc, view_type=db.ViewType.Legend, category=link_cat, name="Legend {:02d}".format(i))
+            for i in range(legends // 4):
+                db.View(link_doc, view_type=db.ViewType.DraftingView, category=link_cat,
+                        name="Detail {:02d}".format(i))
+                db.View(link_doc, view_type=db.ViewType.Schedule, category=link_cat,
+                        name="Schedule {:02d}".format(i))
+            for i in range(5):
+                template = db.View(link_doc, view_type=db.ViewType.FloorPlan, category=link_cat,
+                                   name="Template {}".format(i))
+                template.IsTemplate = True
+            link_doc.sync()
+            doc.synthetic["legend_links"].append(db.RevitLinkInstance(doc, link_doc))
+        doc.sync()
+    fake_pyrevit.ANSWERS["CommandSwitchWindow"] = lambda items, **k: items[-1]
+    return _button("General Tools.panel", "stack01.stack", "Copy Legends from Link.pushbutton")
+
+
+def bench_create_filled_region(doc, uiapp, tmp_dir, squares=300):
+    # Exploded-CAD style selection: squares with a hole, every third hole with an island, plus stray
+    # lines; shuffled, half of the lines drawn backwards, endpoints off by less than the tolerance
+    rng = random.Random(7)
+    if not any(isinstance(el, db.FilledRegionType) for el in doc._elements.values()):
+        db.FilledRegionType(doc, name="Solid Black")
+    line_cat = doc.category(db.BuiltInCategory.OST_Lines)
+    view = doc.ActiveView
+    segments = []
+    for n in range(squares):
+        x, y = (n % 20) * 20.0, (n // 20) * 20.0
+        for size in (10.0, 6.0, 2.0)[:3 if n % 3 == 0 else 2]:
+            offset = (10.0 - size) / 2.0
+            corners = [db.XYZ(x + offset + dx, y + offset + dy, 0)
+                       for dx, dy in ((0, 0), (size, 0), (size, size), (0, size))]
+            segments.extend(zip(corners, corners[1:] + corners[:1]))
+    for n in range(squares // 10):
+        segments.append((db.XYZ(n * 3.0, -5.0, 0), db.XYZ(n * 3.0 + 2.0, -5.0, 0)))
+    rng.shuffle(segments)
+    refs = []
+    for p0, p1 in segments:
+        p1 = db.XYZ(p1.X + rng.uniform(-2e-5, 2e-5), p1.Y, 0)
+        if rng.random() < 0.5:
+            p0, p1 = p1, p0
+        line = db.DetailLine(doc, db.Line(p0, p1), category=line_cat, owner_view=view._id)
+        refs.append(db.Reference(line.Id))
+    uiapp.ActiveUIDocument.picks.append(refs)
+    return _button("General Tools.panel", "stack01.stack", "Create Filled Region.pushbutton")
+
+
+def bench_filled_regions_rooms(doc, uiapp, tmp_dir, rooms=1000):
+    # Batch mode: a region per room of the view, every fourth room around a column (a hole),
+    # every 50th room not enclosed; type by Department (two of the three values have a type)
+    view = doc.ActiveView
+    if not doc.synthetic.get("rooms"):
+        for name in ("Solid Black", "Office", "Circulation"):
+            db.FilledRegionType(doc, name=name)
+        room_cat = doc.category(db.BuiltInCategory.OST_Rooms)
+        doc.synthetic["rooms"] = []
+        for n in range(rooms):
+            x, y = (n % 40) * 12.0, (n // 40) * 12.0
+            loops = []
+            if n % 50:
+                loops.append(_square(x, y, 10.0))
+                if n % 4 == 0:
+                    loops.append(_square(x + 4.0, y + 4.0, 2.0, reverse=True))
+            room = db.SpatialElement(doc, boundary=loops, category=room_cat, name="Room {}".format(n),
+                                     params={"Department": ("Office", "Circulation", "Storage")[n % 3]})
+            view.visible_ids.add(room._id)
+            doc.synthetic["rooms"].append(room)
+    fake_pyrevit.ANSWERS["CommandSwitchWindow"] = lambda items, **k: "Rooms in View"
+    fake_pyrevit.ANSWERS["SelectFromList"] = lambda items, **k: "Department" if "Department" in items else "Solid Black"
+    return _button("General Tools.panel", "stack01.stack", "Create Filled Region.pushbutton")
+
+
+def _square(x, y, size, reverse=False):
+    corners = [db.XYZ(x + dx, y + dy, 0) for dx, dy in ((0, 0), (size, 0), (size, size), (0, size))]
+    if reverse:
+        corners.reverse()
+    return [db.Line(p0, p1) for p0, p1 in zip(corners, corners[1:] + corners[:1])]
+
+
+BENCHMARKS = {
+    "elements_to_workset": bench_elements_to_workset,
+    "last_changed_by": bench_last_changed_by,
+    "lighting_length": bench_lighting_length,
+    "easy_dimensions": bench_easy_dimensions,
+    "easy_dimensions_batch": bench_easy_dimensions_batch,
+    "level_is_monitor": bench_level_is_monitor,
+    "level_monitor_batch": bench_level_monitor_batch,
+    "insert_shared_parameter": bench_insert_shared_parameter,
+    "select_phase": bench_select_phase,
+    "phase_matrix": bench_phase_matrix,
+    "copy_legends": bench_copy_legends,
+    "create_filled_region": bench_create_filled_region,
+    "filled_regions_rooms": bench_filled_regions_rooms,
+}
+
+
+# ╔═╗╦ ╦╔═╗╔═╗╦╔═╔═╗
+# ║  ╠═╣║╣ ║  ╠╩╗╚═╗
+# ╚═╝╩ ╩╚═╝╚═╝╩ ╩╚═╝ CHECKS
+#====================================================================================================
+# Each check drives buttons through a scenario and returns an error message, or None when it passed.
+
+def check_takeoff_reopen_without_saving(size, edits=200):
+    # Edit fixtures, run Lighting Length, close without saving and reopen: the totals must be
+    # those of the saved model, not of the lost edits still in the take-off cache
+    doc = make_document(size)
+    uiapp = fake_revit.reset(doc)
+    script_path = bench_lighting_length(doc, uiapp, None)
+
+    def totals():
+        del fake_pyrevit.OUTPUT[:]
+        fake_revit.run_button(script_path, uiapp)
+        return [entry for entry in fake_pyrevit.OUTPUT if entry[0] == "table"]
+
+    saved = totals()
+    with db.Transaction(doc, "Edit fixtures") as t:
+        t.Start()
+        lengths = [(el, name) for el in doc._elements.values() for name in (el.params or {})
+                   if name.lower() == "sn_length"]
+        for el, name in lengths[:edits]:
+            el.LookupParameter(name).Set(el.params[name] * 3)
+        t.Commit()
+    if totals() == saved:
+        return "editing fixtures did not change the totals"
+
+    doc.reopen_without_saving()
+    uiapp = fake_revit.reset(doc, keep_data=True)  # new Revit session, pyRevit data files kept
+    if totals() != saved:
+        return "totals after reopening without saving differ from the saved model"
+    return None
+
+
+def check_filled_region_failure_rolled_back(size, squares=40, slivers=10):
+    # Pick squares and slivers (a line drawn there and back: a closed loop of no area). The slivers
+    # fail and must leave nothing behind; the squares are still created and their lines deleted
+    doc = make_document(size)
+    uiapp = fake_revit.reset(doc)
+    script_path = bench_create_filled_region(doc, uiapp, None, squares=squares)
+    line_cat = doc.category(db.BuiltInCategory.OST_Lines)
+    refs = uiapp.ActiveUIDocument.picks[-1]
+    sliver_ids = []
+    for n in range(slivers):
+        p0, p1 = db.XYZ(n * 3.0, -20.0, 0), db.XYZ(n * 3.0 + 2.0, -20.0, 0)
+        for a, b in ((p0, p1), (p1, p0)):
+            line = db.DetailLine(doc, db.Line(a, b), category=line_cat, owner_view=doc.ActiveView._id)
+            refs.append(db.Reference(line.Id))
+            sliver_ids.append(line._id)
+    outers = squares + len(range(0, squares, 3))  # a square per cell, an island in every third hole
+    fake_revit.run_button(script_path, uiapp)
+
+    regions = [el for el in doc._elements.values() if isinstance(el, db.FilledRegion)]
+    if len(regions) != outers:
+        return "{} filled regions in the model, expected {} (failed ones left behind?)".format(len(regions), outers)
+    if any(doc.GetElement(db.ElementId(i)) is None for i in sliver_ids):
+        return "detail lines of a failed filled region were deleted"
+    return None
+
+
+def check_filled_region_stubs(size):
+    # Pick outlines with dangling lines on their corners - a tail drawn right after the first edge,
+    # a two-line tick, a bridge between two squares taken before their other edges. Every outline
+    # must still be filled, and only the dangling lines kept
+    doc = make_document(size)
+    uiapp = fake_revit.reset(doc)
+    db.FilledRegionType(doc, name="Solid Black")
+    line_cat = doc.category(db.BuiltInCategory.OST_Lines)
+    a, b, c = _square(0.0, 0.0, 10.0), _square(20.0, 0.0, 10.0), _square(40.0, 0.0, 10.0)
+    tail = db.Line(db.XYZ(10.0, 0.0, 0), db.XYZ(12.0, -3.0, 0))
+    tick = [db.Line(db.XYZ(0.0, 10.0, 0), db.XYZ(-1.0, 11.0, 0)), db.Line(db.XYZ(-1.0, 11.0, 0), db.XYZ(-2.0, 11.0, 0))]
+    bridge = db.Line(db.XYZ(30.0, 0.0, 0), db.XYZ(40.0, 0.0, 0))
+    curves = [a[0], tail] + tick + a[1:] + [b[0], b[1], bridge] + c + b[2:]
+    refs = [db.Reference(db.DetailLine(doc, curve, category=line_cat, owner_view=doc.ActiveView._id).Id)
+            for curve in curves]
+    kept = set(ref.ElementId.Value for ref in refs[1:4] + refs[9:10])
+    uiapp.ActiveUIDocument.picks.append(refs)
+    fake_revit.run_button(_button("General Tools.panel", "stack01.stack", "Create Filled Region.pushbutton"), uiapp)
+
+    regions = [el for el in doc._elements.values() if isinstance(el, db.FilledRegion)]
+    if len(regions) != 3:
+        return "{} filled regions created, expected 3".format(len(regions))
+    left = set(ref.ElementId.Value for ref in refs if doc.GetElement(ref.ElementId) is not None)
+    if left != kept:
+        return "{} detail lines kept, expected the {} dangling ones".format(len(left), len(kept))
+    return None
+
+
+def check_level_monitor_batch_prompts(size):
+    # Models that raise an upgrade dialog, warnings with a missing link error that has a resolution,
+    # an error without one: the overnight run must not stop on any of them, and must list them
+    doc = make_document(size)
+    uiapp = fake_revit.reset(doc)
+    tmp_dir = tempfile.mkdtemp(prefix="pytal_check_")
+    script_path = bench_level_monitor_batch(doc, uiapp, tmp_dir)
+    folder = os.path.join(tmp_dir, "models")
+    prompts = {
+        "Model_03": ([], [("TaskDialog_Upgrade_Model", "The model was saved in an older version.")]),
+        "Model_05": ([db.FailureMessage("Identical instances are in the same place."),
+                      db.FailureMessage("A linked model cannot be found.", db.FailureSeverity.Error, True)], []),
+        "Model_07": ([db.FailureMessage("The central model is not accessible.", db.FailureSeverity.Error)], []),
+    }
+    for name, (failures, dialogs) in prompts.items():
+        def factory(make=db.MODEL_FILES[os.path.join(folder, name + ".rvt")], failures=failures, dialogs=dialogs):
+            model = make()
+            model.open_failures, model.open_dialogs = failures, dialogs
+            return model
+        db.MODEL_FILES[os.path.join(folder, name + ".rvt")] = factory
+    del fake_pyrevit.OUTPUT[:]
+    try:
+        fake_revit.run_button(script_path, uiapp)
+    except db.ModalDialogWaiting as e:
+        return "the batch stalled on a dialog: {}".format(e)
+
+    tables = dict((tuple(entry[1]), entry[2]) for entry in fake_pyrevit.OUTPUT if entry[0] == "table")
+    audited = [row[0] for columns, data in tables.items() if columns[0] == "Model" for row in data]
+    if len(audited) != 20:
+        return "{} models audited, expected 20".format(len(audited))
+    problems = tables.get(("File", "Problem"), [])
+    for name in prompts:
+        if not any(row[0] == name + ".rvt" for row in problems):
+            return "nothing recorded for {}".format(name)
+    return None
+
+
+CHECKS = {
+    "takeoff_reopen_without_saving": check_takeoff_reopen_without_saving,
+    "filled_region_failure_rolled_back": check_filled_region_failure_rolled_back,
+    "filled_region_stubs": check_filled_region_stubs,
+    "level_monitor_batch_prompts": check_level_monitor_batch_prompts,
+}
+
+
+# ╦═╗╦ ╦╔╗╔╔╗╔╔═╗╦═╗
+# ╠╦╝║ ║║║║║║║║╣ ╠╦╝
+# ╩╚═╚═╝╝╚╝╝╚╝╚═╝╩╚═ RUNNER
+#====================================================================================================
+
+def run(name, size, clicks=1, memory=True):
+    """Run one benchmark; returns one result dict per click."""
+    doc = make_document(size)
+    uiapp = fake_revit.reset(doc)
+    results = []
+    tmp_dir = tempfile.mkdtemp(prefix="pytal_bench_")
+    for click in range(1, clicks + 1):
+        script_path = BENCHMARKS[name](doc, uiapp, tmp_dir)
+        db.CALLS.clear()
+        if memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        fake_revit.run_button(script_path, uiapp)
+        wall = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if memory else 0
+        if memory:
+            tracemalloc.stop()
+        scanned = db.CALLS.pop("FilteredElementCollector.scanned", 0)
+        results.append(dict(button=name, elements=len(doc._elements), click=click, wall_s=round(wall, 4),
+                            api_calls=sum(db.CALLS.values()), scanned=scanned,
+                            peak_mb=round(peak / (1024.0 * 1024.0), 2),
+                            top_calls=dict(db.CALLS.most_common(5))))
+    return results
+
+
+def print_table(results):
+    header = "{:<22}{:>10}{:>7}{:>11}{:>12}{:>12}{:>10}".format(
+        "Button", "Elements", "Click", "Wall (s)", "API calls", "Scanned", "Peak MB")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print("{button:<22}{elements:>10}{click:>7}{wall_s:>11.3f}{api_calls:>12}{scanned:>12}{peak_mb:>10.1f}"
+              .format(**r))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--buttons", nargs="+", choices=sorted(BENCHMARKS), default=sorted(BENCHMARKS))
+    parser.add_argument("--clicks", type=int, default=1, help="button clicks per document (warm runs)")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster, no peak MB)")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--checks", action="store_true", help="run the scenario checks instead of benchmarks")
+    args = parser.parse_args(argv)
+
+    if args.checks:
+        failed = 0
+        for name, check in sorted(CHECKS.items()):
+            for size in args.sizes:
+                error = check(size)
+                failed += error is not None
+                print("{:<40}{:>10}  {}".format(name, size, "FAIL: " + error if error else "ok"))
+        if failed:
+            sys.exit(1)
+        return []
+
+    results = []
+    for name in args.buttons:
+        for size in args.sizes:
+            results.extend(run(name, size, args.clicks, memory=not args.no_memory))
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
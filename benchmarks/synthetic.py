@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Synthetic documents for the pyTal benchmarks.
+
+make_document(n) builds a workshared model of roughly n elements: model
+elements spread over categories, worksets, phases and users, plus walls with
+fixtures next to them and view-specific dimensions / detail lines in the
+active plan view. doc.synthetic keeps handy lists (walls, fixtures, users...).
+Author: Arbel Tal"""
+
+import random
+
+from fake_revit import db
+
+BIC = db.BuiltInCategory
+
+MODEL_CATEGORIES = [BIC.OST_Walls, BIC.OST_Doors, BIC.OST_Windows, BIC.OST_Floors, BIC.OST_Furniture,
+                    BIC.OST_GenericModel, BIC.OST_ElectricalFixtures, BIC.OST_LightingFixtures]
+
+WORKSET_NAMES = ["Workset1", "Architecture", "Structure", "Interiors", "MEP", "Furniture", "Site",
+                 "Shared Levels and Grids"]
+
+PHASE_NAMES = ["Existing", "New Construction"]
+
+WALL_SPACING = 20.0
+WALL_LENGTH = 40.0
+
+
+def make_document(n_elements, seed=0, n_users=12, title=None):
+    rnd = random.Random(seed)
+    doc = db.Document(title or "Synthetic_{}".format(n_elements),
+                      "C:\\Models\\Synthetic_{}.rvt".format(n_elements))
+
+    for i, name in enumerate(WORKSET_NAMES):
+        doc.worksets[i + 1] = db.Workset(i + 1, name)
+    workset_ids = list(doc.worksets)
+
+    users = ["user{:02d}".format(i) for i in range(n_users)]
+
+    phases = [db.Phase(doc, name=name) for name in PHASE_NAMES]
+    phase_ids = [p._id for p in phases]
+
+    levels = []
+    level_cat = doc.category(BIC.OST_Levels)
+    for i in range(10):
+        levels.append(db.Level(doc, elevation=i * 12.0, monitored=bool(i % 2), category=level_cat,
+                               name="Level {}".format(i), workset=workset_ids[-1]))
+
+    view = db.ViewPlan(doc, gen_level=levels[0], category=doc.category(BIC.OST_Views), name="Level 0 Plan")
+    doc.ActiveView = view
+
+    types = {}
+    for bic in MODEL_CATEGORIES:
+        cat = doc.category(bic)
+        types[bic] = [db.FamilySymbol(doc, category=cat, name="Type {}".format(t),
+                                      family_name="{} Family".format(cat.Name),
+                                      params={"SN_Lighting Serial Number": "LF-{:03d}".format(t)}
+                                      if bic == BIC.OST_LightingFixtures else None)
+                      for t in range(4)]
+
+    n_view_specific = n_elements // 10
+    n_model = max(n_elements - n_view_specific, len(MODEL_CATEGORIES))
+    n_walls = max(1, n_model // 10)
+
+    def common(bic):
+        return dict(category=doc.category(bic),
+                    workset=rnd.choice(workset_ids),
+                    phase_created=rnd.choice(phase_ids),
+                    type_id=rnd.choice(types[bic])._id)
+
+    walls, fixtures = [], []
+    for i in range(n_walls):
+        y = (i // 50) * WALL_SPACING
+        x = (i % 50) * (WALL_LENGTH + 5)
+        wall = db.Wall(doc, db.Line(db.XYZ(x, y, 0), db.XYZ(x + WALL_LENGTH, y, 0)),
+                       name="Basic Wall", **common(BIC.OST_Walls))
+        walls.append(wall)
+
+    other_categories = [c for c in MODEL_CATEGORIES if c != BIC.OST_Walls]
+    for i in range(n_model - n_walls):
+        bic = other_categories[i % len(other_categories)]
+        kw = common(bic)
+        if bic in (BIC.OST_ElectricalFixtures, BIC.OST_LightingFixtures):
+            wall = walls[i % n_walls]
+            start = wall.Location.Curve.Origin
+            point = db.XYZ(start.X + rnd.uniform(2, WALL_LENGTH - 2), start.Y + rnd.uniform(2, 8), 0)
+            # Half of the lighting families spell the length parameter differently (case-insensitive fallback)
+            length_name = "SN_Length" if kw["type_id"] % 2 else "SN_length"
+            params = {length_name: rnd.uniform(1, 10)} if bic == BIC.OST_LightingFixtures else None
+            el = db.FamilyInstance(doc, point, name="Fixture", params=params, **kw)
+            if bic == BIC.OST_ElectricalFixtures:
+                fixtures.append((el, wall))
+        else:
+            el = db.Element(doc, name="Element", **kw)
+
+    # View specific content of the active view: half dimensions, half detail lines
+    dim_cat = doc.category(BIC.OST_Dimensions, category_type=db.CategoryType.Annotation)
+    line_cat = doc.category(BIC.OST_Lines, category_type=db.CategoryType.Annotation)
+    for i in range(n_view_specific):
+        x = rnd.uniform(0, 50 * (WALL_LENGTH + 5))
+        y = rnd.uniform(0, (n_walls // 50 + 1) * WALL_SPACING)
+        if i % 2:
+            # Vertical dimension strings, i.e. measuring fixture-to-wall distances
+            el = db.Dimension(doc, db.Line(db.XYZ(x, y, 0), db.XYZ(x, y + 5, 0)), category=dim_cat,
+                              owner_view=view._id, workset=workset_ids[0])
+        else:
+            el = db.DetailLine(doc, db.Line(db.XYZ(x, y, 0), db.XYZ(x + 5, y, 0)), category=line_cat,
+                               owner_view=view._id, workset=workset_ids[0])
+
+    # Users, visibility in the active view
+    for el in list(doc._elements.values()):
+        el.last_changed_by = rnd.choice(users)
+        if el._owner_view == view._id or el._id % 3 == 0:
+            view.visible_ids.add(el._id)
+
+    doc.synthetic = dict(users=users, walls=walls, fixtures=fixtures, levels=levels, phases=phases, types=types)
+    doc._regenerate()
+    doc.sync()
+    return doc
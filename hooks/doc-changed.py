@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+#Imports
+import pytal_index
+
+#Variables
+args = __eventargs__ # Autodesk.Revit.DB.Events.DocumentChangedEventArgs
+
+# Keep the shared element index in sync (no-op for documents that were never indexed)
+pytal_index.apply_changes(args.GetDocument(),
+                          args.GetAddedElementIds(),
+                          args.GetModifiedElementIds(),
+                          args.GetDeletedElementIds())
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+#Imports
+import pytal_index
+
+#Variables
+args = __eventargs__ # Autodesk.Revit.DB.Events.DocumentClosingEventArgs
+
+# Release the shared element index of the closing document
+pytal_index.drop_index(args.Document)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Per-model persistent caches for pyTal buttons.
+
+Caches are stored with pyRevit's script.store_data (one slot per model) next
+to a snapshot of the document version, so a button can later ask which
+elements changed since its last run and re-read only those.
+
+Usage:
+    from pytal_cache import load_cache, save_cache, document_version, changed_since
+    cache = load_cache(doc, "LastChangedBy")
+    changes = changed_since(doc, cache.get("version"))
+Author: Arbel Tal"""
+
+from pyrevit import script, DB
+from System import Guid
+
+from pytal_index import id_value
+
+
+def _slot(doc, name):
+    # store_data(this_project=True) is keyed by the active document; add the
+    # title so caches of linked / background documents do not collide.
+    return "pyTal_{}_{}".format(name, doc.Title)
+
+
+def load_cache(doc, name):
+    """Return the cached dict of doc for name, or {} when there is none (or it is unreadable)."""
+    try:
+        data = script.load_data(_slot(doc, name), this_project=True)
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_cache(doc, name, data):
+    """Persist data (a picklable dict) for doc under name. Returns False if it could not be written."""
+    try:
+        script.store_data(_slot(doc, name), data, this_project=True)
+        return True
+    except Exception:
+        return False
+
+
+def document_version(doc):
+    """Version GUID of doc as a string (Revit 2023+), None when unavailable."""
+    try:
+        return str(DB.Document.GetDocumentVersion(doc).VersionGUID)
+    except Exception:
+        return None
+
+
+def changed_since(doc, version):
+    """Element ids changed since version, as (changed, deleted) sets of ints.
+
+    changed holds created and modified ids. Returns None when the difference
+    cannot be computed (no version, older Revit, version no longer known to
+    the document), in which case callers should rescan everything."""
+    if not version:
+        return None
+    if version == document_version(doc):
+        return set(), set()
+    try:
+        changes = doc.GetChangedElements(Guid(version))
+    except Exception:
+        return None
+    changed = set(id_value(i) for i in changes.GetCreatedElementIds())
+    changed.update(id_value(i) for i in changes.GetModifiedElementIds())
+    deleted = set(id_value(i) for i in changes.GetDeletedElementIds())
+    return changed, deleted
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""Level / grid monitoring audit for a model and its loaded links.
+
+audit_document reads the levels and grids of one document in a single
+collector pass; workset and scope box names come from a NameCache shared by
+every audited document, so each id is resolved once. audit_with_links runs
+the host and every loaded link (each link document once, however many
+instances it has).
+
+audit_folder audits RVT files without the UI: each file is opened detached
+from central with its worksets closed (the levels / grids workset stays
+open), audited and closed again. Rows are appended to one CSV report as
+each file finishes, so an overnight run keeps what it did if it stops.
+While it runs, Revit dialogs are dismissed and failures (warnings, missing
+links...) are answered and recorded, so no prompt waits for a click.
+
+Usage:
+    from pytal_datum import audit_with_links, sort_rows
+    rows = sort_rows(audit_with_links(doc))
+    for row in rows:
+        print(row.model, row.kind, row.name, row.monitored)
+
+    rows, failures = audit_folder(app, find_models(folder), report_path, uiapp=__revit__)
+Author: Arbel Tal"""
+
+import codecs
+import csv
+import io
+import os
+import re
+
+from pyrevit import DB
+from System.Collections.Generic import List
+
+from pytal_index import id_value, INVALID_ID
+
+DATUM_CATEGORIES = [DB.BuiltInCategory.OST_Levels, DB.BuiltInCategory.OST_Grids]
+KIND_ORDER = {"Level": 0, "Grid": 1}
+# Workset the Lock Levels&Grids button moves levels and grids to
+TARGET_WORKSET_NAME = "Shared Levels and Grids"
+REPORT_COLUMNS = ["Model", "Kind", "Name", "Is Monitored", "Pinned", "Elevation", "Workset", "Scope Box"]
+
+
+# ╔═╗╦ ╦╔╦╗╦╔╦╗
+# ╠═╣║ ║ ║║║ ║
+# ╩ ╩╚═╝═╩╝╩ ╩ AUDIT
+#====================================================================================================
+
+
+def _doc_key(doc):
+    return doc.PathName or doc.Title
+
+
+class NameCache(object):
+    """id -> name lookups (worksets, scope boxes) shared by all audited documents."""
+
+    def __init__(self):
+        self._worksets = {}  # doc key -> {workset id: name}
+        self._elements = {}  # (doc key, element id) -> name
+
+    def workset(self, doc, workset_id):
+        if not doc.IsWorkshared:
+            return "-"
+        key = _doc_key(doc)
+        if key not in self._worksets:
+            self._worksets[key] = dict((ws.Id.IntegerValue, ws.Name) for ws in
+                                       DB.FilteredWorksetCollector(doc).OfKind(DB.WorksetKind.UserWorkset))
+        return self._worksets[key].get(workset_id.IntegerValue, "-")
+
+    def element(self, doc, element_id):
+        if element_id is None or id_value(element_id) == INVALID_ID:
+            return "-"
+        key = (_doc_key(doc), id_value(element_id))
+        if key not in self._elements:
+            el = doc.GetElement(element_id)
+            self._elements[key] = el.Name if el else "-"
+        return self._elements[key]
+
+
+class DatumStatus(object):
+    """Audit row of one level or grid."""
+    __slots__ = ("model", "is_link", "kind", "name", "element_id", "monitored", "pinned", "elevation",
+                 "workset", "scope_box")
+
+    def __init__(self, model, is_link, kind, name, element_id, monitored, pinned, elevation, workset, scope_box):
+        self.model = model
+        self.is_link = is_link
+        self.kind = kind
+        self.name = name
+        self.element_id = element_id
+        self.monitored = monitored
+        self.pinned = pinned
+        self.elevation = elevation  # host coordinates (feet), None for grids
+        self.workset = workset
+        self.scope_box = scope_box
+
+
+def datum_elements(doc):
+    """Levels and grids of doc in one collector pass."""
+    cat_filter = DB.ElementMulticategoryFilter(List[DB.BuiltInCategory](DATUM_CATEGORIES))
+    return DB.FilteredElementCollector(doc).WherePasses(cat_filter).WhereElementIsNotElementType()
+
+
+def audit_document(doc, model_name, names, is_link=False, elevation_offset=0.0, elements=None):
+    """DatumStatus rows for the levels and grids of doc (or of the given elements)."""
+    rows = []
+    for el in (elements if elements is not None else datum_elements(doc)):
+        if isinstance(el, DB.Level):
+            kind, elevation = "Level", el.Elevation + elevation_offset
+        elif isinstance(el, DB.Grid):
+            kind, elevation = "Grid", None
+        else:
+            continue
+
+        monitored_ids = el.GetMonitoredLinkElementIds()
+        # Scope box by built-in parameter - LookupParameter("Scope Box") depends on the Revit language
+        sb_param = el.get_Parameter(DB.BuiltInParameter.DATUM_VOLUME_OF_INTEREST)
+        rows.append(DatumStatus(model_name, is_link, kind, el.Name, el.Id,
+                                bool(monitored_ids and len(monitored_ids) > 0), el.Pinned, elevation,
+                                names.workset(doc, el.WorksetId),
+                                names.element(doc, sb_param.AsElementId()) if sb_param else "-"))
+    return rows
+
+
+def loaded_links(doc):
+    """(link document, link instance) of every loaded link, one per link document."""
+    seen = set()
+    links = []
+    for link in DB.FilteredElementCollector(doc).OfClass(DB.RevitLinkInstance):
+        link_doc = link.GetLinkDocument()
+        if link_doc is None or _doc_key(link_doc) in seen:
+            continue
+        seen.add(_doc_key(link_doc))
+        links.append((link_doc, link))
+    return links
+
+
+def audit_with_links(doc, names=None, host_elements=None):
+    """Rows of the host and all loaded links. Link elevations are shifted to host coordinates."""
+    names = names or NameCache()
+    rows = audit_document(doc, doc.Title, names, elements=host_elements)
+    for link_doc, link in loaded_links(doc):
+        offset = link.GetTotalTransform().Origin.Z
+        rows.extend(audit_document(link_doc, link_doc.Title, names, is_link=True, elevation_offset=offset))
+    return rows
+
+
+def natural_key(name):
+    """Sort key that orders "G2" before "G10"."""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", name)]
+
+
+def sort_rows(rows):
+    """Host first, then links by name; levels by elevation, then grids by name."""
+    return sorted(rows, key=lambda r: (r.is_link, r.model.lower(), KIND_ORDER.get(r.kind, 9),
+                                       r.elevation if r.elevation is not None else 0.0, natural_key(r.name)))
+
+
+def report_row(row):
+    """Plain text cells of a DatumStatus, in REPORT_COLUMNS order."""
+    elevation = "{:.2f}".format(row.elevation) if row.elevation is not None else "-"
+    return [row.model, row.kind, row.name, str(row.monitored), str(row.pinned), elevation, row.workset,
+            row.scope_box]
+
+
+def append_report(path, rows):
+    """Append rows to a CSV report (UTF-8 with BOM), writing the header when the file is new."""
+    new_file = not os.path.exists(path)
+    if new_file:
+        with open(path, "wb") as raw:
+            raw.write(codecs.BOM_UTF8)
+    with io.open(path, "a", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(REPORT_COLUMNS)
+        for row in rows:
+            writer.writerow([u"{}".format(value) for value in report_row(row)])
+
+
+# ╔╗ ╔═╗╔╦╗╔═╗╦ ╦
+# ╠╩╗╠═╣ ║ ║  ╠═╣
+# ╚═╝╩ ╩ ╩ ╚═╝╩ ╩ BATCH
+#====================================================================================================
+
+def find_models(folder, recursive=True):
+    """RVT project files under folder, skipping Revit backups (Model.0001.rvt)."""
+    backup = re.compile(r"\.\d{4}\.rvt$", re.IGNORECASE)
+    paths = []
+    for root, dirs, files in os.walk(folder):
+        paths.extend(os.path.join(root, name) for name in files
+                     if name.lower().endswith(".rvt") and not backup.search(name))
+        if not recursive:
+            break
+    return sorted(paths)
+
+
+def open_detached(app, path):
+    """Open path without the UI: detached from central, every workset closed but the levels / grids one.
+
+    Levels and grids are datum elements, Revit loads them even on closed worksets; the
+    TARGET_WORKSET_NAME workset is opened anyway in case a Revit version does not."""
+    model_path = DB.ModelPathUtils.ConvertUserVisiblePathToModelPath(path)
+    options = DB.OpenOptions()
+    options.Audit = False
+    if DB.BasicFileInfo.Extract(path).IsWorkshared:
+        options.DetachFromCentralOption = DB.DetachFromCentralOption.DetachAndPreserveWorksets
+        config = DB.WorksetConfiguration(DB.WorksetConfigurationOption.CloseAllWorksets)
+        datum_worksets = [ws.Id for ws in DB.WorksharingUtils.GetUserWorksetInfo(model_path)
+                          if ws.Name == TARGET_WORKSET_NAME]
+        if datum_worksets:
+            config.Open(List[DB.WorksetId](datum_worksets))
+        options.SetOpenWorksetsConfiguration(config)
+    return app.OpenDocumentFile(model_path, options)
+
+
+class _Unattended(object):
+    """Context manager answering Revit for a batch: dialogs are dismissed (OK) and failures
+    are handled - warnings deleted, errors resolved when Revit offers a resolution.
+
+    Every dialog and failure message is appended to failures as (path, text), path being
+    the file set in .path when it came up."""
+    DIALOG_RESULT = 1  # IDOK / TaskDialogResult.Ok
+
+    def __init__(self, app, uiapp, failures):
+        self.app = app
+        self.uiapp = uiapp
+        self.failures = failures
+        self.path = None
+        # Bound once, so the same delegates are removed again
+        self._dialog_handler = self._on_dialog
+        self._failures_handler = self._on_failures
+
+    def __enter__(self):
+        self.app.FailuresProcessing += self._failures_handler
+        if self.uiapp is not None:
+            self.uiapp.DialogBoxShowing += self._dialog_handler
+        return self
+
+    def __exit__(self, *exc):
+        self.app.FailuresProcessing -= self._failures_handler
+        if self.uiapp is not None:
+            self.uiapp.DialogBoxShowing -= self._dialog_handler
+        return False
+
+    def _on_dialog(self, sender, args):
+        message = getattr(args, "Message", None)  # task dialogs / message boxes only
+        self.failures.append((self.path, u"Dialog dismissed: {}{}".format(
+            args.DialogId, u" - {}".format(message) if message else "")))
+        args.OverrideResult(self.DIALOG_RESULT)
+
+    def _on_failures(self, sender, args):
+        accessor = args.GetFailuresAccessor()
+        resolved = False
+        for message in accessor.GetFailureMessages():
+            warning = message.GetSeverity() == DB.FailureSeverity.Warning
+            self.failures.append((self.path, u"{}: {}".format(
+                "Warning" if warning else "Error", message.GetDescriptionText())))
+            if warning:
+                accessor.DeleteWarning(message)
+            elif message.HasResolutions():
+                accessor.ResolveFailure(message)
+                resolved = True
+        args.SetProcessingResult(DB.FailureProcessingResult.ProceedWithCommit if resolved
+                                 else DB.FailureProcessingResult.Continue)
+
+
+def audit_file(app, path, names=None):
+    """DatumStatus rows of one RVT file; the file is always closed without saving."""
+    model_name = os.path.splitext(os.path.basename(path))[0]
+    doc = open_detached(app, path)
+    try:
+        return audit_document(doc, model_name, names or NameCache())
+    finally:
+        doc.Close(False)
+
+
+def audit_folder(app, paths, report_path=None, on_done=None, is_cancelled=None, uiapp=None):
+    """Audit every file in paths, one at a time. Returns (rows, failures).
+
+    A file that cannot be opened is recorded in failures ([(path, error)]) and the
+    run goes on; so is every dialog (uiapp given) and failure message Revit raised
+    for a file - see _Unattended. on_done(path, error, done, total) is called after
+    each file and is_cancelled() is checked before opening the next one."""
+    rows, failures = [], []
+    with _Unattended(app, uiapp, failures) as unattended:
+        for done, path in enumerate(paths, 1):
+            if is_cancelled and is_cancelled():
+                break
+            unattended.path = path
+            error = None
+            try:
+                # A fresh NameCache per file - detached documents share titles and have no path
+                file_rows = sort_rows(audit_file(app, path))
+            except Exception as e:
+                error = str(e)
+                failures.append((path, error))
+            else:
+                rows.extend(file_rows)
+                if report_path:
+                    append_report(report_path, file_rows)
+            if on_done:
+                on_done(path, error, done, len(paths))
+    return rows, failures
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""Batch insertion of shared parameters into family (.rfa) files.
+
+Each family is opened once for all the chosen parameters: the missing ones
+are added in one transaction, then the family is saved and closed. A family
+that fails is recorded and the batch goes on with the next one.
+
+Every family is written to a checkpoint file next to the families before it
+is opened and again when it is done, so a batch that was cancelled - or
+stopped with Revit - resumes where it stopped. A family Revit stopped on is
+not opened again on resume; it is reported as failed.
+
+FamilyIndex remembers the parameters of every family a batch opened, keyed
+by file size and mtime. A later batch does not open an unchanged family that
+already has all the parameters. Families are only saved when a parameter was
+added, so untouched files keep their timestamp (and their index entry).
+
+Usage:
+    from pytal_family_params import Checkpoint, FamilyIndex, run_batch
+    checkpoint = Checkpoint(folder, definitions, group, is_instance)
+    results = run_batch(app, paths, definitions, group, is_instance, checkpoint, FamilyIndex(folder),
+                        on_done=..., is_cancelled=...)
+Author: Arbel Tal"""
+
+import io
+import json
+import os
+
+from pyrevit import DB
+
+# Family result status
+ADDED = "Added"
+EXISTS = "Already there"
+FAILED = "Failed"
+# Written before a family is opened; replaced by its result when it is done
+STARTED = "Started"
+
+CHECKPOINT_NAME = "_pytal_shared_params_checkpoint.jsonl"
+INDEX_NAME = "_pytal_family_index.json"
+# The index is written every INDEX_SAVE_EVERY opened families and at the end of a batch
+INDEX_SAVE_EVERY = 25
+
+
+class FamilyResult(object):
+    """Outcome of one family file. parameters is (names, GUIDs) of the family after a successful open."""
+    __slots__ = ("path", "status", "added", "message", "parameters")
+
+    def __init__(self, path, status, added=None, message="", parameters=None):
+        self.path = path
+        self.status = status
+        self.added = added or []
+        self.message = message
+        self.parameters = parameters
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    def to_json(self):
+        return {"file": self.name, "status": self.status, "added": self.added, "message": self.message}
+
+
+# ╔═╗╔═╗╔╦╗╦╦ ╦ ╦
+# ╠╣ ╠═╣║║║║║ ╚╦╝
+# ╚  ╩ ╩╩ ╩╩╩═╝╩ FAMILY
+#====================================================================================================
+
+def existing_parameters(family_manager):
+    """(names, shared parameter GUID strings) of the parameters of a family."""
+    names, guids = set(), set()
+    for param in family_manager.Parameters:
+        names.add(param.Definition.Name)
+        if param.IsShared:
+            guids.add(str(param.GUID))
+    return names, guids
+
+
+def missing_definitions(names, guids, definitions):
+    """Definitions a family with these parameter names / GUIDs has neither by GUID nor by name."""
+    return [d for d in definitions if str(d.GUID) not in guids and d.Name not in names]
+
+
+def add_shared_parameters(app, path, definitions, group, is_instance):
+    """Open the family at path, add the missing definitions in one transaction, save (if changed) and close it."""
+    family_doc = app.OpenDocumentFile(path)
+    try:
+        family_manager = family_doc.FamilyManager
+        names, guids = existing_parameters(family_manager)
+        missing = missing_definitions(names, guids, definitions)
+        if missing:
+            with DB.Transaction(family_doc, "Add Shared Parameters to Family") as t:
+                t.Start()
+                for definition in missing:
+                    family_manager.AddParameter(definition, group, is_instance)
+                t.Commit()
+            family_doc.Save()
+            names.update(d.Name for d in missing)
+            guids.update(str(d.GUID) for d in missing)
+    finally:
+        family_doc.Close(False)
+    if missing:
+        return FamilyResult(path, ADDED, [d.Name for d in missing], parameters=(names, guids))
+    return FamilyResult(path, EXISTS, parameters=(names, guids))
+
+
+# ╦╔╗╔╔╦╗╔═╗═╗ ╦
+# ║║║║ ║║║╣ ╔╩╦╝
+# ╩╝╚╝═╩╝╚═╝╩ ╚═ INDEX
+#====================================================================================================
+
+class FamilyIndex(object):
+    """Parameter names / GUIDs of the family files of a folder, in INDEX_NAME inside the folder:
+        {"Door.rfa": {"size": ..., "mtime": ..., "names": [...], "guids": [...]}}
+    An entry is only used while the file keeps its size and mtime."""
+
+    def __init__(self, folder):
+        self.path = os.path.join(folder, INDEX_NAME)
+        self._dirty = False
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (IOError, OSError, ValueError):
+            self.entries = {}
+        if not isinstance(self.entries, dict):
+            self.entries = {}
+
+    def parameters(self, path):
+        """(names, GUIDs) of an unchanged indexed family, or None."""
+        entry = self.entries.get(os.path.basename(path))
+        if not entry:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if (entry.get("size"), entry.get("mtime")) != (stat.st_size, stat.st_mtime):
+            return None
+        return set(entry.get("names", [])), set(entry.get("guids", []))
+
+    def has_all(self, path, definitions):
+        """True if the family is unchanged since it was indexed and has every definition."""
+        parameters = self.parameters(path)
+        return parameters is not None and not missing_definitions(parameters[0], parameters[1], definitions)
+
+    def record(self, path, names, guids):
+        stat = os.stat(path)
+        self.entries[os.path.basename(path)] = {"size": stat.st_size, "mtime": stat.st_mtime,
+                                                "names": sorted(names), "guids": sorted(guids)}
+        self._dirty = True
+
+    def save(self):
+        """Write the index if it changed. A folder that is not writable is skipped (nothing is indexed there)."""
+        if not self._dirty:
+            return
+        try:
+            with open(self.path, "w") as f:
+                json.dump(self.entries, f, indent=1, sort_keys=True)
+        except (IOError, OSError):
+            pass
+        self._dirty = False
+
+
+# ╔═╗╦ ╦╔═╗╔═╗╦╔═╔═╗╔═╗╦╔╗╔╔╦╗
+# ║  ╠═╣║╣ ║  ╠╩╗╠═╝║ ║║║║║ ║
+# ╚═╝╩ ╩╚═╝╚═╝╩ ╩╩  ╚═╝╩╝╚╝ ╩ CHECKPOINT
+#====================================================================================================
+
+class Checkpoint(object):
+    """Progress of one batch in CHECKPOINT_NAME inside the family folder.
+
+    The first line identifies the batch (parameter GUIDs, group, instance / type),
+    every other line is one family entry; lines are only appended, so a crash
+    loses at most the line being written. A checkpoint of another batch is ignored
+    and replaced on the first record. In a folder that is not writable the batch runs
+    on without one (entries are only kept in memory)."""
+
+    def __init__(self, folder, definitions, group, is_instance):
+        self.path = os.path.join(folder, CHECKPOINT_NAME)
+        self.batch = {"parameters": sorted(str(d.GUID) for d in definitions),
+                      "group": str(group), "instance": bool(is_instance)}
+        self.entries = self._load()  # file name -> last entry
+        self._started = bool(self.entries)
+
+    def _load(self):
+        try:
+            with io.open(self.path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except (IOError, OSError):
+            return {}
+        try:
+            if json.loads(lines[0]) != self.batch:
+                return {}
+        except (IndexError, ValueError):
+            return {}
+        entries = {}
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # cut by a crash
+            entries[entry["file"]] = entry
+        return entries
+
+    def _append(self, entry):
+        self.entries[entry["file"]] = entry
+        mode = "a" if self._started else "w"
+        try:
+            with io.open(self.path, mode, encoding="utf-8") as f:
+                if not self._started:
+                    f.write(u"{}\n".format(json.dumps(self.batch)))
+                f.write(u"{}\n".format(json.dumps(entry)))
+        except (IOError, OSError):
+            return
+        self._started = True
+
+    def is_done(self, path):
+        return os.path.basename(path) in self.entries
+
+    def result(self, path):
+        """FamilyResult recorded for path by an earlier run."""
+        entry = self.entries[os.path.basename(path)]
+        if entry["status"] == STARTED:
+            return FamilyResult(path, FAILED, message="Revit stopped while processing this family")
+        return FamilyResult(path, entry["status"], entry.get("added"), entry.get("message", ""))
+
+    def start(self, path):
+        self._append({"file": os.path.basename(path), "status": STARTED})
+
+    def record(self, result):
+        self._append(result.to_json())
+
+    def clear(self):
+        """Delete the checkpoint (the batch finished)."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.entries = {}
+        self._started = False
+
+
+# ╔╗ ╔═╗╔╦╗╔═╗╦ ╦
+# ╠╩╗╠═╣ ║ ║  ╠═╣
+# ╚═╝╩ ╩ ╩ ╚═╝╩ ╩ BATCH
+#====================================================================================================
+
+def run_batch(app, paths, definitions, group, is_instance, checkpoint=None, index=None, on_done=None,
+              is_cancelled=None):
+    """Add definitions to every family of paths. Returns a FamilyResult per family reached, in paths order.
+
+    Families already in the checkpoint are not opened again - their recorded result
+    is returned; neither are unchanged families the index knows to have every
+    definition. on_done(result, done, total) is called after each family and
+    is_cancelled() is checked before opening the next one."""
+    results = []
+    opened = 0
+    try:
+        for done, path in enumerate(paths, 1):
+            if checkpoint and checkpoint.is_done(path):
+                result = checkpoint.result(path)
+            elif index and index.has_all(path, definitions):
+                result = FamilyResult(path, EXISTS, message="Unchanged since it was last indexed - not opened")
+            else:
+                if is_cancelled and is_cancelled():
+                    break
+                if checkpoint:
+                    checkpoint.start(path)
+                try:
+                    result = add_shared_parameters(app, path, definitions, group, is_instance)
+                except Exception as e:
+                    result = FamilyResult(path, FAILED, message=str(e))
+                if checkpoint:
+                    checkpoint.record(result)
+                if index and result.parameters:
+                    index.record(path, *result.parameters)
+                opened += 1
+                if index and opened % INDEX_SAVE_EVERY == 0:
+                    index.save()
+            results.append(result)
+            if on_done:
+                on_done(result, done, len(paths))
+    finally:
+        if index:
+            index.save()
+    return results
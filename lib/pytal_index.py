@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""Cached per-document element indexes shared by all pyTal buttons.
+
+The first call to get_index(doc) walks the document once and buckets every
+non-type element by category, class, workset, phase created / demolished,
+type and owner view. The index is kept in the AppDomain so every button (and
+every pyRevit engine) reuses it, and the doc-changed / doc-closing hooks keep
+it in sync with the model.
+
+The index also journals which ids changed at which revision, for readers
+that refresh incrementally (see run_takeoff). A reader calls
+checkpoint(name) once it is up to date; the journal keeps only the changes
+some reader has not read yet.
+
+Usage:
+    from pytal_index import get_index
+    index = get_index(doc)
+    for el in index.elements(doc, category=BuiltInCategory.OST_Doors):
+        ...
+Author: Arbel Tal"""
+
+import uuid
+from collections import defaultdict
+
+from pyrevit import DB
+from System import AppDomain
+from System.Collections.Generic import List
+
+# AppDomain slot holding {document key: ElementIndex}
+INDEX_SLOT = "PYTAL_ELEMENT_INDEX"
+
+# Index dimensions, in the order they are stored per element
+KEYS = ("category", "class", "workset", "phase_created", "phase_demolished", "type", "view")
+
+INVALID_ID = -1
+
+
+# ╦ ╦╔═╗╦  ╔═╗╔═╗╦═╗╔═╗
+# ╠═╣║╣ ║  ╠═╝║╣ ╠╦╝╚═╗
+# ╩ ╩╚═╝╩═╝╩  ╚═╝╩╚═╚═╝ HELPERS
+#====================================================================================================
+
+def id_value(element_id):
+    """Integer value of an ElementId (Revit 2024+ uses .Value, older versions .IntegerValue)."""
+    try:
+        return element_id.Value
+    except AttributeError:
+        return element_id.IntegerValue
+
+
+def to_element_id(value):
+    """Build an ElementId from an int across Revit versions."""
+    try:
+        return DB.ElementId(value)
+    except TypeError:
+        return DB.ElementId(int(value))
+
+
+def _key_value(value):
+    """Normalize a query value (ElementId, WorksetId, BuiltInCategory, type, int, str) to the stored key."""
+    if isinstance(value, type):
+        return value.__name__
+    if isinstance(value, DB.BuiltInCategory):
+        return int(value)
+    if isinstance(value, DB.WorksetId):
+        return value.IntegerValue
+    if isinstance(value, DB.ElementId):
+        return id_value(value)
+    return value
+
+
+def _doc_key(doc):
+    return doc.PathName or doc.Title
+
+
+def _get_store():
+    store = AppDomain.CurrentDomain.GetData(INDEX_SLOT)
+    if store is None:
+        store = {}
+        AppDomain.CurrentDomain.SetData(INDEX_SLOT, store)
+    return store
+
+
+# ╔═╗╦  ╔═╗╔═╗╔═╗
+# ║  ║  ╠═╣╚═╗╚═╗
+# ╚═╝╩═╝╩ ╩╚═╝╚═╝ CLASS
+#====================================================================================================
+
+class ElementIndex(object):
+    """Element ids of one document bucketed by category, class, workset, phase, type and view."""
+
+    def __init__(self, doc):
+        self.is_workshared = doc.IsWorkshared
+        self.buckets = dict((k, defaultdict(set)) for k in KEYS)
+        self.keys_by_id = {}
+        # Change journal of this session (types included): id -> revision of its last change.
+        # Only kept for readers (see checkpoint); revisions up to journal_start are trimmed.
+        self.session = str(uuid.uuid4())
+        self.revision = 0
+        self.changed_at = {}
+        self.journal_start = 0
+        self.readers = {}  # reader name -> revision it last read up to
+
+        collector = DB.FilteredElementCollector(doc).WhereElementIsNotElementType()
+        for el in collector:
+            self._add(el)
+
+    def _element_keys(self, el):
+        cat = el.Category
+        workset = el.WorksetId.IntegerValue if self.is_workshared else None
+        return (id_value(cat.Id) if cat else None,
+                type(el).__name__,
+                workset,
+                id_value(el.CreatedPhaseId),
+                id_value(el.DemolishedPhaseId),
+                id_value(el.GetTypeId()),
+                id_value(el.OwnerViewId))
+
+    def _add(self, el):
+        el_id = id_value(el.Id)
+        keys = self._element_keys(el)
+        self.keys_by_id[el_id] = keys
+        for name, key in zip(KEYS, keys):
+            self.buckets[name][key].add(el_id)
+
+    def _remove(self, el_id):
+        keys = self.keys_by_id.pop(el_id, None)
+        if keys is None:
+            return
+        for name, key in zip(KEYS, keys):
+            bucket = self.buckets[name].get(key)
+            if bucket is not None:
+                bucket.discard(el_id)
+
+    def update(self, doc, added_ids, modified_ids, deleted_ids):
+        """Apply a DocumentChanged delta (collections of ElementId)."""
+        self.revision += 1
+        if not self.readers:
+            # Nobody reads the journal: a reader that starts later reads everything first anyway
+            self.journal_start = self.revision
+        else:
+            for el_id in list(added_ids) + list(modified_ids) + list(deleted_ids):
+                self.changed_at[id_value(el_id)] = self.revision
+        for el_id in deleted_ids:
+            self._remove(id_value(el_id))
+        for el_id in list(added_ids) + list(modified_ids):
+            self._remove(id_value(el_id))
+            el = doc.GetElement(el_id)
+            if el is not None and not isinstance(el, DB.ElementType):
+                self._add(el)
+
+    def changed_since(self, revision):
+        """Ids (ints, types included) added, modified or deleted after revision of this session.
+
+        None when the journal no longer goes back to revision - the caller reads everything."""
+        if revision < self.journal_start:
+            return None
+        return set(el_id for el_id, rev in self.changed_at.items() if rev > revision)
+
+    def checkpoint(self, reader):
+        """Record that reader is up to date with the current revision and trim the journal
+        to what the readers still need (changes after the oldest reader revision)."""
+        self.readers[reader] = self.revision
+        oldest = min(self.readers.values())
+        if oldest > self.journal_start:
+            self.changed_at = dict((el_id, rev) for el_id, rev in self.changed_at.items() if rev > oldest)
+            self.journal_start = oldest
+
+    def ids(self, **criteria):
+        """Integer ids matching all given criteria, e.g. ids(category=..., workset=...).
+
+        Valid criteria are the names in KEYS ('cls' is accepted for 'class').
+        Without criteria every indexed id is returned."""
+        if "cls" in criteria:
+            criteria["class"] = criteria.pop("cls")
+        result = None
+        # Intersect the smallest buckets first
+        buckets = []
+        for name, value in criteria.items():
+            if name not in self.buckets:
+                raise KeyError("Unknown index key: {}".format(name))
+            buckets.append(self.buckets[name].get(_key_value(value), set()))
+        for bucket in sorted(buckets, key=len):
+            result = set(bucket) if result is None else result & bucket
+            if not result:
+                break
+        if result is None:
+            result = set(self.keys_by_id)
+        return result
+
+    def element_ids(self, **criteria):
+        """Matching ids as a List[ElementId], ready for Selection.SetElementIds or collectors."""
+        return List[DB.ElementId]([to_element_id(i) for i in self.ids(**criteria)])
+
+    def elements(self, doc, **criteria):
+        """Yield matching elements, skipping ids that no longer resolve."""
+        for el_id in self.ids(**criteria):
+            el = doc.GetElement(to_element_id(el_id))
+            if el is not None:
+                yield el
+
+    def values(self, name):
+        """Distinct keys currently present for one dimension (e.g. all category ids)."""
+        return [k for k, v in self.buckets[name].items() if v]
+
+    def __len__(self):
+        return len(self.keys_by_id)
+
+
+# ╔╦╗╔═╗╦╔╗╔
+# ║║║╠═╣║║║║
+# ╩ ╩╩ ╩╩╝╚╝ MAIN
+#====================================================================================================
+
+def get_index(doc, rebuild=False):
+    """Return the cached ElementIndex of doc, building it on first use (or when rebuild=True)."""
+    store = _get_store()
+    key = _doc_key(doc)
+    index = store.get(key)
+    if index is None or rebuild:
+        old_index = index
+        index = ElementIndex(doc)
+        if old_index is not None:
+            # Keep the change journal, so callers tracking changes by revision are not reset
+            index.session, index.revision, index.changed_at = (old_index.session, old_index.revision,
+                                                               old_index.changed_at)
+            index.journal_start, index.readers = old_index.journal_start, old_index.readers
+        store[key] = index
+    return index
+
+
+def has_index(doc):
+    return _doc_key(doc) in _get_store()
+
+
+def apply_changes(doc, added_ids, modified_ids, deleted_ids):
+    """Update the index of doc with a DocumentChanged delta. No-op when doc was never indexed."""
+    index = _get_store().get(_doc_key(doc))
+    if index is not None:
+        index.update(doc, added_ids, modified_ids, deleted_ids)
+
+
+def drop_index(doc):
+    """Forget the index of doc (called when the document closes)."""
+    _get_store().pop(_doc_key(doc), None)
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""Closed loops from loose curves (detail lines, exploded CAD) for filled regions.
+
+chain_loops joins curves end to end through a hash of their endpoints
+quantised to a tolerance, so each curve end is looked up once - O(n) for any
+number of curves, in any order and drawn in any direction. Curves drawn the
+other way round are reversed, so every loop runs head to tail. Stubs, ticks
+and stray lines (a curve with an end no other curve reaches, repeatedly) are
+set aside first, so a walk never turns into one; these and the other curves
+that do not close a loop are returned apart.
+
+nest_loops sorts the loops into outer boundaries and holes by containment in
+the view plane: a loop inside an odd number of loops is a hole of the
+smallest loop around it, a loop inside a hole is an outer boundary again.
+
+boundary_loops reads the boundary of a room or area as Loops, to nest and
+fill the same way.
+
+Usage:
+    from pytal_loops import chain_loops, nest_loops, curve_loop
+    loops, open_indices = chain_loops([line.GeometryCurve for line in lines])
+    for outer, holes in nest_loops(loops, view.RightDirection, view.UpDirection):
+        loops = [curve_loop(loop.curves) for loop in [outer] + holes]
+        FilledRegion.Create(doc, type_id, view.Id, loops)
+Author: Arbel Tal"""
+
+import math
+from collections import defaultdict, deque
+
+from pyrevit import DB
+
+# Curve ends closer than this (feet) are joined. Below Revit's vertex tolerance
+# (~0.0005 ft), so the chained loops are accepted by CurveLoop.
+TOLERANCE = 1e-4
+
+# A loop whose bounding box covers more grid cells than this is tested against every loop
+MAX_CELLS = 64
+
+# The quantised cell of a point and its neighbours, so ends on both sides of a cell border still meet
+_NEIGHBOURS = [(0, 0, 0)] + [(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)
+                             if (x, y, z) != (0, 0, 0)]
+
+
+class Loop(object):
+    """A closed chain: curves head to tail, indices of the source curves (same order)."""
+    __slots__ = ("curves", "indices")
+
+    def __init__(self, curves, indices):
+        self.curves = curves
+        self.indices = indices
+
+
+# ╔═╗╦ ╦╔═╗╦╔╗╔
+# ║  ╠═╣╠═╣║║║║
+# ╚═╝╩ ╩╩ ╩╩╝╚╝ CHAIN
+#====================================================================================================
+
+def _key(point, tolerance):
+    return int(round(point.X / tolerance)), int(round(point.Y / tolerance)), int(round(point.Z / tolerance))
+
+
+def _is_near(a, b, tolerance):
+    return abs(a.X - b.X) <= tolerance and abs(a.Y - b.Y) <= tolerance and abs(a.Z - b.Z) <= tolerance
+
+
+class _PointHash(object):
+    """Points by quantised cell: add(point, value), find(point, accept) -> first accepted value near point,
+    find_all(point) -> every value near point."""
+
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        self.cells = defaultdict(list)
+
+    def add(self, point, value):
+        self.cells[_key(point, self.tolerance)].append((point, value))
+
+    def find(self, point, accept=None):
+        kx, ky, kz = _key(point, self.tolerance)
+        for dx, dy, dz in _NEIGHBOURS:
+            for other, value in self.cells.get((kx + dx, ky + dy, kz + dz), ()):
+                if _is_near(point, other, self.tolerance) and (accept is None or accept(value)):
+                    return value
+        return None
+
+    def find_all(self, point):
+        kx, ky, kz = _key(point, self.tolerance)
+        return [value for dx, dy, dz in _NEIGHBOURS
+                for other, value in self.cells.get((kx + dx, ky + dy, kz + dz), ())
+                if _is_near(point, other, self.tolerance)]
+
+
+def _dangling(curves, ends):
+    """Indices of the curves that cannot be part of a loop: a curve with an end no other curve end
+    reaches (a stub, a tick, a stray line), then the curves left dangling without it, and so on."""
+    near = {}  # (curve index, end) -> the other curve ends at the same point
+    for i, curve in enumerate(curves):
+        for at in (0, 1):
+            near[(i, at)] = [value for value in ends.find_all(curve.GetEndPoint(at)) if value != (i, at)]
+    degree = dict((end, len(others)) for end, others in near.items())
+    removed = set()
+    stack = [i for i in range(len(curves)) if not degree[(i, 0)] or not degree[(i, 1)]]
+    while stack:
+        i = stack.pop()
+        if i in removed:
+            continue
+        removed.add(i)
+        for at in (0, 1):
+            for other in near[(i, at)]:
+                degree[other] -= 1
+                if not degree[other] and other[0] not in removed:
+                    stack.append(other[0])
+    return removed
+
+
+def chain_loops(curves, tolerance=TOLERANCE):
+    """(loops, open indices) of curves: the closed Loops they form and the indices of the other curves.
+
+    Dangling curves are set aside before chaining. A chain that runs into a loop (a bridge
+    drawn onto a closed outline) keeps the loop and frees the curves before it, to be chained
+    again from another start; a chain that ends nowhere leaves its last curve (whose end
+    meets no free curve) open and frees the others the same way."""
+    ends = _PointHash(tolerance)
+    for i, curve in enumerate(curves):
+        ends.add(curve.GetEndPoint(0), (i, 0))
+        ends.add(curve.GetEndPoint(1), (i, 1))
+
+    used = _dangling(curves, ends)
+    is_free = lambda value: value[0] not in used
+    loops, open_indices = [], list(used)
+    pending = deque(range(len(curves)))
+    while pending:
+        first = pending.popleft()
+        if first in used:
+            continue
+        used.add(first)
+        chain, indices = [curves[first]], [first]
+        starts = _PointHash(tolerance)  # start point of every chain curve -> its position
+        starts.add(curves[first].GetEndPoint(0), 0)
+        while True:
+            end = chain[-1].GetEndPoint(1)
+            closes_at = starts.find(end)
+            if closes_at is not None:
+                loops.append(Loop(chain[closes_at:], indices[closes_at:]))
+                freed = indices[:closes_at]
+                break
+            match = ends.find(end, is_free)
+            if match is None:
+                open_indices.append(indices[-1])
+                freed = indices[:-1]
+                break
+            i, at = match
+            used.add(i)
+            starts.add(end, len(chain))
+            chain.append(curves[i] if at == 0 else curves[i].CreateReversed())
+            indices.append(i)
+        # Every walk closes a loop or leaves its last curve open, so freeing the rest always ends
+        used.difference_update(freed)
+        pending.extendleft(reversed(freed))
+    return loops, sorted(open_indices)
+
+
+def boundary_loops(spatial_element, options):
+    """Loops of the boundary of a room / area ([] when it is not placed or not enclosed)."""
+    loops = []
+    for segments in spatial_element.GetBoundarySegments(options) or []:
+        curves = [segment.GetCurve() for segment in segments]
+        if curves:
+            loops.append(Loop(curves, []))
+    return loops
+
+
+def curve_loop(curves):
+    """DB.CurveLoop of the head to tail curves of a loop.
+
+    Ends chained within the tolerance may be a little apart; lines are rebuilt to start
+    exactly where the previous curve ends (other curves are kept as they are)."""
+    joints = []  # start of every curve = end of the one before
+    for j, curve in enumerate(curves):
+        previous = curves[j - 1]
+        joints.append(previous.GetEndPoint(1) if not isinstance(previous, DB.Line) else curve.GetEndPoint(0))
+    loop = DB.CurveLoop()
+    for j, curve in enumerate(curves):
+        if isinstance(curve, DB.Line):
+            start, end = joints[j], joints[(j + 1) % len(curves)]
+            if not (start.IsAlmostEqualTo(curve.GetEndPoint(0)) and end.IsAlmostEqualTo(curve.GetEndPoint(1))):
+                curve = DB.Line.CreateBound(start, end)
+        loop.Append(curve)
+    return loop
+
+
+# ╔╗╔╔═╗╔═╗╔╦╗
+# ║║║║╣ ╚═╗ ║
+# ╝╚╝╚═╝╚═╝ ╩ NEST
+#====================================================================================================
+
+class _Shape(object):
+    """2D outline of a loop in the plane of right / up: points, bounding box, area."""
+    __slots__ = ("loop", "points", "box", "area")
+
+    def __init__(self, loop, right, up):
+        self.loop = loop
+        self.points = []
+        for curve in loop.curves:
+            # Tessellated points of each curve, without its end (the start of the next curve)
+            self.points.extend((p.DotProduct(right), p.DotProduct(up)) for p in list(curve.Tessellate())[:-1])
+        us = [u for u, _ in self.points]
+        vs = [v for _, v in self.points]
+        self.box = (min(us), min(vs), max(us), max(vs))
+        self.area = abs(sum(u0 * v1 - u1 * v0 for (u0, v0), (u1, v1) in
+                            zip(self.points, self.points[1:] + self.points[:1]))) / 2.0
+
+    def contains(self, other):
+        """True if other lies inside this outline (tested on its first point, after the bounding boxes)."""
+        box, other_box = self.box, other.box
+        if other_box[0] < box[0] or other_box[1] < box[1] or other_box[2] > box[2] or other_box[3] > box[3]:
+            return False
+        u, v = other.points[0]
+        inside = False
+        for (u0, v0), (u1, v1) in zip(self.points, self.points[1:] + self.points[:1]):
+            if (v0 > v) != (v1 > v) and u < u0 + (v - v0) * (u1 - u0) / (v1 - v0):
+                inside = not inside
+        return inside
+
+
+class _BoxGrid(object):
+    """Shapes by the grid cells their bounding box covers. around(u, v) returns the shapes whose
+    box may contain (u, v); shapes covering more than MAX_CELLS cells are always returned."""
+
+    def __init__(self, shapes):
+        sizes = sorted(max(s.box[2] - s.box[0], s.box[3] - s.box[1]) for s in shapes)
+        self.cell = (sizes[len(sizes) // 2] if sizes else 0) or 1.0
+        self.cells = defaultdict(list)
+        self.large = []
+        for shape in shapes:
+            u0, v0 = self._cell(shape.box[0], shape.box[1])
+            u1, v1 = self._cell(shape.box[2], shape.box[3])
+            if (u1 - u0 + 1) * (v1 - v0 + 1) > MAX_CELLS:
+                self.large.append(shape)
+                continue
+            for cu in range(u0, u1 + 1):
+                for cv in range(v0, v1 + 1):
+                    self.cells[(cu, cv)].append(shape)
+
+    def _cell(self, u, v):
+        return int(math.floor(u / self.cell)), int(math.floor(v / self.cell))
+
+    def around(self, u, v):
+        return self.cells.get(self._cell(u, v), []) + self.large
+
+
+def nest_loops(loops, right, up):
+    """[(outer Loop, [hole Loops])] of closed loops lying in the plane of right / up (a view's directions).
+
+    A loop inside an even number of loops (0, 2...) is an outer boundary; one inside an odd
+    number is a hole of the smallest loop around it."""
+    shapes = sorted((_Shape(loop, right, up) for loop in loops), key=lambda s: -s.area)
+    grid = _BoxGrid(shapes)
+    depth = {}
+    regions = []
+    holes = {}  # outer shape -> its holes
+    for shape in shapes:  # largest first: a loop's containers are placed before it
+        parent = None
+        for other in grid.around(*shape.points[0]):
+            if other is not shape and other.area > shape.area and other in depth and other.contains(shape) and \
+                    (parent is None or other.area < parent.area):
+                parent = other
+        depth[shape] = 0 if parent is None else depth[parent] + 1
+        if depth[shape] % 2:
+            holes[parent].append(shape.loop)
+        else:
+            holes[shape] = []
+            regions.append((shape.loop, holes[shape]))
+    return regions
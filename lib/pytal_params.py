@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""Parameter lookup by name, resolved once per element type.
+
+LookupParameter(name) is case sensitive, and the usual fallback - looping
+over elem.Parameters comparing names - costs a full parameter walk per
+element. ParameterResolver does that walk once per (type, name), remembers
+how the parameter is identified (shared GUID, built-in parameter or exact
+name) and reads every other element of the type directly with get_Parameter
+/ LookupParameter. Misses are remembered too.
+
+shared_parameter_index(path) parses a shared parameter file once and keeps
+it (per Revit session) until the file changes: GUID -> name / group and
+name -> GUIDs lookups without walking every group and definition.
+
+Usage:
+    from pytal_params import ParameterResolver
+    resolver = ParameterResolver()
+    p = resolver.get(element, "SN_Length")   # Parameter or None
+
+    spf = shared_parameter_index(app.SharedParametersFilename)
+    entry = spf.get(guid)                     # SharedParameterEntry or None
+    definition = spf.definition(app.OpenSharedParameterFile(), guid)
+Author: Arbel Tal"""
+
+import codecs
+import os
+
+from pyrevit import DB
+from System import AppDomain
+
+from pytal_index import id_value, INVALID_ID
+
+# How a resolved parameter is read again
+BY_GUID = "guid"
+BY_BUILT_IN = "built_in"
+BY_NAME = "name"
+
+SHARED_FILE_SLOT = "PYTAL_SHARED_PARAMETER_FILES"
+
+
+def find_parameter(elem, name):
+    """Parameter of elem called name: exact LookupParameter first, then a case-insensitive walk."""
+    p = elem.LookupParameter(name)
+    if p:
+        return p
+    lower = name.lower()
+    for param in elem.Parameters:
+        if param.Definition.Name.lower() == lower:
+            return param
+    return None
+
+
+class ParameterResolver(object):
+    """Caches, per element type and parameter name, how to read the parameter.
+
+    Elements of the same type come from the same family, so they share their
+    parameter definitions; type elements and untyped elements are resolved per
+    element. Keep one resolver per run - it is not updated when parameters are
+    added to the model."""
+
+    def __init__(self):
+        self._resolved = {}  # (owner key, name) -> (BY_*, key) or None
+
+    @staticmethod
+    def _owner(elem):
+        type_id = id_value(elem.GetTypeId())
+        if type_id != INVALID_ID:
+            return "type", type_id
+        return "element", id_value(elem.Id)
+
+    @staticmethod
+    def _how(param):
+        if param.IsShared:
+            return BY_GUID, param.GUID
+        definition = param.Definition
+        built_in = getattr(definition, "BuiltInParameter", DB.BuiltInParameter.INVALID)
+        if built_in != DB.BuiltInParameter.INVALID:
+            return BY_BUILT_IN, built_in
+        return BY_NAME, definition.Name
+
+    def get(self, elem, name):
+        """Parameter of elem called name (case-insensitive), or None."""
+        key = (self._owner(elem), name)
+        if key not in self._resolved:
+            param = find_parameter(elem, name)
+            self._resolved[key] = self._how(param) if param else None
+            return param
+
+        how = self._resolved[key]
+        if how is None:
+            return None
+        if how[0] == BY_NAME:
+            return elem.LookupParameter(how[1])
+        return elem.get_Parameter(how[1])
+
+
+# ╔═╗╦ ╦╔═╗╦═╗╔═╗╔╦╗  ╔═╗╦╦  ╔═╗
+# ╚═╗╠═╣╠═╣╠╦╝║╣  ║║  ╠╣ ║║  ║╣
+# ╚═╝╩ ╩╩ ╩╩╚═╚═╝═╩╝  ╚  ╩╩═╝╚═╝ SHARED PARAMETER FILE
+#====================================================================================================
+
+class SharedParameterEntry(object):
+    """One PARAM line of a shared parameter file."""
+    __slots__ = ("guid", "name", "group", "data_type", "description")
+
+    def __init__(self, guid, name, group, data_type="", description=""):
+        self.guid = guid
+        self.name = name
+        self.group = group
+        self.data_type = data_type
+        self.description = description
+
+
+def _read_text(path):
+    """Shared parameter files are UTF-16 (as Revit writes them) or UTF-8."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    if raw.startswith(codecs.BOM_UTF16_LE) or raw.startswith(codecs.BOM_UTF16_BE):
+        return raw.decode("utf-16")
+    return raw.decode("utf-8-sig", "replace")
+
+
+def parse_shared_parameter_file(path):
+    """SharedParameterEntry list of a shared parameter file. Columns are read from the *PARAM header."""
+    groups = {}
+    param_columns = ["GUID", "NAME", "DATATYPE", "DATACATEGORY", "GROUP"]
+    entries = []
+    for line in _read_text(path).splitlines():
+        cells = line.split("\t")
+        if cells[0] == "*PARAM":
+            param_columns = cells[1:]
+        elif cells[0] == "GROUP" and len(cells) >= 3:
+            groups[cells[1]] = cells[2]
+        elif cells[0] == "PARAM":
+            values = dict(zip(param_columns, cells[1:]))
+            if values.get("GUID") and values.get("NAME"):
+                entries.append(SharedParameterEntry(values["GUID"].lower(), values["NAME"],
+                                                    groups.get(values.get("GROUP"), ""),
+                                                    values.get("DATATYPE", ""), values.get("DESCRIPTION", "")))
+    return entries
+
+
+class SharedParameterIndex(object):
+    """Entries of one shared parameter file by GUID (lowercase string) and by name."""
+
+    def __init__(self, path, entries, stamp=None):
+        self.path = path
+        self.stamp = stamp
+        self.by_guid = dict((e.guid, e) for e in entries)
+        self.by_name = {}
+        for entry in entries:
+            self.by_name.setdefault(entry.name, []).append(entry)
+
+    def get(self, guid):
+        return self.by_guid.get(str(guid).lower())
+
+    def named(self, name):
+        """Entries called name - more than one when groups reuse a name with different GUIDs."""
+        return self.by_name.get(name, [])
+
+    def definition(self, definition_file, guid):
+        """ExternalDefinition of guid in the opened definition_file (group / name lookup), or None."""
+        entry = self.get(guid)
+        if entry is None:
+            return None
+        group = definition_file.Groups.get_Item(entry.group)
+        definition = group.Definitions.get_Item(entry.name) if group else None
+        if definition is not None and str(definition.GUID).lower() == entry.guid:
+            return definition
+        return None
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime
+
+
+def shared_parameter_index(path):
+    """SharedParameterIndex of path, parsed once per Revit session and again when the file changes."""
+    store = AppDomain.CurrentDomain.GetData(SHARED_FILE_SLOT)
+    if store is None:
+        store = {}
+        AppDomain.CurrentDomain.SetData(SHARED_FILE_SLOT, store)
+    key = os.path.normcase(os.path.abspath(path))
+    stamp = _file_stamp(path)
+    index = store.get(key)
+    if index is None or index.stamp != stamp:
+        index = SharedParameterIndex(path, parse_shared_parameter_file(path), stamp)
+        store[key] = index
+    return index
@@ -0,0 +1,631 @@
+# -*- coding: utf-8 -*-
+"""PDF compression engine for Shrink PDF (no Revit / pyRevit imports).
+
+A backend turns (input, output, dpi, quality) into a command line; jobs run
+as a bounded queue of those processes. The same code runs inside Revit
+(Shrink PDF button) and headless on a batch server:
+
+    python lib/pytal_pdf.py --dpi 144 --quality 75 --workers 8 "\\\\server\\issue\\sheets"
+
+Usage:
+    from pytal_pdf import available_backends, pick_fastest_backend, CompressJob, run_queue
+    backend = pick_fastest_backend(sample_pdf, 144, 75)
+    jobs = [CompressJob(path) for path in pdfs]
+    run_queue(jobs, backend, 144, 75, workers=3, on_progress=..., is_cancelled=...)
+
+Files whose content and profile did not change since the last run are skipped
+with SkipCache (one manifest per user, never in the input folders). Very large files are split
+into page chunks by plan_tasks (backends supporting page ranges only), the
+chunks run through the same queue and are merged at the end, so memory use
+is bounded by the number of workers, not by the size of the set.
+Author: Arbel Tal"""
+
+from __future__ import print_function
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+POLL_INTERVAL = 0.2  # seconds between checks of the running processes
+MANIFEST_NAME = "pyTal_ShrinkManifest.json"  # in the user's application data (default_manifest_path)
+STREAM_THRESHOLD_MB = 200  # files at least this big are compressed in page chunks
+CHUNK_PAGES = 50           # pages per chunk
+
+# Job status values (errors are free text)
+DONE = "Done"
+UNCHANGED = "Unchanged"
+
+
+def _which(names):
+    """First executable of names found on PATH, or None."""
+    for folder in os.environ.get("PATH", "").split(os.pathsep):
+        for name in names:
+            path = os.path.join(folder.strip('"'), name)
+            if os.path.isfile(path) and os.access(path, os.X_OK):
+                return path
+    return None
+
+
+def default_workers():
+    """Processes to run at once - leave one core for Revit / the OS."""
+    try:
+        import multiprocessing
+        cores = multiprocessing.cpu_count()
+    except (ImportError, NotImplementedError):  # no multiprocessing (IronPython) / core count unknown
+        cores = int(os.environ.get("NUMBER_OF_PROCESSORS", "2"))
+    return max(1, min(4, cores - 1))
+
+
+# ╔╗ ╔═╗╔═╗╦╔═╔═╗╔╗╔╔╦╗╔═╗
+# ╠╩╗╠═╣║  ╠╩╗║╣ ║║║ ║║╚═╗
+# ╚═╝╩ ╩╚═╝╩ ╩╚═╝╝╚╝═╩╝╚═╝ BACKENDS
+#====================================================================================================
+
+class CompressBackend(object):
+    """Base class: a command line tool that compresses one PDF into another.
+
+    Backends define command(input_path, output_path, dpi, quality, pages=None). Backends with
+    supports_pages = True also take a page range there and define page_count(path) and
+    merge_command(input_paths, output_path); plan_tasks only splits files for those."""
+    name = None
+    supports_pages = False
+    install_paths = ()     # glob patterns of the usual install locations (newest match wins)
+    executable_names = ()  # executables looked up on PATH
+
+    def __init__(self):
+        self._executable = None
+        self._searched = False
+
+    def find_executable(self):
+        """Installed executable: the usual install locations first, then PATH. None if not found."""
+        for pattern in self.install_paths:
+            found = sorted(glob.glob(pattern))
+            if found:
+                return found[-1]
+        return _which(self.executable_names)
+
+    @property
+    def executable(self):
+        if not self._searched:
+            self._executable = self.find_executable()
+            self._searched = True
+        return self._executable
+
+    def available(self):
+        return self.executable is not None
+
+    def supports(self, dpi, quality):
+        """True if the backend can honour the DPI / image quality profile."""
+        return True
+
+
+class PDF24Backend(CompressBackend):
+    """PDF24 Creator DocTool (Windows workstations)."""
+    name = "PDF24"
+    install_paths = (r"C:\Program Files\PDF24\pdf24-DocTool.exe",
+                     r"C:\Program Files (x86)\PDF24\pdf24-DocTool.exe")
+    executable_names = ("pdf24-DocTool.exe",)
+
+    def command(self, input_path, output_path, dpi, quality, pages=None):
+        if pages:
+            raise ValueError("PDF24 DocTool cannot compress a page range.")
+        # pdf24-DocTool.exe -compress -dpi 144 -imageQuality 75 -outputFile "output.pdf" "input.pdf"
+        return [self.executable, "-compress", "-dpi", str(dpi), "-imageQuality", str(quality),
+                "-outputFile", output_path, input_path]
+
+
+class GhostscriptBackend(CompressBackend):
+    """Ghostscript pdfwrite with image downsampling (Windows or Linux, runs headless)."""
+    name = "Ghostscript"
+    supports_pages = True
+    install_paths = (r"C:\Program Files\gs\gs*\bin\gswin64c.exe",)
+    executable_names = ("gswin64c.exe", "gswin32c.exe", "gs")
+
+    def command(self, input_path, output_path, dpi, quality, pages=None):
+        """Command line compressing input_path (only pages (first, last) when given) into output_path."""
+        cmd = [self.executable, "-sDEVICE=pdfwrite", "-dCompatibilityLevel=1.5",
+               "-dNOPAUSE", "-dBATCH", "-dQUIET", "-dSAFER",
+               "-dDetectDuplicateImages=true", "-dCompressFonts=true",
+               "-dAutoFilterColorImages=false", "-dColorImageFilter=/DCTEncode",
+               "-dAutoFilterGrayImages=false", "-dGrayImageFilter=/DCTEncode",
+               "-dJPEGQ={}".format(quality)]
+        for kind in ("Color", "Gray", "Mono"):
+            cmd += ["-dDownsample{}Images=true".format(kind),
+                    "-d{}ImageDownsampleType=/Bicubic".format(kind),
+                    "-d{}ImageResolution={}".format(kind, dpi),
+                    "-d{}ImageDownsampleThreshold=1.0".format(kind)]
+        if pages:
+            cmd += ["-dFirstPage={}".format(pages[0]), "-dLastPage={}".format(pages[1])]
+        return cmd + ["-sOutputFile=" + output_path, input_path]
+
+    def page_count(self, path):
+        """Number of pages (Ghostscript reads only the page tree), or None."""
+        ps_path = path.replace("\\", "/").replace("(", "\\(").replace(")", "\\)")
+        try:
+            process = subprocess.Popen([self.executable, "-q", "-dNODISPLAY", "-dNOSAFER", "-dNOPAUSE", "-dBATCH",
+                                        "-c", "({}) (r) file runpdfbegin pdfpagecount = quit".format(ps_path)],
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            stdout, _ = process.communicate()
+            return int(stdout.strip().splitlines()[-1])
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def merge_command(self, input_paths, output_path):
+        # Chunks are already compressed - pass images through instead of encoding them again
+        return [self.executable, "-sDEVICE=pdfwrite", "-dNOPAUSE", "-dBATCH", "-dQUIET",
+                "-dAutoRotatePages=/None", "-dPassThroughJPEGImages=true", "-dPassThroughJPXImages=true",
+                "-dDownsampleColorImages=false", "-dDownsampleGrayImages=false", "-dDownsampleMonoImages=false",
+                "-sOutputFile=" + output_path] + list(input_paths)
+
+
+BACKENDS = [PDF24Backend(), GhostscriptBackend()]
+
+
+def get_backend(name):
+    for backend in BACKENDS:
+        if backend.name.lower() == name.lower():
+            return backend
+    return None
+
+
+def available_backends(dpi=None, quality=None):
+    """Installed backends (that support the profile, when given)."""
+    return [b for b in BACKENDS
+            if b.available() and (dpi is None or b.supports(dpi, quality))]
+
+
+_fastest = {}  # (dpi, quality) -> backend, for the lifetime of the process
+
+
+def pick_fastest_backend(sample_path, dpi, quality, backends=None, timeout=300):
+    """Compress sample_path with every installed backend supporting the profile and return the fastest
+    one that produced a valid, smaller file. Remembered per profile for this session. None if none worked."""
+    key = (dpi, quality)
+    if key in _fastest:
+        return _fastest[key]
+    candidates = backends if backends is not None else available_backends(dpi, quality)
+    if len(candidates) < 2:
+        return candidates[0] if candidates else None
+
+    best = None
+    temp_dir = tempfile.mkdtemp(prefix="pytal_pdf_")
+    try:
+        for backend in candidates:
+            job = CompressJob(sample_path, os.path.join(temp_dir, backend.name + ".pdf"))
+            start = time.time()
+            job.start(backend, dpi, quality)
+            while job.process is not None and not job.poll():
+                if time.time() - start > timeout:
+                    job.kill()
+                    break
+                time.sleep(POLL_INTERVAL / 4)
+            elapsed = time.time() - start
+            if job.status == DONE and job.new_size < job.old_size and (best is None or elapsed < best[1]):
+                best = (backend, elapsed)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    _fastest[key] = best[0] if best else None
+    return _fastest[key]
+
+
+# ╔═╗ ╦ ╦╔═╗╦ ╦╔═╗
+# ║═╬╗║ ║║╣ ║ ║║╣
+# ╚═╝╚╚═╝╚═╝╚═╝╚═╝ QUEUE
+#====================================================================================================
+
+def output_path_for(input_path):
+    base, ext = os.path.splitext(input_path)
+    return base + "_compressed" + ext
+
+
+def find_pdfs(folder):
+    """PDFs directly in folder, skipping earlier *_compressed.pdf outputs."""
+    return [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+            if name.lower().endswith(".pdf") and not name.lower().endswith("_compressed.pdf")]
+
+
+class CompressJob(object):
+    """One PDF (or one page range of it) in the queue and the process working on it."""
+    def __init__(self, input_path, output_path=None, pages=None):
+        self.input_path = input_path
+        self.output_path = output_path or output_path_for(input_path)
+        self.pages = pages
+        self.process = None
+        self.log = None
+        self.status = "Waiting"
+        self.backend = None
+
+    @property
+    def label(self):
+        name = os.path.basename(self.input_path)
+        return "{} (pages {}-{})".format(name, *self.pages) if self.pages else name
+
+    @property
+    def result(self):
+        """The job whose status is final once this task is finished (None for intermediate tasks)."""
+        return self
+
+    def ready(self):
+        """False while the task waits for other tasks."""
+        return True
+
+    def build_command(self, backend, dpi, quality):
+        return backend.command(self.input_path, self.output_path, dpi, quality, self.pages)
+
+    @property
+    def old_size(self):
+        return os.path.getsize(self.input_path) if os.path.exists(self.input_path) else 0
+
+    @property
+    def new_size(self):
+        return os.path.getsize(self.output_path) if os.path.exists(self.output_path) else 0
+
+    def start(self, backend, dpi, quality):
+        self.backend = backend
+        # Output goes to a temp file - a full pipe would block the process while we only poll it
+        self.log = tempfile.TemporaryFile()
+        try:
+            # No shell, so cancelling can kill the compressing process itself
+            self.process = subprocess.Popen(self.build_command(backend, dpi, quality),
+                                            stdout=self.log, stderr=self.log)
+            self.status = "Running"
+        except Exception as e:
+            self.finish("Error calling {}: {}".format(backend.name, e))
+
+    def poll(self):
+        """True when the process has ended (status is then set)."""
+        if self.process is None or self.process.poll() is None:
+            return False
+        if self.process.returncode != 0:
+            self.log.seek(0)
+            message = self.log.read().strip()
+            if not isinstance(message, str):
+                message = message.decode("utf-8", "replace")
+            self.finish("{} Error: {}".format(self.backend.name, message))
+        elif not os.path.exists(self.output_path):
+            self.finish("Output file not created.")
+        else:
+            self.finish(DONE)
+        return True
+
+    def kill(self):
+        if self.process is not None and self.process.poll() is None:
+            try:
+                self.process.kill()
+            except Exception:
+                pass
+        self.finish("Cancelled")
+
+    def finish(self, status):
+        self.status = status
+        if self.log:
+            self.log.close()
+            self.log = None
+
+
+class ChunkJob(CompressJob):
+    """A page range of a large PDF, compressed into a temp file."""
+    @property
+    def result(self):
+        return None
+
+
+class MergeJob(CompressJob):
+    """Stitches the compressed chunks of parent together once they are all finished."""
+    def __init__(self, parent, chunks, temp_dir):
+        CompressJob.__init__(self, parent.input_path, parent.output_path)
+        self.parent = parent
+        self.chunks = chunks
+        self.temp_dir = temp_dir
+
+    @property
+    def label(self):
+        return "{} (merge {} chunks)".format(os.path.basename(self.input_path), len(self.chunks))
+
+    @property
+    def result(self):
+        return self.parent
+
+    def ready(self):
+        return all(chunk.status not in ("Waiting", "Running") for chunk in self.chunks)
+
+    def build_command(self, backend, dpi, quality):
+        return backend.merge_command([chunk.output_path for chunk in self.chunks], self.output_path)
+
+    def start(self, backend, dpi, quality):
+        failed = [chunk for chunk in self.chunks if chunk.status != DONE]
+        if failed:
+            self.backend = backend
+            self.finish("{}: {}".format(failed[0].label, failed[0].status))
+            return
+        CompressJob.start(self, backend, dpi, quality)
+
+    def finish(self, status):
+        CompressJob.finish(self, status)
+        self.parent.status = status
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+def plan_tasks(jobs, backend, threshold_mb=STREAM_THRESHOLD_MB, chunk_pages=CHUNK_PAGES):
+    """Queue tasks for jobs: large files become page chunks + a merge (when the backend supports page
+    ranges), the others stay whole. Chunks live in temp folders removed by their merge."""
+    tasks = []
+    for job in jobs:
+        pages = None
+        if backend.supports_pages and job.old_size >= threshold_mb * 1024 * 1024:
+            pages = backend.page_count(job.input_path)
+        if not pages or pages <= chunk_pages:
+            tasks.append(job)
+            continue
+        temp_dir = tempfile.mkdtemp(prefix="pytal_pdf_chunks_")
+        chunks = [ChunkJob(job.input_path, os.path.join(temp_dir, "chunk_{:05d}.pdf".format(first)),
+                           pages=(first, min(first + chunk_pages - 1, pages)))
+                  for first in range(1, pages + 1, chunk_pages)]
+        job.status = "Waiting"
+        tasks.extend(chunks)
+        tasks.append(MergeJob(job, chunks, temp_dir))
+    return tasks
+
+
+def run_queue(jobs, backend, dpi, quality, workers=None, on_progress=None, on_done=None, is_cancelled=None):
+    """Runs jobs (or tasks from plan_tasks) with at most `workers` processes at once. Returns False if cancelled.
+    on_progress(done, total) is called every poll, on_done(job, done, total) per finished job / task."""
+    workers = workers or default_workers()
+    waiting = list(jobs)
+    running = []
+    done = 0
+    total = len(jobs)
+    while waiting or running:
+        if is_cancelled and is_cancelled():
+            for job in running + waiting:
+                job.kill()
+            return False
+
+        while len(running) < workers:
+            job = next((task for task in waiting if task.ready()), None)
+            if job is None:
+                break
+            waiting.remove(job)
+            job.start(backend, dpi, quality)
+            if job.process is None:
+                done += 1
+                if on_done:
+                    on_done(job, done, total)
+            else:
+                running.append(job)
+
+        for job in list(running):
+            if job.poll():
+                running.remove(job)
+                done += 1
+                if on_done:
+                    on_done(job, done, total)
+
+        if on_progress:
+            on_progress(done, total)
+        if running:
+            time.sleep(POLL_INTERVAL)
+    return True
+
+
+def summary_rows(jobs):
+    """[file, original MB, new MB, reduction, status] per job and (total_old, total_new) bytes of the
+    done / unchanged ones."""
+    rows = []
+    total_old = total_new = 0
+    for job in jobs:
+        old_size = job.old_size
+        row = [os.path.basename(job.input_path), "{:.2f}".format(old_size / (1024*1024.0)), "-", "-", job.status]
+        if job.status in (DONE, UNCHANGED):
+            new_size = job.new_size
+            total_old += old_size
+            total_new += new_size
+            row[2] = "{:.2f}".format(new_size / (1024*1024.0))
+            row[3] = "{:.1f}%".format((1 - (float(new_size) / old_size)) * 100) if old_size else "-"
+        rows.append(row)
+    return rows, (total_old, total_new)
+
+
+def total_line(totals):
+    total_old, total_new = totals
+    if not total_old:
+        return None
+    return "Total: {:.2f} MB -> {:.2f} MB ({:.1f}% smaller)".format(
+        total_old / (1024*1024.0), total_new / (1024*1024.0), (1 - (float(total_new) / total_old)) * 100)
+
+
+# ╔═╗╦╔═╦╔═╗  ╔═╗╔═╗╔═╗╦ ╦╔═╗
+# ╚═╗╠╩╗║╠═╝  ║  ╠═╣║  ╠═╣║╣
+# ╚═╝╩ ╩╩╩    ╚═╝╩ ╩╚═╝╩ ╩╚═╝ SKIP CACHE
+#====================================================================================================
+
+def file_hash(path, block_size=1024 * 1024):
+    """SHA-1 of the file content, read in blocks."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        block = f.read(block_size)
+        while block:
+            digest.update(block)
+            block = f.read(block_size)
+    return digest.hexdigest()
+
+
+def default_manifest_path():
+    """Per-user manifest of SkipCache outside Revit: %APPDATA%\\pyTal (~/.pyTal elsewhere)."""
+    appdata = os.environ.get("APPDATA")
+    folder = os.path.join(appdata, "pyTal") if appdata else os.path.join(os.path.expanduser("~"), ".pyTal")
+    return os.path.join(folder, MANIFEST_NAME)
+
+
+def _read_manifest(path):
+    try:
+        with open(path) as f:
+            entries = json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+    return entries if isinstance(entries, dict) else {}
+
+
+class SkipCache(object):
+    """Remembers, per input file, the content hash and profile of its last successful compression.
+
+    Entries live in one manifest of the user (default_manifest_path, or the pyRevit data file
+    the button passes), keyed by absolute path - nothing is written next to the drawings:
+        {"\\\\server\\issue\\sheet A101.pdf": {"hash": ..., "size": ..., "mtime": ..., "profile": "144/75"}}
+    Size + mtime are kept so unchanged files are not re-hashed on every run."""
+
+    def __init__(self, manifest_path=None):
+        self.manifest_path = manifest_path or default_manifest_path()
+        self._manifest = None  # absolute path -> entry, read on first use
+        self._dirty = set()
+
+    @staticmethod
+    def profile(dpi, quality):
+        return "{}/{}".format(dpi, quality)
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def _entries(self):
+        if self._manifest is None:
+            self._manifest = _read_manifest(self.manifest_path)
+        return self._manifest
+
+    def _entry(self, path):
+        return self._entries().get(self._key(path))
+
+    def _hash(self, path):
+        """Content hash of path, reusing the manifest hash while size and mtime are unchanged."""
+        entry = self._entry(path)
+        stat = os.stat(path)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime:
+            return entry.get("hash")
+        return file_hash(path)
+
+    def is_current(self, job, dpi, quality):
+        """True if job.input_path was compressed with this profile, has not changed since and its output exists."""
+        entry = self._entry(job.input_path)
+        if not entry or entry.get("profile") != self.profile(dpi, quality) or not os.path.exists(job.output_path):
+            return False
+        if entry.get("hash") != self._hash(job.input_path):
+            return False
+        # Same content, only touched (e.g. copied again) - refresh size / mtime so it is not hashed next time
+        stat = os.stat(job.input_path)
+        if (entry.get("size"), entry.get("mtime")) != (stat.st_size, stat.st_mtime):
+            entry.update(size=stat.st_size, mtime=stat.st_mtime)
+            self._dirty.add(self._key(job.input_path))
+        return True
+
+    def split(self, jobs, dpi, quality):
+        """Marks unchanged jobs as UNCHANGED and returns the jobs that still have to run."""
+        to_run = []
+        for job in jobs:
+            if self.is_current(job, dpi, quality):
+                job.status = UNCHANGED
+            else:
+                to_run.append(job)
+        return to_run
+
+    def record(self, job, dpi, quality):
+        """Remember a successful compression of job."""
+        if job.status != DONE:
+            return
+        key = self._key(job.input_path)
+        stat = os.stat(job.input_path)
+        self._entries()[key] = {"hash": self._hash(job.input_path), "size": stat.st_size,
+                                "mtime": stat.st_mtime, "profile": self.profile(dpi, quality)}
+        self._dirty.add(key)
+
+    def save(self):
+        """Write the changed entries. The manifest is read again first, so entries another run of the same
+        user saved meanwhile are kept. When it cannot be written nothing is cached."""
+        if not self._dirty:
+            return
+        manifest = _read_manifest(self.manifest_path)
+        manifest.update((key, self._manifest[key]) for key in self._dirty)
+        try:
+            folder = os.path.dirname(self.manifest_path)
+            if folder and not os.path.isdir(folder):
+                os.makedirs(folder)
+            with open(self.manifest_path, "w") as f:
+                json.dump(manifest, f, indent=1, sort_keys=True)
+        except (IOError, OSError):
+            pass
+        self._manifest = manifest
+        self._dirty.clear()
+
+
+# ╔═╗╦  ╦
+# ║  ║  ║
+# ╚═╝╩═╝╩ COMMAND LINE
+#====================================================================================================
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Compress PDFs (files or folders) with PDF24 / Ghostscript.")
+    parser.add_argument("paths", nargs="+", help="PDF files and/or folders")
+    parser.add_argument("--dpi", type=int, default=144)
+    parser.add_argument("--quality", type=int, default=75)
+    parser.add_argument("--backend", default="auto", help="auto, " + ", ".join(b.name for b in BACKENDS))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="recompress files that did not change")
+    parser.add_argument("--manifest", default=None,
+                        help="skip cache manifest (default: {})".format(default_manifest_path()))
+    parser.add_argument("--stream-mb", type=float, default=STREAM_THRESHOLD_MB,
+                        help="compress files of at least this size in page chunks")
+    parser.add_argument("--chunk-pages", type=int, default=CHUNK_PAGES)
+    args = parser.parse_args(argv)
+
+    pdfs = []
+    for path in args.paths:
+        pdfs.extend(find_pdfs(path) if os.path.isdir(path) else [path])
+    if not pdfs:
+        print("No PDFs found.")
+        return 1
+
+    jobs = [CompressJob(path) for path in pdfs]
+    skip_cache = SkipCache(args.manifest)
+    to_run = jobs if args.force else skip_cache.split(jobs, args.dpi, args.quality)
+
+    if not to_run:
+        backend = None
+    elif args.backend == "auto":
+        backend = pick_fastest_backend(min((job.input_path for job in to_run), key=os.path.getsize),
+                                       args.dpi, args.quality)
+    else:
+        backend = get_backend(args.backend)
+    if to_run and (backend is None or not backend.available()):
+        print("No compression backend available (install PDF24 or Ghostscript).")
+        return 1
+
+    print("Compressing {} files using {} (DPI: {}, Quality: {}, {} unchanged)...".format(
+        len(to_run), backend.name if backend else "-", args.dpi, args.quality, len(jobs) - len(to_run)))
+
+    def on_done(task, done, total):
+        if task.result is not None:
+            skip_cache.record(task.result, args.dpi, args.quality)
+        print("[{}/{}] {} - {}".format(done, total, task.label, task.status))
+
+    try:
+        tasks = plan_tasks(to_run, backend, args.stream_mb, args.chunk_pages) if to_run else []
+        run_queue(tasks, backend, args.dpi, args.quality, args.workers, on_done=on_done)
+    finally:
+        skip_cache.save()
+    rows, totals = summary_rows(jobs)
+    for row in rows:
+        print("  ".join(row))
+    if total_line(totals):
+        print(total_line(totals))
+    return 0 if all(job.status in (DONE, UNCHANGED) for job in jobs) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
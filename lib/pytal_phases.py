@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Phase queries for pyTal buttons.
+
+phase_element_ids selects elements by category and phase created (and
+optionally phase demolished). Without an element index it runs one
+collector whose category and parameter filters are evaluated inside Revit,
+so only the matching ids come back to Python; with a built index it
+intersects the index buckets instead.
+
+phase_matrix groups every phased element of the model by category, phase
+created and phase demolished in one pass over an element index, keeping the
+ids of each cell for drill-down selection.
+
+Usage:
+    from pytal_phases import phase_element_ids, NOT_DEMOLISHED
+    ids = phase_element_ids(doc, [cat.Id for cat in categories], phase.Id, NOT_DEMOLISHED)
+
+    cells = phase_matrix(get_index(doc))   # {(category, created, demolished): [ids]}
+Author: Arbel Tal"""
+
+from pyrevit import DB
+from System.Collections.Generic import List
+
+from pytal_index import KEYS, INVALID_ID, to_element_id
+
+# phase_demolished values besides a phase id
+ANY = None
+NOT_DEMOLISHED = DB.ElementId.InvalidElementId
+
+
+def equals_filter(built_in_parameter, value_id):
+    """ElementParameterFilter: built_in_parameter (an ElementId parameter) == value_id."""
+    rule = DB.ParameterFilterRuleFactory.CreateEqualsRule(DB.ElementId(built_in_parameter), value_id)
+    return DB.ElementParameterFilter(rule)
+
+
+def phase_element_ids(doc, category_ids, phase_created, phase_demolished=ANY, index=None):
+    """List[ElementId] of the non-type elements of category_ids created in phase_created.
+
+    phase_demolished: ANY, NOT_DEMOLISHED or a phase id. index: an ElementIndex of doc
+    to answer from instead of collecting."""
+    if index is not None:
+        criteria = {"phase_created": phase_created}
+        if phase_demolished is not ANY:
+            criteria["phase_demolished"] = phase_demolished
+        matching = index.ids(**criteria)
+        ids = set()
+        for category_id in category_ids:
+            ids |= index.ids(category=category_id) & matching
+        return List[DB.ElementId]([to_element_id(i) for i in ids])
+
+    # Category filter first (quick filter), then the phase parameters - all evaluated natively
+    collector = DB.FilteredElementCollector(doc).WhereElementIsNotElementType()
+    collector = collector.WherePasses(DB.ElementMulticategoryFilter(List[DB.ElementId](category_ids)))
+    collector = collector.WherePasses(equals_filter(DB.BuiltInParameter.PHASE_CREATED, phase_created))
+    if phase_demolished is not ANY:
+        collector = collector.WherePasses(equals_filter(DB.BuiltInParameter.PHASE_DEMOLISHED, phase_demolished))
+    return collector.ToElementIds()
+
+
+def phase_matrix(index):
+    """{(category id, phase created id, phase demolished id): [element ids]} of the phased elements of index.
+
+    Ids are ints (INVALID_ID for not demolished); one pass over the index, no API calls."""
+    category_at = KEYS.index("category")
+    created_at = KEYS.index("phase_created")
+    demolished_at = KEYS.index("phase_demolished")
+    cells = {}
+    for el_id, keys in index.keys_by_id.items():
+        created = keys[created_at]
+        if created == INVALID_ID or keys[category_at] is None:
+            continue
+        cells.setdefault((keys[category_at], created, keys[demolished_at]), []).append(el_id)
+    return cells
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Small spatial indexes for interactive pyTal tools.
+
+SegmentGrid keeps 2D segments in a uniform grid so "which segment is near
+this click?" only looks at a few cells instead of every segment in the view.
+
+Usage:
+    grid = SegmentGrid(cell_size=2.0)
+    grid.insert(dim_id, (x0, y0), (x1, y1), payload)
+    hit = grid.nearest(x, y, max_dist=0.5)   # (key, distance, payload) or None
+Author: Arbel Tal"""
+
+import math
+from collections import defaultdict
+
+
+def point_segment_distance(x, y, x0, y0, x1, y1):
+    """Distance from (x, y) to the segment (x0, y0)-(x1, y1)."""
+    dx, dy = x1 - x0, y1 - y0
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(x - x0, y - y0)
+    t = max(0.0, min(1.0, ((x - x0) * dx + (y - y0) * dy) / length_sq))
+    return math.hypot(x - (x0 + t * dx), y - (y0 + t * dy))
+
+
+class SegmentGrid(object):
+    """Uniform grid of 2D segments supporting insert / remove / nearest-segment queries.
+
+    Segments are registered in the cells of points sampled every half cell
+    along them; queries widen their search box by that sampling step so no
+    segment within max_dist is missed."""
+
+    def __init__(self, cell_size=2.0):
+        self.cell_size = float(cell_size)
+        self.step = self.cell_size / 2.0
+        self.cells = defaultdict(set)
+        self.segments = {}  # key -> (x0, y0, x1, y1, payload, cells)
+
+    def _cell(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def insert(self, key, p0, p1, payload=None):
+        """Add (or replace) segment key from p0 to p1, both (x, y) tuples."""
+        self.remove(key)
+        x0, y0 = p0
+        x1, y1 = p1
+        samples = max(1, int(math.ceil(math.hypot(x1 - x0, y1 - y0) / self.step)))
+        cells = set()
+        for i in range(samples + 1):
+            t = float(i) / samples
+            cells.add(self._cell(x0 + t * (x1 - x0), y0 + t * (y1 - y0)))
+        for cell in cells:
+            self.cells[cell].add(key)
+        self.segments[key] = (x0, y0, x1, y1, payload, cells)
+
+    def remove(self, key):
+        segment = self.segments.pop(key, None)
+        if segment is None:
+            return
+        for cell in segment[5]:
+            keys = self.cells.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.cells[cell]
+
+    def candidates(self, x, y, radius):
+        """Keys of segments registered in cells overlapping the box (x, y) +/- radius."""
+        reach = radius + self.step / 2.0
+        cx0, cy0 = self._cell(x - reach, y - reach)
+        cx1, cy1 = self._cell(x + reach, y + reach)
+        found = set()
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                keys = self.cells.get((cx, cy))
+                if keys:
+                    found.update(keys)
+        return found
+
+    def nearest(self, x, y, max_dist, accept=None):
+        """Closest segment to (x, y) within max_dist as (key, distance, payload), or None.
+        accept(payload) -> bool can reject candidates (e.g. segments on another level)."""
+        best = None
+        for key in self.candidates(x, y, max_dist):
+            x0, y0, x1, y1, payload, _ = self.segments[key]
+            dist = point_segment_distance(x, y, x0, y0, x1, y1)
+            if dist <= max_dist and (best is None or dist < best[1]):
+                if accept is None or accept(payload):
+                    best = (key, dist, payload)
+        return best
+
+    def __len__(self):
+        return len(self.segments)
@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+"""Quantity take-off engine: many (category, parameter, grouping, rounding) rules, one pass.
+
+Rules are plain dicts (usually loaded from a JSON file):
+    {
+      "name": "Lighting Length",
+      "category": "OST_LightingFixtures",
+      "parameter": "SN_Length",          # not needed for "count"
+      "measure": "length",               # length (m) | area (m2) | count
+      "group_by": ["type"],              # type | family | category | level | workset | any parameter name
+      "info": [["Serial Number", ["SN_Lighting Serial Number", "SN_Light Serial Number"]]],
+      "rounding": "ceil",                # ceil | round | 2dp | none
+      "quantity_header": "Total Length (m)"   # optional column title
+    }
+"info" columns report, per group, the first non-empty value of the listed
+parameters (type first, then instance).
+
+All rules are fed from a single walk over the elements of their categories
+(through the shared element index), so ten rules cost one pass, with
+parameters resolved once per type (ParameterResolver). An element whose
+values cannot be read is skipped and counted (TakeoffResult.skipped) instead
+of stopping the take-off. With a cache_name the per-element results are kept
+per model and later runs only re-read elements changed since (document change
+tracking).
+
+Usage:
+    from pytal_takeoff import load_rules, run_takeoff, export_csv
+    results = run_takeoff(doc, load_rules(path), cache_name="Takeoff")
+    for result in results:
+        output.print_table(result.table(), columns=result.columns())
+Author: Arbel Tal"""
+
+import codecs
+import csv
+import io
+import json
+import math
+import os
+import re
+
+from pyrevit import DB
+
+from pytal_cache import load_cache, save_cache, document_version, changed_since
+from pytal_index import get_index, id_value, to_element_id, INVALID_ID
+from pytal_params import ParameterResolver
+
+FEET_TO_M = 0.3048
+SQFT_TO_M2 = 0.09290304
+MIN_VALUE = 0.0001  # elements with a length / area at or below this (m / m2) are not counted
+
+ROUNDING = {
+    "ceil": lambda v: int(math.ceil(v)),
+    "round": lambda v: int(round(v)),
+    "2dp": lambda v: round(v, 2),
+    "none": lambda v: v,
+}
+
+UNITS = {"length": "m", "area": "m2", "count": "pcs"}
+
+GROUP_HEADERS = {"type": "Family & Type"}
+
+
+# ╦═╗╦ ╦╦  ╔═╗╔═╗
+# ╠╦╝║ ║║  ║╣ ╚═╗
+# ╩╚═╚═╝╩═╝╚═╝╚═╝ RULES
+#====================================================================================================
+
+def load_rules(path):
+    """Rules list from a JSON file ({"rules": [...]} or a bare list). Raises ValueError on a bad rule."""
+    with io.open(path, encoding="utf-8-sig") as f:
+        data = json.load(f)
+    rules = data.get("rules", []) if isinstance(data, dict) else data
+    for rule in rules:
+        validate_rule(rule)
+    return rules
+
+
+def validate_rule(rule):
+    name = rule.get("name", "?")
+    if not hasattr(DB.BuiltInCategory, rule.get("category", "")):
+        raise ValueError("Rule '{}': unknown category '{}'.".format(name, rule.get("category")))
+    measure = rule.get("measure", "count")
+    if measure not in UNITS:
+        raise ValueError("Rule '{}': measure must be one of {}.".format(name, ", ".join(sorted(UNITS))))
+    if measure != "count" and not rule.get("parameter"):
+        raise ValueError("Rule '{}': a {} rule needs a parameter.".format(name, measure))
+    if rule.get("rounding", "none") not in ROUNDING:
+        raise ValueError("Rule '{}': rounding must be one of {}.".format(name, ", ".join(sorted(ROUNDING))))
+
+
+# ╔═╗╔╗╔╔═╗╦╔╗╔╔═╗
+# ║╣ ║║║║ ╦║║║║║╣
+# ╚═╝╝╚╝╚═╝╩╝╚╝╚═╝ ENGINE
+#====================================================================================================
+
+def parameter_text(p):
+    """Display value of a parameter ("" when empty)."""
+    if not p or not p.HasValue:
+        return ""
+    val = p.AsString()
+    if not val:
+        try:
+            val = p.AsValueString()
+        except Exception:
+            val = ""
+    if not val:
+        if p.StorageType == DB.StorageType.Double:
+            val = str(round(p.AsDouble(), 2))
+        elif p.StorageType == DB.StorageType.Integer:
+            val = str(p.AsInteger())
+    return val or ""
+
+
+def measure_value(p, measure):
+    """Length in m / area in m2 of a parameter. Doubles are internal units (feet / sq. feet);
+    integer and text values are taken as cm (length) or m2 (area), as typed by the user."""
+    if not p or not p.HasValue:
+        return 0.0
+    if p.StorageType == DB.StorageType.Double:
+        return p.AsDouble() * (FEET_TO_M if measure == "length" else SQFT_TO_M2)
+    if p.StorageType == DB.StorageType.Integer:
+        value = float(p.AsInteger())
+    elif p.StorageType == DB.StorageType.String:
+        try:
+            value = float(p.AsString())
+        except (TypeError, ValueError):
+            return 0.0
+    else:
+        return 0.0
+    return value / 100.0 if measure == "length" else value
+
+
+class TakeoffResult(object):
+    """Totals of one rule: group key tuple -> [quantity, element count, info values]."""
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.name = rule.get("name", rule["category"])
+        self.measure = rule.get("measure", "count")
+        self.group_by = list(rule.get("group_by", ["type"]))
+        self.info = [(header, list(names)) for header, names in rule.get("info", [])]
+        self.round = ROUNDING[rule.get("rounding", "none")]
+        self.groups = {}
+        self.skipped = 0  # elements of the category whose values could not be read
+
+    def add(self, key, quantity):
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = [0.0, 0, None]
+        group[0] += quantity
+        group[1] += 1
+        return group
+
+    @property
+    def element_count(self):
+        return sum(group[1] for group in self.groups.values())
+
+    def columns(self):
+        quantity = self.rule.get("quantity_header") or (
+            "Count" if self.measure == "count" else "Total ({})".format(UNITS[self.measure]))
+        return ([GROUP_HEADERS.get(g, g.title()) for g in self.group_by] + [header for header, _ in self.info] +
+                [quantity] + ([] if self.measure == "count" else ["Elements"]))
+
+    def table(self):
+        rows = []
+        for key in sorted(self.groups):
+            quantity, count, info = self.groups[key]
+            row = list(key) + [value or "---" for value in (info or [""] * len(self.info))]
+            row.append(count if self.measure == "count" else self.round(quantity))
+            if self.measure != "count":
+                row.append(count)
+            rows.append(row)
+        return rows
+
+
+class TakeoffEngine(object):
+    """Runs rules over the elements of their categories, reading each element once.
+
+    What every element added to which group is kept (contributions), so a later
+    run can re-read only added / changed elements and rebuild the totals
+    without touching the rest of the model (see update)."""
+
+    def __init__(self, doc, rules):
+        self.doc = doc
+        self.results = [TakeoffResult(rule) for rule in rules]
+        self.resolver = ParameterResolver()
+        self.contributions = {}  # element id -> [(rule index, group key, quantity)]
+        self.info = {}           # (rule index, group key) -> info values
+        self._info_read = set()  # groups whose info was read during this run
+        self._types = {}         # type id -> type element
+        self._names = {}         # ("level" / "workset", id) -> name
+
+    def element_type(self, elem):
+        type_id = elem.GetTypeId()
+        key = id_value(type_id)
+        if key == INVALID_ID:
+            return None
+        if key not in self._types:
+            self._types[key] = self.doc.GetElement(type_id)
+        return self._types[key]
+
+    def _cached_name(self, kind, key, getter):
+        if (kind, key) not in self._names:
+            try:
+                self._names[(kind, key)] = getter() or ""
+            except Exception:
+                self._names[(kind, key)] = ""
+        return self._names[(kind, key)]
+
+    def group_value(self, elem, elem_type, group):
+        if group == "type":
+            return "{} : {}".format(elem_type.FamilyName, elem_type.Name) if elem_type else elem.Name
+        if group == "family":
+            return getattr(elem_type, "FamilyName", "") or elem.Name
+        if group == "category":
+            return elem.Category.Name if elem.Category else ""
+        if group == "level":
+            level_id = getattr(elem, "LevelId", None)
+            if level_id is None or id_value(level_id) == INVALID_ID:
+                return ""
+            return self._cached_name("level", id_value(level_id), lambda: self.doc.GetElement(level_id).Name)
+        if group == "workset":
+            ws_id = elem.WorksetId
+            return self._cached_name("workset", ws_id.IntegerValue,
+                                     lambda: self.doc.GetWorksetTable().GetWorkset(ws_id).Name)
+        return self.text(elem, elem_type, [group], type_first=False)
+
+    def text(self, elem, elem_type, names, type_first=True):
+        """First non-empty value of names, on the type and the instance."""
+        owners = [elem_type, elem] if type_first else [elem, elem_type]
+        for name in names:
+            for owner in owners:
+                if owner is not None:
+                    value = parameter_text(self.resolver.get(owner, name))
+                    if value:
+                        return value
+        return ""
+
+    def feed(self, elem, rule_indices):
+        """Read elem for the rules (indices) of its category and record what it adds to which group."""
+        elem_type = self.element_type(elem)
+        params = {}  # rules sharing a parameter read it once per element
+
+        def get(name):
+            if name not in params:
+                params[name] = self.resolver.get(elem, name)
+            return params[name]
+
+        contributions = []
+        for i in rule_indices:
+            result = self.results[i]
+            if result.measure == "count":
+                parameter = result.rule.get("parameter")
+                if parameter and not parameter_text(get(parameter)):
+                    continue
+                quantity = 1
+            else:
+                quantity = measure_value(get(result.rule["parameter"]), result.measure)
+                if quantity <= MIN_VALUE:
+                    continue
+            key = tuple(self.group_value(elem, elem_type, g) for g in result.group_by)
+            contributions.append((i, key, quantity))
+            if (i, key) not in self._info_read:
+                # Info values once per group and run
+                self.info[(i, key)] = [self.text(elem, elem_type, names) for _, names in result.info]
+                self._info_read.add((i, key))
+        # Elements adding nothing are kept too, so they are not read again next time
+        self.contributions[id_value(elem.Id)] = contributions
+
+    def read(self, elem, rule_indices):
+        """feed, skipping an element whose values cannot be read: it is counted on its rules and
+        left out of the contributions, so it is read again next time."""
+        try:
+            self.feed(elem, rule_indices)
+        except Exception:
+            self.contributions.pop(id_value(elem.Id), None)
+            for i in rule_indices:
+                self.results[i].skipped += 1
+
+    def categories(self):
+        """{category name: [rule indices]}"""
+        by_category = {}
+        for i, result in enumerate(self.results):
+            by_category.setdefault(result.rule["category"], []).append(i)
+        return by_category
+
+    def run(self, elements_by_category):
+        """elements_by_category(bic) -> iterable of elements. Each category is walked once for all its rules."""
+        for category, rule_indices in self.categories().items():
+            for elem in elements_by_category(getattr(DB.BuiltInCategory, category)):
+                self.read(elem, rule_indices)
+        return self.aggregate()
+
+    def update(self, index, changed, deleted):
+        """Re-read only what changed since the stored contributions were made: new and changed elements,
+        instances of changed types and, for rules grouped by level, everything when a level changed.
+        index is the (up to date) element index, changed / deleted are int id sets. Returns the ids read."""
+        for el_id in deleted:
+            self.contributions.pop(el_id, None)
+        level_changed = bool(changed & index.ids(cls=DB.Level))
+        all_current = set()
+        read = set()
+        for category, rule_indices in self.categories().items():
+            current = index.ids(category=getattr(DB.BuiltInCategory, category))
+            all_current |= current
+            if level_changed and any("level" in self.results[i].group_by for i in rule_indices):
+                to_read = set(current)
+            else:
+                to_read = (current - set(self.contributions)) | (changed & current)
+                for el_id in changed:
+                    to_read |= index.ids(type=el_id) & current
+            for el_id in to_read:
+                elem = self.doc.GetElement(to_element_id(el_id))
+                if elem is not None:
+                    self.read(elem, rule_indices)
+                else:
+                    self.contributions.pop(el_id, None)
+            read |= to_read
+        for el_id in set(self.contributions) - all_current:
+            self.contributions.pop(el_id, None)
+        return read
+
+    def aggregate(self):
+        """Totals per rule and group, built from the stored contributions (no Revit calls)."""
+        for result in self.results:
+            result.groups = {}
+        for contributions in self.contributions.values():
+            for i, key, quantity in contributions:
+                self.results[i].add(key, quantity)
+        for i, result in enumerate(self.results):
+            for key, group in result.groups.items():
+                group[2] = self.info.get((i, key))
+        # Forget info of groups that no longer have elements
+        for i, key in list(self.info):
+            if key not in self.results[i].groups:
+                del self.info[(i, key)]
+        return self.results
+
+
+def run_takeoff(doc, rules, rebuild_index=False, cache_name=None):
+    """Run rules on doc using the shared element index. Returns one TakeoffResult per rule.
+
+    With cache_name the per-element contributions are stored per model (pytal_cache); the next run
+    re-reads only elements changed since then, as long as the rules did not change. Changes come from
+    the change journal of the element index within a session, and from the document versions
+    (saved / synchronized changes) between sessions. The version is only stored when the model has
+    no unsaved changes: contributions read from unsaved edits would otherwise be trusted after the
+    model is reopened without them. rebuild_index also rebuilds that cache."""
+    index = get_index(doc, rebuild=rebuild_index)
+    engine = TakeoffEngine(doc, rules)
+    if cache_name is None:
+        return engine.run(lambda bic: index.elements(doc, category=bic))
+
+    signature = json.dumps(rules, sort_keys=True)
+    cache = {} if rebuild_index else load_cache(doc, cache_name)
+    if cache.get("rules") != signature:
+        changes = None
+    elif cache.get("session") == index.session:
+        changed = index.changed_since(cache.get("revision", 0))
+        changes = None if changed is None else (changed, set())
+    else:
+        changes = changed_since(doc, cache.get("version"))
+    # Unsaved changes are in the contributions but not in the saved version - next session reads everything
+    version = None if doc.IsModified else document_version(doc)
+    if changes is None:
+        # First run, rules edited or version unknown - read everything
+        engine.run(lambda bic: index.elements(doc, category=bic))
+    else:
+        engine.contributions = cache.get("elements", {})
+        engine.info = cache.get("info", {})
+        engine.update(index, *changes)
+    results = engine.aggregate()
+    save_cache(doc, cache_name, {"version": version, "session": index.session, "revision": index.revision,
+                                 "rules": signature, "elements": engine.contributions, "info": engine.info})
+    index.checkpoint(cache_name)
+    return results
+
+
+# ╔═╗═╗ ╦╔═╗╔═╗╦═╗╔╦╗
+# ║╣ ╔╩╦╝╠═╝║ ║╠╦╝ ║
+# ╚═╝╩ ╚═╩  ╚═╝╩╚═ ╩ EXPORT
+#====================================================================================================
+
+def safe_file_name(name):
+    return re.sub(r'[\\/:*?"<>|]', "_", name).strip() or "takeoff"
+
+
+def export_csv(results, folder, prefix=""):
+    """One CSV per rule (UTF-8 with BOM, so Excel shows Hebrew correctly). Returns the written paths."""
+    paths = []
+    for result in results:
+        path = os.path.join(folder, safe_file_name("{}{}".format(prefix, result.name)) + ".csv")
+        with open(path, "wb") as raw:
+            raw.write(codecs.BOM_UTF8)
+        with io.open(path, "a", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(result.columns())
+            for row in result.table():
+                writer.writerow([u"{}".format(value) for value in row])
+        paths.append(path)
+    return paths
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Copy views (legends, drafting views, schedules, view templates) from linked models into the host.
+
+view_catalog lists the copyable views of a link as (id, name, kind); it is
+cached per link and reused while the link document version is unchanged,
+so the picker does not walk the views of every link again.
+
+copy_views copies every selected view of one link in one
+ElementTransformUtils.CopyElements call, so Revit reconciles the types once
+for the whole set. A duplicate-type-names handler keeps the host types
+without showing the dialog. View names that already exist in the host are
+found before copying (view_names_by_kind, one collector for every kind) and
+are either skipped or the copies are renamed.
+
+Usage:
+    from pytal_views import view_catalog, copy_views, RENAME
+    catalog = view_catalog(link_doc)            # [(id, name, kind)]
+    with revit.Transaction("Copy Views"):
+        report = copy_views(link_doc, views, doc, conflicts=RENAME, suffix=link_doc.Title)
+Author: Arbel Tal"""
+
+from pyrevit import DB
+from System.Collections.Generic import List
+
+from pytal_cache import load_cache, save_cache, document_version
+from pytal_index import id_value
+
+# What to do with views whose name already exists in the host
+SKIP = "skip"
+RENAME = "rename"
+
+# Copyable view kinds; names are unique per kind in a model
+LEGEND = "Legend"
+DRAFTING = "Drafting View"
+SCHEDULE = "Schedule"
+TEMPLATE = "View Template"
+KINDS = [LEGEND, DRAFTING, SCHEDULE, TEMPLATE]
+
+CATALOG_CACHE = "ViewCatalog"
+
+
+class UseDestinationTypes(DB.IDuplicateTypeNamesHandler):
+    """Types with the same name in both models: keep the host ones (no dialog)."""
+
+    def OnDuplicateTypeNamesFound(self, args):
+        return DB.DuplicateTypeAction.UseDestinationTypes
+
+
+class CopyReport(object):
+    """copied: [(source name, name in the host)], skipped: [source names]."""
+
+    def __init__(self):
+        self.copied = []
+        self.skipped = []
+
+
+def view_kind(view):
+    """KINDS entry of a copyable view, None for the others (plans, sections, revision schedules...)."""
+    if view.IsTemplate:
+        return TEMPLATE
+    if view.ViewType == DB.ViewType.Legend:
+        return LEGEND
+    if view.ViewType == DB.ViewType.DraftingView:
+        return DRAFTING
+    if view.ViewType == DB.ViewType.Schedule and not (getattr(view, "IsTitleblockRevisionSchedule", False) or
+                                                       getattr(view, "IsInternalKeynoteSchedule", False)):
+        return SCHEDULE
+    return None
+
+
+def view_names_by_kind(doc):
+    """{kind: names} of the copyable views of doc, in one collector."""
+    names = dict((kind, set()) for kind in KINDS)
+    for view in DB.FilteredElementCollector(doc).OfClass(DB.View):
+        kind = view_kind(view)
+        if kind:
+            names[kind].add(view.Name)
+    return names
+
+
+def view_catalog(link_doc, rebuild=False):
+    """[(id, name, kind)] of the copyable views of link_doc (id as int).
+
+    Cached per link document and reused while its version GUID is unchanged
+    (a link only changes when it is reloaded)."""
+    version = document_version(link_doc)
+    cache = {} if rebuild else load_cache(link_doc, CATALOG_CACHE)
+    if version and cache.get("version") == version:
+        return cache["views"]
+    views = []
+    for view in DB.FilteredElementCollector(link_doc).OfClass(DB.View):
+        kind = view_kind(view)
+        if kind:
+            views.append((id_value(view.Id), view.Name, kind))
+    if version:
+        save_cache(link_doc, CATALOG_CACHE, {"version": version, "views": views})
+    return views
+
+
+def unique_name(name, taken):
+    """name, or name followed by the first free number."""
+    candidate, number = name, 2
+    while candidate in taken:
+        candidate = "{} {}".format(name, number)
+        number += 1
+    return candidate
+
+
+def _source_of(new_name, source_names, existing):
+    """Source view name of a copy called new_name. Copies of views whose name was taken in the
+    host get a name Revit made unique, starting with the source name."""
+    if new_name in source_names and new_name not in existing:
+        return new_name
+    matches = [name for name in source_names if name in existing and new_name.startswith(name)]
+    return max(matches, key=len) if matches else None
+
+
+def copy_views(source_doc, views, doc, conflicts=SKIP, suffix=None):
+    """Copy views of source_doc into doc with one CopyElements call. Needs an open transaction in doc.
+
+    Views named like an existing host view of the same kind are skipped (SKIP) or copied
+    and renamed to "<name> (<suffix>)" (RENAME)."""
+    report = CopyReport()
+    existing = view_names_by_kind(doc)  # host view names before the copy
+    to_copy = []
+    for view in views:
+        if view.Name in existing.get(view_kind(view), ()) and conflicts == SKIP:
+            report.skipped.append(view.Name)
+        else:
+            to_copy.append(view)
+    if not to_copy:
+        return report
+
+    options = DB.CopyPasteOptions()
+    options.SetDuplicateTypeNamesHandler(UseDestinationTypes())
+    new_ids = DB.ElementTransformUtils.CopyElements(source_doc, List[DB.ElementId]([v.Id for v in to_copy]),
+                                                    doc, None, options)
+
+    # Map the copies back to their source names; rename the ones that clashed with a host view
+    source_names = set(view.Name for view in to_copy)
+    taken = dict((kind, set(names)) for kind, names in existing.items())
+    for new_id in new_ids:
+        new_view = doc.GetElement(new_id)
+        kind = view_kind(new_view) if isinstance(new_view, DB.View) else None
+        if kind not in existing:
+            continue
+        source_name = _source_of(new_view.Name, source_names, existing[kind])
+        if source_name is not None and source_name in existing[kind] and suffix:
+            new_view.Name = unique_name("{} ({})".format(source_name, suffix), taken[kind])
+        taken[kind].add(new_view.Name)
+        report.copied.append((source_name or new_view.Name, new_view.Name))
+    return report
@@ -1,55 +1,61 @@
+# -*- coding: utf-8 -*-
+__title__   = "Level Is Monitor"
+__doc__     = """Version = 2.0
+Date    = 16.10.2026
+________________________________________________________________
+Description:
+Audits the levels and grids of the model and of every loaded link in one
+pass: copy/monitor status, pin status, elevation, workset and scope box.
+Everything is printed in one table - host first, then each link; levels by
+elevation, then grids by name. Link elevations are in host coordinates.
+________________________________________________________________
+How-To:
+1. Open the host model (links must be loaded to be audited).
+2. Click the button.
+3. Items that are not monitored are marked in red.
+4. Shift+Click to rebuild the element index (used when it is already built).
+________________________________________________________________
+Last update:
+- [16.10.2026] - V2.0: Levels and grids of the host and all loaded links in one table,
+                       shared workset / scope box name cache.
+________________________________________________________________
+Author: Arbel Tal"""
+
 from pyrevit import revit, DB, script
+from pytal_index import get_index, has_index
+from pytal_datum import audit_with_links, datum_elements, sort_rows
 
 doc = revit.doc
+output = script.get_output()
 
-# Collect all Level elements
-levels_collector = DB.FilteredElementCollector(doc)\
-                     .OfClass(DB.Level)\
-                     .WhereElementIsNotElementType()\
-                     .ToElements()
-
-data = []
-
-is_workshared = doc.IsWorkshared
-
-for level in levels_collector:
-    # Check if the level is copy/monitored
-    monitored_ids = level.GetMonitoredLinkElementIds()
-    is_monitored = True if monitored_ids and len(monitored_ids) > 0 else False
-    
-    # Elevation
-    elevation = "{:.2f}".format(level.Elevation)
+# An already built element index answers from memory; otherwise one collector finds the levels and
+# grids inside Revit (building the index would walk the whole model). Shift+Click rebuilds the index.
+if __shiftclick__ or has_index(doc):
+    index = get_index(doc, rebuild=__shiftclick__)
+    host_datums = list(index.elements(doc, cls=DB.Level)) + list(index.elements(doc, cls=DB.Grid))
+else:
+    host_datums = list(datum_elements(doc))
 
-    # Workset
-    workset_name = "-"
-    if is_workshared:
-        ws = doc.GetWorksetTable().GetWorkset(level.WorksetId)
-        if ws:
-            workset_name = ws.Name
+rows = sort_rows(audit_with_links(doc, host_elements=host_datums))
 
-    # Scope Box
-    scope_box_name = "-"
-    sb_param = level.LookupParameter("Scope Box")
-    if sb_param:
-        sb_id = sb_param.AsElementId()
-        if sb_id != DB.ElementId.InvalidElementId:
-            sb_elem = doc.GetElement(sb_id)
-            if sb_elem:
-                scope_box_name = sb_elem.Name
+RED = '<span style="color:red; font-weight:bold;">{}</span>'
 
+data = []
+for row in rows:
     # Conditional styling
-    if not is_monitored:
-        status_display = '<span style="color:red; font-weight:bold;">False</span>'
-        level_name_display = '<span style="color:red; font-weight:bold;">{}</span>'.format(level.Name)
+    if not row.monitored:
+        status_display = RED.format(False)
+        name_display = RED.format(row.name)
     else:
         status_display = "True"
-        level_name_display = level.Name
-    
-    data.append([level_name_display, status_display, elevation, workset_name, scope_box_name])
-
-# Sort data by Elevation (index 2)
-data.sort(key=lambda x: float(x[2]))
-
-# Output the results in a table
-output = script.get_output()
-output.print_table(table_data=data, columns=["Level Name", "Is Monitored", "Elevation", "Workset", "Scope Box"])
+        name_display = row.name
+    elevation = "{:.2f}".format(row.elevation) if row.elevation is not None else "-"
+    data.append([row.model, row.kind, name_display, status_display, str(row.pinned), elevation,
+                 row.workset, row.scope_box])
+
+models = len(set(row.model for row in rows))
+not_monitored = len([row for row in rows if not row.monitored])
+output.print_md("**{}** levels / grids in **{}** models, **{}** not monitored.".format(
+    len(rows), models, not_monitored))
+output.print_table(table_data=data,
+                   columns=["Model", "Kind", "Name", "Is Monitored", "Pinned", "Elevation", "Workset", "Scope Box"])
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+__title__   = "Level Monitor\nBatch"
+__doc__     = """Version = 1.1
+Date    = 16.10.2026
+________________________________________________________________
+Description:
+Level Is Monitor for a whole folder of models, without opening them in the UI.
+Every RVT file is opened detached from central with its worksets closed,
+its levels and grids are audited (copy/monitor, pinned, workset, scope box)
+and the file is closed without saving.
+All results go to one CSV report in the folder, written as each file is
+done - a long run can be left overnight: Revit dialogs are dismissed and
+warnings / errors while opening are answered automatically, and listed at
+the end.
+________________________________________________________________
+How-To:
+1. Click the button and pick the folder with the models (sub folders included).
+2. Confirm - the models are audited one by one (Cancel stops after the current file).
+3. Open the CSV report; a summary per model and the problems met are printed at the end.
+________________________________________________________________
+Last update:
+- [16.10.2026] - V1.1: Dialogs and failures while opening are answered and listed, nothing waits for a click.
+- [16.10.2026] - V1.0: First version.
+________________________________________________________________
+Author: Arbel Tal"""
+
+import os
+import time
+from pyrevit import forms, script
+from pytal_datum import audit_folder, find_models, TARGET_WORKSET_NAME
+
+app = __revit__.Application
+output = script.get_output()
+
+# --- בחירת תיקייה ---
+folder = forms.pick_folder(title="Select Folder with Revit Models")
+if not folder:
+    script.exit()
+
+paths = find_models(folder)
+if not paths:
+    forms.alert("No Revit models (.rvt) found in:\n{}".format(folder), exitscript=True)
+
+if not forms.alert("Audit {} models?\nEach model is opened detached, audited and closed without saving.".format(
+        len(paths)), yes=True, no=True):
+    script.exit()
+
+report_path = os.path.join(folder, "Level Monitor Audit {}.csv".format(time.strftime("%Y-%m-%d %H-%M")))
+
+# --- ביקורת הקבצים ---
+start = time.time()
+with forms.ProgressBar(title="Auditing models... ({value}/{max_value})", cancellable=True) as pb:
+    def on_done(path, error, done, total):
+        print("[{}/{}] {} - {}".format(done, total, os.path.basename(path),
+                                       "Failed: {}".format(error) if error else "OK"))
+        pb.update_progress(done, total)
+
+    rows, failures = audit_folder(app, paths, report_path, on_done=on_done, is_cancelled=lambda: pb.cancelled,
+                                  uiapp=__revit__)
+
+# --- סיכום לכל מודל ---
+summary = {}
+for row in rows:
+    counts = summary.setdefault(row.model, [0, 0, 0, 0, 0])
+    counts[0 if row.kind == "Level" else 1] += 1
+    counts[2] += not row.monitored
+    counts[3] += not row.pinned
+    counts[4] += row.workset not in ("-", TARGET_WORKSET_NAME)
+
+output.print_md("## ✅ Audited {} of {} models in {:.0f} min".format(
+    len(summary), len(paths), (time.time() - start) / 60.0))
+output.print_table(table_data=[[model] + counts for model, counts in sorted(summary.items())],
+                   columns=["Model", "Levels", "Grids", "Not Monitored", "Not Pinned",
+                            "Not on '{}'".format(TARGET_WORKSET_NAME)])
+
+if failures:
+    # Files that could not be opened, dialogs dismissed and failures answered while opening
+    output.print_md("## ⚠️ {} problems in {} models".format(len(failures), len(set(path for path, _ in failures))))
+    output.print_table(table_data=[[os.path.basename(path), error] for path, error in failures],
+                       columns=["File", "Problem"])
+
+if rows:
+    output.print_md("Report: {}".format(report_path))
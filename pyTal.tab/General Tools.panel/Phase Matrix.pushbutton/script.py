@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+__title__   = "Phase\nMatrix"
+__doc__     = """Version = 1.0
+Date    = 16.10.2026
+________________________________________________________________
+Description:
+Phase QA for the whole model in one pass: how many elements of every
+category were created / demolished in every phase combination.
+Click a count in the table to select its elements, or pick one or more
+cells at the end to select them all.
+________________________________________________________________
+How-To:
+1. Click the button.
+2. Read the matrix: a row per category, a column per phase created / demolished.
+3. Click a count (small cells), or pick cells in the list to select their elements.
+4. Shift+Click to rebuild the element index.
+________________________________________________________________
+Last update:
+- [16.10.2026] - V1.0: First version.
+________________________________________________________________
+Author: Arbel Tal"""
+
+from pyrevit import revit, forms, script, DB
+from System.Collections.Generic import List
+from pytal_index import get_index, id_value, to_element_id, INVALID_ID
+from pytal_phases import phase_matrix
+
+# Cells with more elements are printed without a link (the link would be huge); select them from the list
+LINK_LIMIT = 500
+
+uidoc = __revit__.ActiveUIDocument
+doc = revit.doc
+output = script.get_output()
+
+# --- שלב 1: מטריצה במעבר אחד על האינדקס (Shift+Click בונה אותו מחדש) ---
+cells = phase_matrix(get_index(doc, rebuild=__shiftclick__))
+if not cells:
+    forms.alert("No elements with phases found in the model.", exitscript=True)
+
+# Phases in sequence order, category names
+phases = list(DB.FilteredElementCollector(doc).OfClass(DB.Phase))
+phase_order = dict((id_value(phase.Id), i) for i, phase in enumerate(phases))
+phase_names = dict((id_value(phase.Id), phase.Name) for phase in phases)
+phase_names[INVALID_ID] = "-"
+category_names = dict((id_value(cat.Id), cat.Name) for cat in doc.Settings.Categories)
+
+
+def combination_label(created, demolished):
+    return "{} / {}".format(phase_names.get(created, created), phase_names.get(demolished, demolished))
+
+
+# Columns: (created, demolished) combinations present in the model, by phase sequence
+combinations = sorted(set((created, demolished) for _, created, demolished in cells),
+                      key=lambda c: (phase_order.get(c[0], 0), phase_order.get(c[1], -1)))
+categories = sorted(set(category for category, _, _ in cells), key=lambda c: category_names.get(c, str(c)))
+
+# --- שלב 2: טבלה ---
+def cell_display(ids):
+    if not ids:
+        return ""
+    if len(ids) > LINK_LIMIT:
+        return str(len(ids))
+    return output.linkify([to_element_id(i) for i in ids], title=str(len(ids)))
+
+data = []
+for category in categories:
+    row_ids = [cells.get((category, created, demolished), []) for created, demolished in combinations]
+    data.append([category_names.get(category, str(category))] + [cell_display(ids) for ids in row_ids] +
+                [str(sum(len(ids) for ids in row_ids))])
+
+output.print_md("## Phase Matrix - {} elements".format(sum(len(ids) for ids in cells.values())))
+output.print_md("Columns are **Phase Created / Phase Demolished** (- = not demolished).")
+output.print_table(table_data=data,
+                   columns=["Category"] + [combination_label(c, d) for c, d in combinations] + ["Total"])
+
+# --- שלב 3: בחירת אלמנטים מתאים ---
+cell_labels = {}
+for (category, created, demolished), ids in cells.items():
+    label = "{} | {} ({})".format(category_names.get(category, category), combination_label(created, demolished),
+                                  len(ids))
+    cell_labels[label] = ids
+
+selected_labels = forms.SelectFromList.show(sorted(cell_labels), title="Select the Elements of Cells (optional)",
+                                            multiselect=True)
+if selected_labels:
+    selected_ids = [to_element_id(i) for label in selected_labels for i in cell_labels[label]]
+    uidoc.Selection.SetElementIds(List[DB.ElementId](selected_ids))
+    output.print_md("Selected **{}** elements.".format(len(selected_ids)))
@@ -1,68 +1,58 @@
 # -*- coding: utf-8 -*-
 import os
 import sys
-import subprocess
 from pyrevit import forms, script
 
+from pytal_pdf import (available_backends, pick_fastest_backend, default_workers, find_pdfs,
+                       CompressJob, SkipCache, plan_tasks, run_queue, summary_rows, total_line)
+
 __title__ = 'Shrink PDF'
-__doc__ = 'Compresses a selected PDF file using PDF24.'
+__doc__ = """Compresses selected PDF files (or a whole folder) using PDF24 or Ghostscript, several files at a time.
+Files that did not change since they were last compressed with the same quality are skipped.
+Very large files are compressed in page chunks (Ghostscript only) to keep memory use low.
+Shift+Click to compress all files again."""
 
-def find_pdf24_doctool():
-    """Attempts to find the PDF24 DocTool executable."""
-    paths = [
-        r"C:\Program Files\PDF24\pdf24-DocTool.exe",
-        r"C:\Program Files (x86)\PDF24\pdf24-DocTool.exe",
-    ]
-    
-    for path in paths:
-        if os.path.exists(path):
-            return path
-            
-    # Check default install dir if user installed elsewhere
-    # (Assuming standard install for now)
-    return None
-
-def compress_pdf_pdf24(input_path, output_path, dpi=144, quality=75):
-    """Compresses PDF using PDF24 CLI."""
-    
-    doctool = find_pdf24_doctool()
-    if not doctool:
-        forms.alert(
-            "PDF24 not found.\nPlease install PDF24 Creator or check the installation path.\n(Expected at C:\\Program Files\\PDF24)",
-            exitscript=True
-        )
-        return False
-        
-    # Command: pdf24-DocTool.exe -compress -dpi 144 -imageQuality 75 -outputFile "output.pdf" "input.pdf"
-    cmd = [
-        doctool,
-        "-compress",
-        "-dpi", str(dpi),
-        "-imageQuality", str(quality),
-        "-outputFile", output_path,
-        input_path
-    ]
-    
-    try:
-        # Use subprocess to call the exe
-        # Shell=True might be needed for some windows execution contexts, but try without first for safety
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
-        stdout, stderr = process.communicate()
-        
-        if process.returncode == 0:
-            return True
-        else:
-            print("PDF24 Error: {}".format(stderr))
-            return False
-            
-    except Exception as e:
-        print("Error calling PDF24: {}".format(e))
-        return False
+AUTO_BACKEND = "Auto (fastest)"
+
+def collect_input_files():
+    """Asks for files or a folder. Returns a list of PDF paths (may be empty)."""
+    source = forms.CommandSwitchWindow.show(["Select Files", "Whole Folder"], message="Compress PDFs from:")
+    if source == "Select Files":
+        files = forms.pick_file(file_ext='pdf', multi_file=True, title='Select PDFs to Compress')
+        return list(files or [])
+    if source == "Whole Folder":
+        folder = forms.pick_folder(title='Select Folder with PDFs')
+        return find_pdfs(folder) if folder else []
+    return []
+
+def choose_backend(backends, input_pdfs, dpi, quality):
+    """Lets the user pick a backend when several are installed; Auto benchmarks them on the smallest file."""
+    if len(backends) == 1:
+        return backends[0]
+    selected = forms.CommandSwitchWindow.show([AUTO_BACKEND] + [b.name for b in backends],
+                                              message="Compression engine:")
+    if not selected:
+        return None
+    if selected != AUTO_BACKEND:
+        return [b for b in backends if b.name == selected][0]
+    sample = min(input_pdfs, key=os.path.getsize)
+    print("Testing engines on {}...".format(os.path.basename(sample)))
+    backend = pick_fastest_backend(sample, dpi, quality, backends)
+    if not backend:
+        print("No engine could compress the test file.")
+    return backend
+
+def print_summary(jobs):
+    rows, totals = summary_rows(jobs)
+    script.get_output().print_table(table_data=rows,
+                                    columns=["File", "Original (MB)", "New (MB)", "Reduction", "Status"])
+    if total_line(totals):
+        print(total_line(totals))
 
 def main():
-    # 1. Pick File
-    input_pdf = forms.pick_file(file_ext='pdf', title='Select PDF to Compress')
-    if not input_pdf:
+    # 1. Pick Files / Folder
+    input_pdfs = collect_input_files()
+    if not input_pdfs:
         return
 
     # 2. Configure Quality
@@ -72,14 +62,14 @@ def main():
         "Medium Quality (Ebook/Office)": (144, 75),
         "Low Quality (Screen/Email)": (72, 60)
     }
-    
+
     # User requested specific order
     options = [
         "Low Quality (Screen/Email)",
         "Medium Quality (Ebook/Office)",
         "High Quality (Printer)"
     ]
-    
+
     selected_name = forms.SelectFromList.show(
         options,
         title='Select Compression Level',
@@ -87,34 +77,61 @@ def main():
         width=300,
         height=220
     )
-    
+
     if not selected_name:
         return
-        
+
     dpi, quality = profiles[selected_name]
 
-    output_pdf = input_pdf.replace(".pdf", "_compressed.pdf")
-    
-    print("Compressing: {}...".format(input_pdf))
-    print("Using PDF24 (DPI: {}, Quality: {})...".format(dpi, quality))
-    
-    success = compress_pdf_pdf24(input_pdf, output_pdf, dpi, quality)
-    
-    if success:
-        if os.path.exists(output_pdf):
-            old_size = os.path.getsize(input_pdf)
-            new_size = os.path.getsize(output_pdf)
-            ratio = (1 - (float(new_size) / old_size)) * 100
-            
-            print("Done! Saved as: {}".format(output_pdf))
-            print("Original Size: {:.2f} MB".format(old_size / (1024*1024.0)))
-            print("New Size: {:.2f} MB".format(new_size / (1024*1024.0)))
-            print("Reduction: {:.1f}%".format(ratio))
-        else:
-            print("Error: Output file not created. (Check PDF24 installation?)")
-    else:
-        print("Compression failed.")
+    # 3. Skip files that are unchanged since their last compression with this profile
+    jobs = [CompressJob(path) for path in input_pdfs]
+    # One manifest per user in pyRevit's data folder - not in the (shared) drawing folders
+    skip_cache = SkipCache(script.get_universal_data_file("ShrinkManifest", "json"))
+    to_run = jobs if __shiftclick__ else skip_cache.split(jobs, dpi, quality)
+    if not to_run:
+        skip_cache.save()
+        print("All {} files are unchanged since they were last compressed. (Shift+Click to compress again)".format(
+            len(jobs)))
+        print_summary(jobs)
+        return
+
+    # 4. Compression Engine
+    backends = available_backends(dpi, quality)
+    if not backends:
+        forms.alert(
+            "No PDF compressor found.\nPlease install PDF24 Creator (C:\\Program Files\\PDF24) or Ghostscript.",
+            exitscript=True
+        )
+        return
+    backend = choose_backend(backends, [job.input_path for job in to_run], dpi, quality)
+    if not backend:
+        return
+
+    workers = default_workers()
+    print("Compressing {} files using {} (DPI: {}, Quality: {}, {} at a time, {} unchanged)...".format(
+        len(to_run), backend.name, dpi, quality, workers, len(jobs) - len(to_run)))
+
+    # 5. Compress
+    def on_done(task, done, total):
+        if task.result is not None:
+            skip_cache.record(task.result, dpi, quality)
+        print("[{}/{}] {} - {}".format(done, total, task.label, task.status))
+
+    try:
+        # Large files are split into page chunks + a final merge
+        tasks = plan_tasks(to_run, backend)
+        with forms.ProgressBar(title='Compressing PDFs... ({value}/{max_value})', cancellable=True) as pb:
+            # update_progress also keeps the progress bar (and Revit) responsive while we wait
+            finished = run_queue(tasks, backend, dpi, quality, workers,
+                                 on_progress=pb.update_progress, on_done=on_done,
+                                 is_cancelled=lambda: pb.cancelled)
+    finally:
+        skip_cache.save()
+    if not finished:
+        print("Cancelled - running compressions were stopped.")
+
+    # 6. Summary
+    print_summary(jobs)
 
 if __name__ == '__main__':
     main()
-
@@ -1,19 +1,28 @@
 """Copy Legends From Link"""
 # -*- coding: utf-8 -*-
 __title__ = "Copy Legends\nFrom Link"
-__doc__ = """Version = 1.0
-Date    = 13.01.2025
+__doc__ = """Version = 1.2
+Date    = 16.10.2026
 ________________________________________________________________
 Description:
-Select link from list to copy legends from.
+Select one or more links and the kinds of views to copy from them:
+legends, drafting views, schedules and view templates.
+All selected views of a link are copied at once; types that exist in both
+models keep the host version (no duplicate types dialog).
+Views whose name already exists in the model can be skipped or copied
+with the link name added.
+The views list of every link is remembered until the link is reloaded,
+so the list opens right away the next time (Shift+Click to read the
+links again).
 ________________________________________________________________
 Last Updates:
+- [16.10.2026] v1.2 Several links, drafting views / schedules / view templates, remembered views lists
+- [16.10.2026] v1.1 One copy for all legends, existing names: skip / rename
 - [13.01.2025] v1.0 Change Description
 ________________________________________________________________
 Author: Arbel Tal"""
 
 import clr
-from System.Collections.Generic import List
 
 # Import pyRevit forms
 from pyrevit import forms
@@ -22,10 +31,10 @@ from pyrevit import forms
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
 from Autodesk.Revit.DB import (
-    FilteredElementCollector, ViewType, Transaction,
-    ElementId, ViewDuplicateOption, View, RevitLinkInstance,
-    CopyPasteOptions, ElementTransformUtils
+    FilteredElementCollector, Transaction, RevitLinkInstance
 )
+from pytal_index import to_element_id
+from pytal_views import view_catalog, copy_views, view_names_by_kind, KINDS, SKIP, RENAME
 
 doc = __revit__.ActiveUIDocument.Document
 uidoc = __revit__.ActiveUIDocument
@@ -45,91 +54,117 @@ for link in links:
 if not link_dict:
     forms.alert("No loaded Revit links found in current document", exitscript=True)
 
-# Calculate form size based on number of links and longest name
-num_links = len(link_dict)
+# Form size based on number of items and longest name
 min_height = 100  # Minimum height
 min_width = 300   # Minimum width
-height_per_item = 30  # Height per link item
+height_per_item = 30  # Height per item
 width_per_char = 8    # Approximate width per character
 
-# Calculate heights
-form_height = max(min_height, min(400, num_links * height_per_item + 80))
 
-# Calculate width based on longest link name
-max_link_length = max(len(name) for name in link_dict.keys())
-form_width = max(min_width, min(800, max_link_length * width_per_char + 100))  # Add padding and cap at 800px
+def form_size(names, max_height):
+    height = max(min_height, min(max_height, len(names) * height_per_item + 80))
+    width = max(min_width, min(800, max(len(name) for name in names) * width_per_char + 100))
+    return width, height
+
 
 # Show link selector form using pyRevit forms with adjusted size
-selected_link_name = forms.SelectFromList.show(
+form_width, form_height = form_size(list(link_dict.keys()), 400)
+selected_link_names = forms.SelectFromList.show(
     sorted(link_dict.keys()),
-    title='Select Revit Link',
-    button_name='Select Link',
-    multiselect=False,
+    title='Select Revit Links',
+    button_name='Select Links',
+    multiselect=True,
     width=form_width,
     height=form_height
 )
 
-if not selected_link_name:
+if not selected_link_names:
     forms.alert("No link was selected", exitscript=True)
 
-link_doc = link_dict[selected_link_name]
-
-# Get legends from selected link
-legends = FilteredElementCollector(link_doc)\
-    .OfClass(View)\
-    .WhereElementIsNotElementType()\
-    .ToElements()
-
-# Create dictionary of legend names and elements
-legend_dict = {legend.Name: legend for legend in legends 
-              if legend.ViewType == ViewType.Legend}
-
-if not legend_dict:
-    forms.alert("No legends found in selected link", exitscript=True)
-
-# Calculate form size for legends based on number and longest name
-num_legends = len(legend_dict)
-legend_form_height = max(min_height, min(600, num_legends * height_per_item + 80))
-
-# Calculate width based on longest legend name
-max_legend_length = max(len(name) for name in legend_dict.keys())
-legend_form_width = max(min_width, min(800, max_legend_length * width_per_char + 100))
+# Kinds of views to copy
+selected_kinds = forms.SelectFromList.show(
+    KINDS,
+    title='Select View Kinds',
+    button_name='Select',
+    multiselect=True,
+    width=min_width,
+    height=min_height + len(KINDS) * height_per_item
+)
 
-# Show legend selector form using pyRevit forms
-selected_legend_names = forms.SelectFromList.show(
-    sorted(legend_dict.keys()),
-    title='Select Legends to Copy',
+if not selected_kinds:
+    forms.alert("No view kind selected", exitscript=True)
+
+# Views of the selected links - (id, name, kind) lists remembered per link version (Shift+Click reads them again)
+view_dict = {}  # label -> (link name, view id, name, kind)
+for link_name in selected_link_names:
+    for view_id, name, kind in view_catalog(link_dict[link_name], rebuild=__shiftclick__):
+        if kind in selected_kinds:
+            label = "{}: {}".format(kind, name)
+            if len(selected_link_names) > 1:
+                label = "{} | {}".format(link_name, label)
+            view_dict[label] = (link_name, view_id, name, kind)
+
+if not view_dict:
+    forms.alert("No {} found in the selected links".format(
+        " / ".join(kind.lower() + "s" for kind in selected_kinds)), exitscript=True)
+
+# Show view selector form using pyRevit forms
+view_form_width, view_form_height = form_size(list(view_dict.keys()), 600)
+selected_labels = forms.SelectFromList.show(
+    sorted(view_dict.keys()),
+    title='Select Views to Copy',
     button_name='Copy Selected',
     multiselect=True,
-    width=legend_form_width,
-    height=legend_form_height
+    width=view_form_width,
+    height=view_form_height
 )
 
-if not selected_legend_names:
-    forms.alert("No legends selected", exitscript=True)
-
-# Get selected legend elements
-selected_legends = [legend_dict[name] for name in selected_legend_names]
-
-# Copy selected legends
-t = Transaction(doc, "Copy Legends from Link")
-t.Start()
-
-# Create copy/paste options
-copy_options = CopyPasteOptions()
-
-for legend in selected_legends:
-    # Create a list of element ids to copy
-    element_list = List[ElementId]([legend.Id])
-    
-    # Copy the legend from link to current document
-    ElementTransformUtils.CopyElements(
-        link_doc,           # source document
-        element_list,       # elements to copy
-        doc,               # destination document
-        None,              # no transform needed
-        copy_options
+if not selected_labels:
+    forms.alert("No views selected", exitscript=True)
+
+selected_views = [view_dict[label] for label in sorted(selected_labels)]
+
+# Views whose name is already used in this model (or by a view of the same kind from another selected link)
+existing_names = view_names_by_kind(doc)
+clashing, seen = [], set()
+for link_name, view_id, name, kind in selected_views:
+    if name in existing_names[kind] or (kind, name) in seen:
+        clashing.append("{}: {}".format(kind, name))
+    seen.add((kind, name))
+conflicts = SKIP
+if clashing:
+    rename_option = "Copy as '<name> (<link name>)'"
+    choice = forms.CommandSwitchWindow.show(
+        ["Skip existing", rename_option],
+        message="{} views already exist in this model:\n{}".format(
+            len(clashing), "\n".join(clashing[:10]) + ("\n..." if len(clashing) > 10 else ""))
     )
-    print("Copied legend: " + legend.Name)
+    if not choice:
+        forms.alert("Nothing was copied", exitscript=True)
+    conflicts = RENAME if choice == rename_option else SKIP
 
-t.Commit()
+# Copy selected views - one CopyElements call per link
+reports = []
+t = Transaction(doc, "Copy Views from Links")
+t.Start()
+try:
+    for link_name in selected_link_names:
+        link_doc = link_dict[link_name]
+        views = [link_doc.GetElement(to_element_id(view_id))
+                 for source_link, view_id, _, _ in selected_views if source_link == link_name]
+        views = [view for view in views if view is not None]
+        if views:
+            reports.append((link_name, copy_views(link_doc, views, doc, conflicts=conflicts, suffix=link_name)))
+    t.Commit()
+except Exception as e:
+    t.RollBack()
+    forms.alert("Could not copy the views:\n{}".format(e), exitscript=True)
+
+for link_name, report in reports:
+    for source_name, new_name in report.copied:
+        if new_name == source_name:
+            print("Copied from {}: {}".format(link_name, new_name))
+        else:
+            print("Copied from {}: {} as {}".format(link_name, source_name, new_name))
+    for name in report.skipped:
+        print("Skipped from {} (already in the model): {}".format(link_name, name))
@@ -1,15 +1,26 @@
 """Create Filled Region"""
 # -*- coding: utf-8 -*-
 __title__ = "Create\nFilled Region"
-__doc__ = """Version = 1.0
-Date    = 31.12.2024
+__doc__ = """Version = 1.2
+Date    = 16.10.2026
 ________________________________________________________________
 Description:
-Create filled region from selected closed polygon.
-1. select detail lines that forms closed polygon. 
-2. delete the detail lines.
+Create filled regions from closed polygons, rooms or areas.
+Choose what to fill:
+- Pick Detail Lines: select detail lines that form one or more closed
+  polygons - in any order and direction (exploded CAD lines too).
+- All Detail Lines in View: every closed polygon of detail lines in the view.
+- Rooms / Areas in View: a filled region for every room / area boundary.
+  The filled region type can follow a parameter of the rooms / areas: a value
+  gets the type with the same name, other values get the type you choose.
+Every outer polygon becomes a filled region; polygons inside it become its
+holes (a polygon inside a hole is a new region). The detail lines of the
+created regions are deleted; lines that are not part of a closed polygon
+are kept. Everything is done in one transaction (one Undo).
 ________________________________________________________________
 Last Updates:
+- [16.10.2026] v1.2 Rooms / areas / all detail lines in the view, type by parameter, one transaction
+- [16.10.2026] v1.1 Several polygons and holes in one click, reversed lines, fast for thousands of lines
 - [31.12.2024] v1.0 Change Description
 ________________________________________________________________
 Author: Arbel Tal"""
@@ -17,9 +28,21 @@ Author: Arbel Tal"""
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI import TaskDialog
 from Autodesk.Revit.UI.Selection import ObjectType
-from Autodesk.Revit.Exceptions import InvalidOperationException
+from Autodesk.Revit.Exceptions import ArgumentException, InvalidOperationException, OperationCanceledException
+from System.Collections.Generic import List
 import clr
 
+from pyrevit import forms, script
+from pytal_loops import chain_loops, nest_loops, curve_loop, boundary_loops
+from pytal_params import find_parameter
+from pytal_takeoff import parameter_text
+
+PICK_LINES = "Pick Detail Lines"
+VIEW_LINES = "All Detail Lines in View"
+ROOMS = "Rooms in View"
+AREAS = "Areas in View"
+ONE_TYPE = "<One type for all>"
+
 # Access the Revit application and document
 uiapp = __revit__
 uidoc = uiapp.ActiveUIDocument
@@ -29,100 +52,166 @@ if not uidoc:
     raise Exception("No ActiveUIDocument found.")
 
 doc = uidoc.Document
-
-
-# Function to compare points with a tolerance
-def points_are_equal(point1, point2, tolerance=1e-6):
-    return abs(point1.X - point2.X) < tolerance and \
-        abs(point1.Y - point2.Y) < tolerance and \
-        abs(point1.Z - point2.Z) < tolerance
+view = doc.ActiveView
 
 
 # Prompt the user to select detail lines
 def select_detail_lines():
     try:
-        sel = uidoc.Selection.PickObjects(ObjectType.Element, "Select detail lines to form a closed polygon.")
+        sel = uidoc.Selection.PickObjects(ObjectType.Element, "Select detail lines to form closed polygons.")
         return [doc.GetElement(ref) for ref in sel]
-    except InvalidOperationException:
+    except (InvalidOperationException, OperationCanceledException):
         return None
 
 
-# Check if the selected detail lines form a closed polygon
-def is_closed_polygon(detail_lines):
-    endpoints = []
-    for line in detail_lines:
-        curve = line.GeometryCurve
-        endpoints.append((curve.GetEndPoint(0), curve.GetEndPoint(1)))
-
-    # Check if endpoints match with tolerance
-    start_to_end = {start: end for start, end in endpoints}
-    start_point = endpoints[0][0]
-    current_point = start_point
-    for _ in range(len(endpoints)):
-        found_match = False
-        for start, end in start_to_end.items():
-            if points_are_equal(current_point, start):
-                current_point = end
-                found_match = True
-                break
-        if not found_match:
-            return False
-    return points_are_equal(current_point, start_point)
-
-
-# Create a filled region from the closed polygon
-def create_filled_region(detail_lines):
-    filled_region_type = FilteredElementCollector(doc).OfClass(FilledRegionType).FirstElement()
-    if not filled_region_type:
-        TaskDialog.Show("Error", "No filled region type found in the project.")
-        return None
+# All detail lines of the active view
+def view_detail_lines():
+    return [el for el in FilteredElementCollector(doc, view.Id).OfCategory(BuiltInCategory.OST_Lines)
+            .WhereElementIsNotElementType() if isinstance(el, CurveElement) and el.OwnerViewId == view.Id]
 
-    try:
-        with Transaction(doc, "Create Filled Region") as t:
-            t.Start()
 
-            # Create a CurveLoop instead of CurveArray
-            curves = [line.GeometryCurve for line in detail_lines]
-            curve_loop = CurveLoop()
-            for curve in curves:
-                curve_loop.Append(curve)
+# Placed rooms / areas seen in the active view
+def view_spatial_elements(category):
+    return list(FilteredElementCollector(doc, view.Id).OfCategory(category).WhereElementIsNotElementType())
 
-            view = doc.ActiveView
-            filled_region = FilledRegion.Create(doc, filled_region_type.Id, view.Id,
-                                                [curve_loop])  # Pass a list of CurveLoop
 
-            t.Commit()
-            return filled_region
+def type_name(element_type):
+    return Element.Name.__get__(element_type)
 
-    except Exception as e:
-        TaskDialog.Show("Error", str(e))
-        return None
 
+# Filled region type of every element: by the value of a parameter the user picks, the chosen type otherwise
+def choose_type_mapping(elements, region_types):
+    names = set()
+    for param in elements[0].Parameters:
+        if param.StorageType == StorageType.String:
+            names.add(param.Definition.Name)
+    param_name = forms.SelectFromList.show([ONE_TYPE] + sorted(names), title="Filled Region Type by Parameter",
+                                           button_name="Select")
+    if not param_name:
+        return None
 
-# Delete the selected detail lines
-def delete_detail_lines(detail_lines):
+    types_by_name = dict((type_name(t), t) for t in region_types)
+    default_name = forms.SelectFromList.show(
+        sorted(types_by_name), button_name="Select",
+        title="Filled Region Type" if param_name == ONE_TYPE else "Filled Region Type for Other Values")
+    if not default_name:
+        return None
+    if param_name == ONE_TYPE:
+        return dict((el.Id, types_by_name[default_name].Id) for el in elements), []
+
+    types_by_lower = dict((name.lower(), t) for name, t in types_by_name.items())
+    mapping, values = {}, {}
+    for el in elements:
+        value = parameter_text(find_parameter(el, param_name))
+        region_type = types_by_lower.get(value.lower(), types_by_name[default_name])
+        mapping[el.Id] = region_type.Id
+        key = (value or "<empty>", type_name(region_type))
+        values[key] = values.get(key, 0) + 1
+    return mapping, [[value, name, str(count)] for (value, name), count in sorted(values.items())]
+
+
+# Create every (outer, holes, type id) region and delete the lines of the created ones - one transaction,
+# a sub-transaction per region so a region Revit refuses is rolled back on its own
+def create_filled_regions(plans, lines):
+    created, failed, deleted = [], [], 0
     try:
-        with Transaction(doc, "Delete Detail Lines") as t:
+        with Transaction(doc, "Create Filled Regions") as t:
             t.Start()
 
-            for line in detail_lines:
-                doc.Delete(line.Id)
+            for outer, holes, type_id in plans:
+                st = SubTransaction(doc)
+                st.Start()
+                try:
+                    FilledRegion.Create(doc, type_id, view.Id, [curve_loop(loop.curves) for loop in [outer] + holes])
+                    st.Commit()
+                    created.append((outer, holes))
+                except (ArgumentException, InvalidOperationException) as e:
+                    st.RollBack()
+                    failed.append(str(e))
+
+            used = [lines[i].Id for outer, holes in created for loop in [outer] + holes for i in loop.indices]
+            if used:
+                doc.Delete(List[ElementId](used))
+                deleted = len(used)
 
             t.Commit()
 
     except Exception as e:
         TaskDialog.Show("Error", str(e))
+        return [], [], 0
+    return created, failed, deleted
 
 
 # Main execution
-selected_lines = select_detail_lines()
-if selected_lines:
-    if is_closed_polygon(selected_lines):
-        filled_region = create_filled_region(selected_lines)
-        if filled_region:
-            delete_detail_lines(selected_lines)
-            TaskDialog.Show("Success", "Filled region created, and detail lines deleted.")
-    else:
+mode = forms.CommandSwitchWindow.show([PICK_LINES, VIEW_LINES, ROOMS, AREAS], message="Create filled regions from:")
+if not mode:
+    script.exit()
+
+region_types = list(FilteredElementCollector(doc).OfClass(FilledRegionType))
+if not region_types:
+    TaskDialog.Show("Error", "No filled region type found in the project.")
+    script.exit()
+
+plans, lines, notes, mapping_table = [], [], [], []
+if mode in (PICK_LINES, VIEW_LINES):
+    selected = select_detail_lines() if mode == PICK_LINES else view_detail_lines()
+    if not selected:
+        TaskDialog.Show("Cancelled", "No detail lines selected." if mode == PICK_LINES else
+                        "No detail lines in the active view.")
+        script.exit()
+    lines = [el for el in selected if isinstance(el, CurveElement)]
+    loops, open_indices = chain_loops([line.GeometryCurve for line in lines])
+    if not loops:
         TaskDialog.Show("Error", "Selected detail lines do not form a closed polygon.")
+        script.exit()
+    type_id = region_types[0].Id
+    if mode == VIEW_LINES and len(region_types) > 1:
+        types_by_name = dict((type_name(t), t) for t in region_types)
+        chosen = forms.SelectFromList.show(sorted(types_by_name), title="Filled Region Type", button_name="Select")
+        if not chosen:
+            script.exit()
+        type_id = types_by_name[chosen].Id
+    plans = [(outer, holes, type_id) for outer, holes in nest_loops(loops, view.RightDirection, view.UpDirection)]
+    if open_indices:
+        notes.append("{} lines are not part of a closed polygon and were kept.".format(len(open_indices)))
+else:
+    elements = view_spatial_elements(BuiltInCategory.OST_Rooms if mode == ROOMS else BuiltInCategory.OST_Areas)
+    if not elements:
+        TaskDialog.Show("Error", "No {} found in the active view.".format("rooms" if mode == ROOMS else "areas"))
+        script.exit()
+    chosen = choose_type_mapping(elements, region_types)
+    if not chosen:
+        script.exit()
+    type_by_element, mapping_table = chosen
+    options = SpatialElementBoundaryOptions()
+    not_enclosed = 0
+    for el in elements:
+        loops = boundary_loops(el, options)
+        if not loops:
+            not_enclosed += 1
+            continue
+        for outer, holes in nest_loops(loops, view.RightDirection, view.UpDirection):
+            plans.append((outer, holes, type_by_element[el.Id]))
+    if not_enclosed:
+        notes.append("{} {} are not placed or not enclosed and were skipped.".format(
+            not_enclosed, "rooms" if mode == ROOMS else "areas"))
+
+created, failed, deleted = create_filled_regions(plans, lines)
+if mapping_table:
+    output = script.get_output()
+    output.print_md("## Filled Region Types")
+    output.print_table(table_data=mapping_table, columns=["Value", "Filled Region Type", "Count"])
+
+if created:
+    message = "{} filled regions created ({} holes).".format(len(created), sum(len(holes) for _, holes in created))
+    if deleted:
+        message += "\n{} detail lines deleted.".format(deleted)
+    for note in notes:
+        message += "\n" + note
+    if failed:
+        message += "\n{} polygons could not be filled:\n{}".format(len(failed), "\n".join(sorted(set(failed))))
+    TaskDialog.Show("Success", message)
+elif failed:
+    TaskDialog.Show("Error", "No filled region could be created:\n{}".format("\n".join(sorted(set(failed)))))
 else:
-    TaskDialog.Show("Cancelled", "No detail lines selected.")
+    TaskDialog.Show("Error", "\n".join(["No filled region was created."] + notes))
@@ -1,5 +1,16 @@
 # -*- coding: utf-8 -*-
-from pyrevit import forms
+__doc__ = """Dimension family instances to walls (host or linked).
+________________________________________________________________
+How-To:
+Single mode: pick a family, pick a wall, click to place
+(click on an existing dimension to align with it). ESC to finish.
+Batch mode: pre-select family instances and click the button.
+Each family is dimensioned to its nearest wall in one transaction,
+with a shared offset from the family center.
+________________________________________________________________
+Author: Arbel Tal"""
+
+from pyrevit import forms, script
 from Autodesk.Revit.DB import (
     FilteredElementCollector,
     BuiltInCategory,
@@ -20,10 +31,13 @@ from Autodesk.Revit.DB import (
     HostObject,
     TransactionStatus,
     ElementId,
-    LocationCurve
+    LocationCurve,
+    SubTransaction
 )
 from Autodesk.Revit.UI.Selection import ObjectType, ISelectionFilter
 from Autodesk.Revit.Exceptions import OperationCanceledException
+from pytal_index import id_value
+from pytal_spatial import SegmentGrid
 
 # Get the active document and view
 uidoc = __revit__.ActiveUIDocument
@@ -72,66 +86,321 @@ def get_family_center_ref(fam_inst):
     if refs: return refs[0]
     return None
 
-def get_best_wall_face_ref(target_wall, link_instance, source_pt, doc_context):
+# Per-session geometry caches: repeat family / wall pairs resolve with pure arithmetic
+link_transform_cache = {}  # link instance id -> (transform, inverse)
+wall_face_cache = {}       # (link instance id or None, wall id) -> [(dimension ref, origin, normal, face)]
+
+def get_link_transforms(link_instance):
+    """Returns (transform, inverse transform) of a link instance, cached per session."""
+    key = id_value(link_instance.Id)
+    transforms = link_transform_cache.get(key)
+    if transforms is None:
+        transform = link_instance.GetTransform()
+        transforms = (transform, transform.Inverse)
+        link_transform_cache[key] = transforms
+    return transforms
+
+def get_wall_faces(target_wall, link_instance):
     """
-    Finds the face of the wall closest to source_pt.
-    Returns a Reference valid for Dimensioning (LinkRef if needed).
+    Side faces (Exterior and Interior) of a wall, cached per (link instance, wall).
+    Each entry holds the Reference valid for Dimensioning (LinkRef if needed)
+    and the face plane in the wall's own document coordinates.
     """
-    # Get Side Faces (Exterior and Interior)
-    # The references returned are geometric references.
+    key = (id_value(link_instance.Id) if link_instance else None, id_value(target_wall.Id))
+    faces = wall_face_cache.get(key)
+    if faces is not None:
+        return faces
+
+    faces = []
     try:
         refs_ext = HostObjectUtils.GetSideFaces(target_wall, ShellLayerType.Exterior)
         refs_int = HostObjectUtils.GetSideFaces(target_wall, ShellLayerType.Interior)
     except Exception:
         # Not a HostObject (e.g. In-Place Wall maybe?)
+        wall_face_cache[key] = faces
+        return faces
+
+    for ref in list(refs_ext) + list(refs_int):
+        # Geometry is read from the wall's own document using the local reference
+        geom_obj = None
+        try:
+            geom_obj = target_wall.GetGeometryObjectFromReference(ref)
+        except Exception:
+            pass
+
+        dim_ref = ref.CreateLinkReference(link_instance) if link_instance else ref
+        if isinstance(geom_obj, PlanarFace):
+            faces.append((dim_ref, geom_obj.Origin, geom_obj.FaceNormal, None))
+        else:
+            # Curved faces keep the face itself and project on demand
+            faces.append((dim_ref, None, None, geom_obj))
+
+    wall_face_cache[key] = faces
+    return faces
+
+def get_best_wall_face_ref(target_wall, link_instance, source_pt, doc_context):
+    """
+    Finds the face of the wall closest to source_pt.
+    Returns a Reference valid for Dimensioning (LinkRef if needed).
+    """
+    faces = get_wall_faces(target_wall, link_instance)
+    if not faces:
         return None
-        
-    all_refs = list(refs_ext) + list(refs_int)
-    if not all_refs:
-        return None
-        
-    best_ref = None
-    min_dist = float('inf')
-    
+
     # Transform Family Point to Local if needed
     check_pt = source_pt # Default Host
     if link_instance:
-        transform = link_instance.GetTransform()
-        check_pt = transform.Inverse.OfPoint(source_pt)
-    
-    for ref in all_refs:
-        # Get Geometry 
-        # Note: If Link, we assume GetGeometryObject works on the Local Link Doc 
-        # using the Local Ref.
-        geom_obj = None
-        try:
-             # If target_wall is in Link, we must use LinkDoc
-             if link_instance:
-                  geom_obj = target_wall.Document.GetElement(target_wall.Id).GetGeometryObjectFromReference(ref)
-             else:
-                  geom_obj = target_wall.GetGeometryObjectFromReference(ref)
-        except:
-             pass
-             
-        if geom_obj and hasattr(geom_obj, "Project"):
-             res = geom_obj.Project(check_pt)
-             if res:
-                  if res.Distance < min_dist:
-                       min_dist = res.Distance
-                       best_ref = ref
-    
+        check_pt = get_link_transforms(link_instance)[1].OfPoint(source_pt)
+
+    best_ref = None
+    min_dist = float('inf')
+    for dim_ref, origin, normal, face in faces:
+        dist = None
+        if origin is not None:
+            # Distance to the face plane
+            dist = abs((check_pt - origin).DotProduct(normal))
+        elif face is not None and hasattr(face, "Project"):
+            res = face.Project(check_pt)
+            if res:
+                dist = res.Distance
+        if dist is not None and dist < min_dist:
+            min_dist = dist
+            best_ref = dim_ref
+
     # Fallback
-    if not best_ref and all_refs:
-        best_ref = all_refs[0]
-        
-    if not best_ref:
-        return None
-        
-    # Create Link Reference if needed
+    return best_ref or faces[0][0]
+
+def project_to_wall(target_wall, link_instance, pt_fam):
+    """Projects the family point onto the wall location line. Returns a host point or None."""
+    w_curve = target_wall.Location.Curve
     if link_instance:
-        return best_ref.CreateLinkReference(link_instance)
+        # Local Wall
+        t_link, t_inv = get_link_transforms(link_instance)
+        res_inter = w_curve.Project(t_inv.OfPoint(pt_fam))
+        return t_link.OfPoint(res_inter.XYZPoint) if res_inter else None
+    # Host Wall
+    res_inter = w_curve.Project(pt_fam)
+    return res_inter.XYZPoint if res_inter else None
+
+def get_dimension_direction(target_wall, link_instance, pt_fam, res_pt):
+    """Wall normal in host coordinates, falling back to the family-to-wall vector."""
+    if target_wall and isinstance(target_wall.Location, LocationCurve):
+        curve = target_wall.Location.Curve
+        if isinstance(curve, Line):
+            wall_dir = curve.Direction
+            if link_instance:
+                wall_dir = get_link_transforms(link_instance)[0].OfVector(wall_dir)
+            return XYZ(-wall_dir.Y, wall_dir.X, 0)
+
+    vec_diff = (res_pt - pt_fam)
+    if not vec_diff.IsZeroLength():
+        return vec_diff.Normalize()
+    return XYZ.BasisX
+
+# Helper projector
+def project_to_line_infinite(pt, origin, direction):
+    vec = pt - origin
+    dist = vec.DotProduct(direction)
+    return origin.Add(direction.Multiply(dist))
+
+# ---------------------------------------------------------------------------
+# Dimension Line Index
+# ---------------------------------------------------------------------------
+# Tolerance for "Clicking on a dimension" 
+# 0.5 feet is generous but safer for "empty space" clicks. 
+# Maybe 0.2 feet (~60mm)?
+TOLERANCE_ALIGN = 0.5 
+
+def get_dimension_extent(dim):
+    """
+    Returns the flattened extent of a linear dimension as ((x0, y0), (x1, y1), direction),
+    or None for non-linear dimensions.
+    Dimension.Curve is unbound for linear dimensions, the extent comes from the segments.
+    """
+    c = dim.Curve
+    if not isinstance(c, Line):
+        return None
+    d_dir = c.Direction
+    flat_dir = XYZ(d_dir.X, d_dir.Y, 0)
+    if flat_dir.IsZeroLength():
+        return None
+    flat_dir = flat_dir.Normalize()
+
+    if dim.NumberOfSegments > 1:
+        segments = [(seg.Origin, seg.Value) for seg in dim.Segments]
     else:
-        return best_ref
+        segments = [(dim.Origin, dim.Value)]
+
+    # Parameters of the segment ends along the dimension direction
+    base = None
+    params = []
+    for origin, value in segments:
+        if origin is None or value is None:
+            continue
+        if base is None:
+            base = origin
+        t = (origin.X - base.X) * flat_dir.X + (origin.Y - base.Y) * flat_dir.Y
+        params.extend([t - value / 2.0, t + value / 2.0])
+    if not params:
+        return None
+
+    p0 = (base.X + flat_dir.X * min(params), base.Y + flat_dir.Y * min(params))
+    p1 = (base.X + flat_dir.X * max(params), base.Y + flat_dir.Y * max(params))
+    return p0, p1, flat_dir
+
+def add_dimension_to_index(index, dim):
+    try:
+        extent = get_dimension_extent(dim)
+    except Exception:
+        return
+    if extent:
+        p0, p1, flat_dir = extent
+        index.insert(id_value(dim.Id), p0, p1, (p0, flat_dir))
+
+# Built once per session, kept up to date with every dimension this tool creates.
+dim_index = SegmentGrid(cell_size=2.0)
+for d in FilteredElementCollector(doc, current_view.Id).OfClass(Dimension):
+    add_dimension_to_index(dim_index, d)
+
+# ---------------------------------------------------------------------------
+# Batch Mode
+# ---------------------------------------------------------------------------
+# Search radius for the nearest wall of a family (feet)
+MAX_WALL_DISTANCE = 10.0
+# Tolerance when matching a family elevation to a linked wall height (feet)
+TOLERANCE_LEVEL = 1.0
+
+def build_wall_index():
+    """
+    Wall location lines of the view in host coordinates: host walls visible in the view
+    and walls of the links visible in the view. Payload: (wall, link instance, z range or None).
+    """
+    wall_index = SegmentGrid(cell_size=5.0)
+
+    def add_wall(wall, link_instance, transform):
+        loc = wall.Location
+        if not isinstance(loc, LocationCurve):
+            return
+        curve = loc.Curve
+        p0 = curve.GetEndPoint(0)
+        p1 = curve.GetEndPoint(1)
+        z_range = None
+        if transform:
+            p0 = transform.OfPoint(p0)
+            p1 = transform.OfPoint(p1)
+            # Link walls are not filtered by the view, keep their height to skip other levels
+            bb = wall.get_BoundingBox(None)
+            if bb:
+                z_range = (transform.OfPoint(bb.Min).Z, transform.OfPoint(bb.Max).Z)
+        key = (id_value(link_instance.Id) if link_instance else None, id_value(wall.Id))
+        wall_index.insert(key, (p0.X, p0.Y), (p1.X, p1.Y), (wall, link_instance, z_range))
+
+    for wall in FilteredElementCollector(doc, current_view.Id).OfClass(Wall):
+        add_wall(wall, None, None)
+
+    for link_instance in FilteredElementCollector(doc, current_view.Id).OfClass(RevitLinkInstance):
+        link_doc = link_instance.GetLinkDocument()
+        if not link_doc:
+            continue
+        transform = get_link_transforms(link_instance)[0]
+        for wall in FilteredElementCollector(link_doc).OfClass(Wall).WhereElementIsNotElementType():
+            add_wall(wall, link_instance, transform)
+
+    return wall_index
+
+def dimension_family_to_nearest_wall(fam_inst, wall_index, offset):
+    """Creates one dimension from the family center to its nearest wall face. Returns None or a failure reason."""
+    loc = fam_inst.Location
+    if not hasattr(loc, 'Point'):
+        return "Family has no point."
+    pt_fam = loc.Point
+
+    ref1 = get_family_center_ref(fam_inst)
+    if not ref1:
+        return "No Center Ref."
+
+    def same_level(payload):
+        z_range = payload[2]
+        return z_range is None or z_range[0] - TOLERANCE_LEVEL <= pt_fam.Z <= z_range[1] + TOLERANCE_LEVEL
+
+    hit = wall_index.nearest(pt_fam.X, pt_fam.Y, MAX_WALL_DISTANCE, accept=same_level)
+    if not hit:
+        return "No wall within {:.1f} ft.".format(MAX_WALL_DISTANCE)
+    target_wall, link_inst, _ = hit[2]
+
+    ref2 = get_best_wall_face_ref(target_wall, link_inst, pt_fam, doc)
+    if not ref2:
+        return "No Valid Wall Face found."
+
+    res_pt = project_to_wall(target_wall, link_inst, pt_fam)
+    if not res_pt:
+        return "Could not project point."
+
+    # Shared offset: every dimension line runs along the wall normal, shifted along the wall by the same distance
+    view_z = current_view.GenLevel.Elevation if current_view.GenLevel else pt_fam.Z
+    dim_dir = get_dimension_direction(target_wall, link_inst, pt_fam, res_pt)
+    along_wall = XYZ(dim_dir.Y, -dim_dir.X, 0)
+    line_start = XYZ(pt_fam.X, pt_fam.Y, view_z).Add(along_wall.Multiply(offset))
+
+    ref_array = ReferenceArray()
+    ref_array.Append(ref1)
+    ref_array.Append(ref2)
+
+    st = SubTransaction(doc)
+    st.Start()
+    try:
+        dim = doc.Create.NewDimension(current_view, Line.CreateBound(line_start, line_start.Add(dim_dir)), ref_array)
+        st.Commit()
+    except Exception as e:
+        st.RollBack()
+        return "Failed: {}".format(e)
+    add_dimension_to_index(dim_index, dim)
+    return None
+
+def run_batch(families):
+    offset_cm = forms.ask_for_string(
+        default="30",
+        prompt="Offset of the dimension lines from the family centers (cm):",
+        title="Easy Dimensions - Batch ({} families)".format(len(families))
+    )
+    if offset_cm is None:
+        return
+    try:
+        offset = float(offset_cm) / 30.48  # cm -> feet
+    except ValueError:
+        forms.alert("Offset must be a number (cm).")
+        return
+
+    wall_index = build_wall_index()
+    failures = []
+    created = 0
+
+    t = Transaction(doc, "Auto Dimension Batch")
+    t.Start()
+    try:
+        for fam_inst in families:
+            reason = dimension_family_to_nearest_wall(fam_inst, wall_index, offset)
+            if reason:
+                failures.append([output.linkify(fam_inst.Id), fam_inst.Name, reason])
+            else:
+                created += 1
+        t.Commit()
+    except Exception:
+        t.RollBack()
+        raise
+
+    output.print_md("## Easy Dimensions - Batch")
+    output.print_md("Created **{}** dimensions, **{}** failed.".format(created, len(failures)))
+    if failures:
+        output.print_table(table_data=failures, columns=["Element", "Family", "Reason"])
+
+# Pre-selected family instances -> Batch Mode
+output = script.get_output()
+preselected = [doc.GetElement(el_id) for el_id in uidoc.Selection.GetElementIds()]
+batch_families = [el for el in preselected if isinstance(el, FamilyInstance)]
+if batch_families:
+    run_batch(batch_families)
+    script.exit()
 
 # ---------------------------------------------------------------------------
 # Processing Loop
@@ -212,22 +481,7 @@ while True:
 
         # Geometry Calculation
         # Project Family Point to Wall to find roughly perpendicular endpoint
-        res_pt = None # Placeholder
-        if link_inst:
-             # Local Wall
-             t_inv = link_inst.GetTransform().Inverse
-             pt_fam_local = t_inv.OfPoint(pt_fam)
-             w_curve = target_wall.Location.Curve
-             res_inter = w_curve.Project(pt_fam_local)
-             if res_inter:
-                 res_pt_local = res_inter.XYZPoint
-                 res_pt = link_inst.GetTransform().OfPoint(res_pt_local)
-        else:
-             # Host Wall
-             w_curve = target_wall.Location.Curve
-             res_inter = w_curve.Project(pt_fam)
-             if res_inter:
-                 res_pt = res_inter.XYZPoint
+        res_pt = project_to_wall(target_wall, link_inst, pt_fam)
         
         if not res_pt:
              print("Could not project point.")
@@ -244,25 +498,10 @@ while True:
              continue # Restart loop
              
         # Check for Alignment
-        # Strategy: Find all Dimensions in View. Check distance from place_pt to their line.
+        # Strategy: Nearest dimension segment to place_pt from the dimension index.
         
         dim_line = None
         alignment_found = False
-        
-        # Performance: Maybe limit collector?
-        # But Dimensions in view usually aren't that many.
-        visible_dims = FilteredElementCollector(doc, current_view.Id).OfClass(Dimension).ToElements()
-        
-        # Tolerance for "Clicking on a dimension" 
-        # 0.5 feet is generous but safer for "empty space" clicks. 
-        # Maybe 0.2 feet (~60mm)?
-        TOLERANCE_ALIGN = 0.5 
-        
-        # Helper projector
-        def project_to_line_infinite(pt, origin, direction):
-            vec = pt - origin
-            dist = vec.DotProduct(direction)
-            return origin.Add(direction.Multiply(dist))
 
         # Flatten Place Point for Check
         view_z = pt_fam.Z
@@ -270,41 +509,12 @@ while True:
              view_z = current_view.GenLevel.Elevation
         place_pt_check = XYZ(place_pt.X, place_pt.Y, view_z)
 
-        best_dist = float('inf')
         best_dim_curve = None
-        
-        for d in visible_dims:
-             # Check if linear
-             try:
-                 c = d.Curve
-                 if isinstance(c, Line):
-                      # Check distance to infinite line
-                      # Dist = |(P - Origin) x Dir| / |Dir| (Dir is unit)
-                      # or just project and measure
-                      
-                      # Flatten Dim Line
-                      d_orig = c.Origin
-                      d_dir = c.Direction
-                      
-                      flat_orig = XYZ(d_orig.X, d_orig.Y, view_z)
-                      flat_dir = XYZ(d_dir.X, d_dir.Y, 0)
-                      if flat_dir.IsZeroLength(): continue
-                      flat_dir = flat_dir.Normalize()
-                      
-                      proj = project_to_line_infinite(place_pt_check, flat_orig, flat_dir)
-                      dist = place_pt_check.DistanceTo(proj)
-                      
-                      # Also check if "along" the segment? 
-                      # User says "pick existing dimension". 
-                      # Usually means clicking near it. 
-                      # We won't restrict to the finite segment length to allow extending alignment.
-                      
-                      if dist < TOLERANCE_ALIGN and dist < best_dist:
-                           best_dist = dist
-                           best_dim_curve = (flat_orig, flat_dir)
-                           alignment_found = True
-             except:
-                 pass
+        hit = dim_index.nearest(place_pt.X, place_pt.Y, TOLERANCE_ALIGN)
+        if hit:
+             (orig_x, orig_y), flat_dir = hit[2]
+             best_dim_curve = (XYZ(orig_x, orig_y, view_z), flat_dir)
+             alignment_found = True
         
         if alignment_found and best_dim_curve:
              # Align!
@@ -325,19 +535,7 @@ while True:
              # Use place_pt_check which is already flattened
              
             # Determine Direction (Wall Normal)
-            dim_dir = None
-            if target_wall and isinstance(target_wall.Location, LocationCurve):
-                 curve = target_wall.Location.Curve
-                 if isinstance(curve, Line):
-                      wall_dir = curve.Direction
-                      dim_dir = XYZ(-wall_dir.Y, wall_dir.X, 0)
-            
-            if not dim_dir:
-                 vec_diff = (res_pt - pt_fam)
-                 if not vec_diff.IsZeroLength():
-                      dim_dir = vec_diff.Normalize()
-            if not dim_dir:
-                 dim_dir = XYZ.BasisX
+            dim_dir = get_dimension_direction(target_wall, link_inst, pt_fam, res_pt)
                  
             dim_line_end = place_pt_check.Add(dim_dir)
             dim_line = Line.CreateBound(place_pt_check, dim_line_end)
@@ -353,6 +551,7 @@ while True:
         try:
             dim = doc.Create.NewDimension(current_view, dim_line, ref_array)
             t.Commit()
+            add_dimension_to_index(dim_index, dim)
         except Exception as e:
             t.RollBack()
             # print("Failed to create dimension: {}".format(e))
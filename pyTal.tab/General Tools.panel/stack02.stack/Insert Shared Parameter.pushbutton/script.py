@@ -1,35 +1,47 @@
 """Insert Shared Parameter"""
 # -*- coding: utf-8 -*-
 __title__   = "Insert\nShared Parameter"
-__doc__     = """Version = 1.0
-Date    = 10.11.2024
+__doc__     = """Version = 1.3
+Date    = 16.10.2026
 ________________________________________________________________
 Description:
-Insert Shared Parameter to families in folder. 
+Insert Shared Parameters to families in folder. 
+Each family is opened once for all the chosen parameters. A family that
+fails is reported and the others go on. An interrupted batch resumes from
+where it stopped. Unchanged families that already have the parameters (from
+earlier runs) are not opened, and families are only saved when changed.
 ________________________________________________________________
 How-To:
-1. Choose shared parameter.
+1. Choose shared parameters (one or more).
 2. Select folder containing families.
 3. select families to update.
 4. Select parameter group.
 5. Choose between 'type' and 'instance' for the parameter.
+6. If the last batch with the same choices was interrupted, choose to resume it.
+7. Shift+Click to open every family, even unchanged ones that already have the parameters.
 ________________________________________________________________
 TODO:
 ________________________________________________________________
 Last Updates:
+- [16.10.2026] v1.3 Shared parameters are picked and resolved by GUID (cached shared parameter file index).
+- [16.10.2026] v1.2 Family parameter index - unchanged families are not opened again, no save without changes.
+- [16.10.2026] v1.1 Several parameters per family, progress bar with cancel, per-family errors,
+                    resume from checkpoint.
 - [01.10.2024] v1.0 Change Description
 ________________________________________________________________
 Author: Arbel Tal"""
 
 from pyrevit import revit, forms, script
 from Autodesk.Revit.DB import FilteredElementCollector, BuiltInParameterGroup, SharedParameterElement, FamilyManager, \
-    Transaction, IFamilyLoadOptions
+    IFamilyLoadOptions
 """
 from Autodesk.Revit.ApplicationServices import Application
 from System.Collections.Generic import List
 import clr
 """
 import os
+from pytal_params import shared_parameter_index
+from pytal_family_params import Checkpoint, FamilyIndex, run_batch, ADDED, FAILED
 
 
 # Custom FamilyLoadOptions to always overwrite the family
@@ -53,17 +65,34 @@ if not app.SharedParametersFilename:
     forms.alert("No shared parameter file is loaded. Please load a shared parameter file and run the script again.",
                 exitscript=True)
 
-# Load the shared parameter file
+# Load the shared parameter file, and its parsed index (kept until the file changes)
 shared_param_file = app.OpenSharedParameterFile()
+try:
+    shared_param_index = shared_parameter_index(app.SharedParametersFilename)
+except (IOError, OSError) as e:
+    forms.alert("Could not read the shared parameter file:\n{}".format(e), exitscript=True)
 
 
-# Function to collect all shared parameters in the document
+# Function to collect all shared parameters in the document: picker label -> GUID
 def get_shared_parameters():
-    shared_params = []
-    collector = FilteredElementCollector(doc).OfClass(SharedParameterElement)
-    for param in collector:
-        shared_params.append(param.GetDefinition().Name)
-    return shared_params
+    names_by_guid = {}
+    for param in FilteredElementCollector(doc).OfClass(SharedParameterElement):
+        names_by_guid[str(param.GuidValue).lower()] = param.Name
+
+    # Names used by more than one parameter get their group in the shared parameter file (or GUID)
+    name_counts = {}
+    for name in names_by_guid.values():
+        name_counts[name] = name_counts.get(name, 0) + 1
+    labels = {}
+    for guid, name in names_by_guid.items():
+        label = name
+        if name_counts[name] > 1:
+            entry = shared_param_index.get(guid)
+            label = "{} [{}]".format(name, entry.group if entry else "not in shared parameter file")
+            if label in labels:
+                label = "{} {}".format(label, guid)
+        labels[label] = guid
+    return labels
 
 
 # Function to get a dictionary of human-readable parameter group names
@@ -82,26 +111,21 @@ def get_parameter_groups():
     return param_groups
 
 
-# Prompt user to select a shared parameter
+# Prompt user to select shared parameters
 shared_parameters = get_shared_parameters()
-selected_param_name = forms.SelectFromList.show(
-    shared_parameters, title="Select a Shared Parameter", multiselect=False
+selected_param_names = forms.SelectFromList.show(
+    sorted(shared_parameters), title="Select Shared Parameters", multiselect=True
 )
 
-if selected_param_name:
-    # Find the corresponding ExternalDefinition in the shared parameter file
-    selected_definition = None
-    for group in shared_param_file.Groups:
-        for external_def in group.Definitions:
-            if external_def.Name == selected_param_name:
-                selected_definition = external_def
-                break
-        if selected_definition:
-            break
-
-    if not selected_definition:
-        forms.alert("Shared parameter '{}' not found in the shared parameter file.".format(selected_param_name),
+if selected_param_names:
+    # Find the corresponding ExternalDefinitions in the shared parameter file, by GUID
+    definitions = [(name, shared_param_index.definition(shared_param_file, shared_parameters[name]))
+                   for name in selected_param_names]
+    missing_names = [name for name, definition in definitions if definition is None]
+    if missing_names:
+        forms.alert("Shared parameters not found in the shared parameter file:\n{}".format("\n".join(missing_names)),
                     exitscript=True)
+    selected_definitions = [definition for _, definition in definitions]
 
     # Prompt user to select folder containing family files
     family_folder = forms.pick_folder(title="Select Folder Containing Families")
@@ -109,7 +133,7 @@ if selected_param_name:
         forms.alert("No folder selected. Script will exit.", exitscript=True)
 
     # Get all family files (.rfa) in the selected folder
-    all_family_files = [f for f in os.listdir(family_folder) if f.endswith(".rfa")]
+    all_family_files = sorted(f for f in os.listdir(family_folder) if f.lower().endswith(".rfa"))
 
     # Ask user to select specific families from the folder
     selected_family_files = forms.SelectFromList.show(
@@ -135,38 +159,47 @@ if selected_param_name:
                 (key for key, value in param_groups.items() if value == selected_group_name), None
             )
 
-            # Iterate through selected family files and add shared parameter if not present
-            for family_file in selected_family_files:
-                family_path = os.path.join(family_folder, family_file)
-
-                try:
-                    # Open the family file
-                    family_doc = app.OpenDocumentFile(family_path)
-                    family_manager = family_doc.FamilyManager
-
-                    # Check if the parameter already exists
-                    param_exists = any(
-                        param.Definition.Name == selected_param_name for param in family_manager.Parameters)
-
-                    if not param_exists:
-                        # Start transaction within the family document to add the parameter
-                        with Transaction(family_doc, 'Add Shared Parameter to Family') as t:
-                            t.Start()
-                            family_manager.AddParameter(
-                                selected_definition, selected_group, is_instance
-                                # Set True for instance-based, False for type-based
-                            )
-                            t.Commit()
-                        print("Added parameter '{}' to family '{}'.".format(selected_param_name, family_file))
-                    else:
-                        print("Parameter '{}' already exists in family '{}'. Skipping.".format(selected_param_name,
-                                                                                               family_file))
-
-                    # Save and close the family document
-                    family_doc.Save()
-                    family_doc.Close(False)
-
-                except InvalidOperationException as e:
-                    print("Error processing family '{}': {}".format(family_file, e))
-
-            print("Processing complete for selected families.")
+            family_paths = [os.path.join(family_folder, f) for f in selected_family_files]
+
+            # Resume an interrupted batch with the same parameters / group / instance-type choice
+            checkpoint = Checkpoint(family_folder, selected_definitions, selected_group, is_instance)
+            done_before = len([p for p in family_paths if checkpoint.is_done(p)])
+            if done_before:
+                resume = forms.CommandSwitchWindow.show(
+                    ["Resume", "Start Over"],
+                    message="{} of {} families were processed by an interrupted run.".format(done_before,
+                                                                                         len(family_paths)))
+                if not resume:
+                    script.exit()
+                if resume == "Start Over":
+                    checkpoint.clear()
+
+            # Parameters of the families seen by earlier runs (Shift+Click opens every family)
+            family_index = None if __shiftclick__ else FamilyIndex(family_folder)
+
+            def on_done(result, done, total):
+                if result.status == ADDED:
+                    print("Added {} to family '{}'.".format(", ".join(result.added), result.name))
+                elif result.status == FAILED:
+                    print("Error processing family '{}': {}".format(result.name, result.message))
+                pb.update_progress(done, total)
+
+            with forms.ProgressBar(title="Adding parameters... ({value}/{max_value})", cancellable=True) as pb:
+                results = run_batch(app, family_paths, selected_definitions, selected_group, is_instance,
+                                    checkpoint, family_index, on_done=on_done,
+                                    is_cancelled=lambda: pb.cancelled)
+
+            # Summary
+            added = [r for r in results if r.status == ADDED]
+            failed = [r for r in results if r.status == FAILED]
+            if len(results) < len(family_paths):
+                print("Cancelled after {} of {} families - run again to resume.".format(len(results),
+                                                                                      len(family_paths)))
+            else:
+                checkpoint.clear()
+                print("Processing complete for selected families.")
+            print("Added to {} families, {} already had the parameters, {} failed.".format(
+                len(added), len(results) - len(added) - len(failed), len(failed)))
+            if failed:
+                script.get_output().print_table(table_data=[[r.name, r.message] for r in failed],
+                                                columns=["Family", "Error"])
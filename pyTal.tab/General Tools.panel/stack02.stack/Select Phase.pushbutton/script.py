@@ -1,24 +1,37 @@
 """Select elements in phase"""
 # -*- coding: utf-8 -*-
 __title__   = "Select elements\nin phase"
-__doc__     = """Version = 1.0
-Date    = 10.11.2024
+__doc__     = """Version = 1.1
+Date    = 16.10.2026
 ________________________________________________________________
 Description:
 Select elements in selected phase. 
+Optionally only elements demolished in a given phase (or not demolished).
+The filtering runs inside Revit (one collector for all the categories);
+when the element index is already built it is used instead.
+________________________________________________________________
+How-To:
+1. Select the phase created.
+2. Select the phase demolished (or Any / Not Demolished).
+3. Select one or more categories.
+4. Shift+Click to rebuild the element index and use it.
 ________________________________________________________________
 
 TODO:
 ________________________________________________________________
 Last Updates:
+- [16.10.2026] v1.1 Native category + phase parameter filters, phase demolished, no transaction
 - [01.10.2024] v1.0 Select elements in selected phase
 ________________________________________________________________
 Author: Arbel Tal"""
 
-from pyrevit import revit, forms
-from Autodesk.Revit.DB import FilteredElementCollector, Phase, BuiltInParameter, BuiltInCategory, CategoryType, ElementId
-from System.Collections.Generic import List
-import System
+from pyrevit import forms
+from Autodesk.Revit.DB import FilteredElementCollector, Phase, CategoryType
+from pytal_index import get_index, has_index
+from pytal_phases import phase_element_ids, ANY, NOT_DEMOLISHED
+
+ANY_NAME = "<Any>"
+NOT_DEMOLISHED_NAME = "<Not Demolished>"
 
 # Initialize document
 uidoc = __revit__.ActiveUIDocument
@@ -40,6 +53,22 @@ if selected_phase_name:
     # Find the selected phase object
     selected_phase = next((phase for phase in phases if phase.Name == selected_phase_name), None)
 
+    # Prompt user for the phase demolished
+    demolished_options = [ANY_NAME, NOT_DEMOLISHED_NAME] + phase_names
+    selected_demolished_name = forms.SelectFromList.show(
+        demolished_options,
+        title="Select Phase Demolished",
+        multiselect=False
+    )
+    if selected_demolished_name == ANY_NAME:
+        phase_demolished = ANY
+    elif selected_demolished_name == NOT_DEMOLISHED_NAME:
+        phase_demolished = NOT_DEMOLISHED
+    elif selected_demolished_name:
+        phase_demolished = next(phase.Id for phase in phases if phase.Name == selected_demolished_name)
+    else:
+        selected_phase = None
+
     if selected_phase:
         # Retrieve all model categories in the document
         all_categories = doc.Settings.Categories
@@ -60,33 +89,16 @@ if selected_phase_name:
                 cat for cat in model_categories if cat.Name in selected_category_names
             ]
 
-            # Collect all family instances in the selected categories
-            with revit.Transaction("Select Families by Phase and Category"):
-                phase_family_instances = []
-                for category in selected_categories:
-                    try:
-                        # Convert the category Id to BuiltInCategory
-                        bic = System.Enum.ToObject(BuiltInCategory, category.Id.IntegerValue)
-
-                        # Collect elements in the current category
-                        family_instances = FilteredElementCollector(doc) \
-                            .OfCategory(bic) \
-                            .WhereElementIsNotElementType() \
-                            .ToElements()
-
-                        # Filter instances by the selected phase
-                        phase_family_instances.extend([
-                            instance for instance in family_instances
-                            if instance.get_Parameter(BuiltInParameter.PHASE_CREATED) and
-                               instance.get_Parameter(BuiltInParameter.PHASE_CREATED).AsElementId() == selected_phase.Id
-                        ])
-                    except Exception as e:
-                        # Print debug message for categories that cannot be processed
-                        print("Could not process category {0}. Error: {1}".format(category.Name, e))
+            # An already built element index answers from memory (kept up to date by the doc-changed hook);
+            # otherwise one collector filters categories and phases inside Revit. Shift+Click rebuilds the index.
+            index = None
+            if __shiftclick__ or has_index(doc):
+                index = get_index(doc, rebuild=__shiftclick__)
+            element_ids = phase_element_ids(doc, [category.Id for category in selected_categories],
+                                            selected_phase.Id, phase_demolished, index=index)
 
-                # Select the filtered family instances in the Revit UI
-                if phase_family_instances:
-                    element_ids = [family.Id for family in phase_family_instances]
-                    uidoc.Selection.SetElementIds(List[ElementId](element_ids))
-                else:
-                    print("No family instances found for the selected phase and categories.")
+            # Select the filtered elements in the Revit UI (a selection needs no transaction)
+            if element_ids:
+                uidoc.Selection.SetElementIds(element_ids)
+            else:
+                print("No family instances found for the selected phase and categories.")
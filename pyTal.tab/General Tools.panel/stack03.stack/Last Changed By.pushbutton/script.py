@@ -1,16 +1,22 @@
 # -*- coding: utf-8 -*-
 __title__   = "Last Change by"
-__doc__ = """Version = 1.5
-Date    = 17.12.2024
+__doc__ = """Version = 1.7
+Date    = 16.10.2026
 _____________________________________________________________________
 Description:
 Select all elements last changed by the selected user. 
-Assigns unique colors to users temporarily, shows them in the form, and resets graphics after selection.
+Assigns unique colors to users temporarily (one selection filter per user), shows them in the form,
+and removes the colors in one step after selection.
+Results are cached per model; later clicks only re-read elements that
+were added or changed since the cached version of the model.
 _____________________________________________________________________
 How-To:
 - Click the Button
+- Shift+Click to rebuild the cache from scratch
 _____________________________________________________________________
 Last update:
+- [16.10.2026] - V1.7: Color with temporary selection filters, rolled back after the form.
+- [16.10.2026] - V1.6: Cached per-element LastChangedBy, batched scan with progress bar.
 - [17.12.2024] - V1.5: Removed RGB values in the form display.
 _____________________________________________________________________
 Author: Arbel Tal"""
@@ -22,14 +28,19 @@ Author: Arbel Tal"""
 #====================================================================================================
 
 from Autodesk.Revit.DB import *
-from pyrevit import forms
+from Autodesk.Revit.Exceptions import ArgumentException, InvalidOperationException
+from pyrevit import forms, script
 
 import clr
 clr.AddReference('System')
 from System.Collections.Generic import List
 from collections import defaultdict
 
+from pytal_index import get_index, id_value, to_element_id, INVALID_ID
+from pytal_cache import load_cache, save_cache, document_version, changed_since
+
 import random
+import re
 
 # ╦  ╦╔═╗╦═╗╦╔═╗╔╗ ╦  ╔═╗╔═╗
 # ╚╗╔╝╠═╣╠╦╝║╠═╣╠╩╗║  ║╣ ╚═╗
@@ -40,26 +51,122 @@ uidoc = __revit__.ActiveUIDocument
 doc = __revit__.ActiveUIDocument.Document
 active_view = doc.ActiveView
 
+CACHE_NAME = "LastChangedBy"
+BATCH_SIZE = 1000  # elements per progress bar update
+
+# ╔═╗╦ ╦╔╗╔╔═╗╔╦╗╦╔═╗╔╗╔╔═╗
+# ╠╣ ║ ║║║║║   ║ ║║ ║║║║╚═╗
+# ╚  ╚═╝╝╚╝╚═╝ ╩ ╩╚═╝╝╚╝╚═╝ FUNCTIONS
+#====================================================================================================
+
+def scan_last_changed_by(element_ids, last_user_by_id):
+    """Read LastChangedBy for element_ids (ints) into last_user_by_id, in batches with a progress bar.
+    Returns the number of elements Revit could not report on, or None if the user cancelled."""
+    element_ids = list(element_ids)
+    total = len(element_ids)
+    failed = 0
+    with forms.ProgressBar(title='Reading Last Changed By... ({value}/{max_value})', cancellable=True) as pb:
+        for start in range(0, total, BATCH_SIZE):
+            if pb.cancelled:
+                return None
+            for el_id in element_ids[start:start + BATCH_SIZE]:
+                try:
+                    last = WorksharingUtils.GetWorksharingTooltipInfo(doc, to_element_id(el_id)).LastChangedBy
+                except ArgumentException:
+                    # Element is not tracked by worksharing - remember it so it is not asked again
+                    last = None
+                    failed += 1
+                last_user_by_id[el_id] = last.strip() if last else ""
+            pb.update_progress(min(start + BATCH_SIZE, total), total)
+    return failed
+
+
+def user_override(color):
+    override_settings = OverrideGraphicSettings()
+    override_settings.SetProjectionLineColor(color)
+    override_settings.SetSurfaceForegroundPatternColor(color)
+    return override_settings
+
+
+def filter_name(user):
+    """Unique, Revit-safe name for the temporary selection filter of user."""
+    base = "pyTal Last Changed By - " + re.sub(r'[\\:{}\[\]|;<>?`~]', "_", user)
+    name, i = base, 1
+    while not FilterElement.IsNameUnique(doc, name):
+        i += 1
+        name = "{} ({})".format(base, i)
+    return name
+
+
+def color_by_filters(view, ids_by_user, colors):
+    """Color with one selection filter per user (O(users) writes).
+    Returns False when the view does not accept filters (e.g. filters controlled by a view template)."""
+    st = SubTransaction(doc)
+    st.Start()
+    try:
+        for user, user_ids in ids_by_user.items():
+            selection_filter = SelectionFilterElement.Create(doc, filter_name(user))
+            selection_filter.SetElementIds(List[ElementId](user_ids))
+            view.AddFilter(selection_filter.Id)
+            view.SetFilterOverrides(selection_filter.Id, user_override(colors[user]))
+    except (ArgumentException, InvalidOperationException):
+        st.RollBack()
+        return False
+    st.Commit()
+    return True
+
+
+def color_visible_elements(view, ids_by_user, colors):
+    """Fallback: per-element overrides, limited to elements visible in view."""
+    visible_ids = set(id_value(i) for i in FilteredElementCollector(doc, view.Id).ToElementIds())
+    for user, user_ids in ids_by_user.items():
+        override_settings = user_override(colors[user])
+        for el_id in user_ids:
+            if id_value(el_id) in visible_ids:
+                view.SetElementOverrides(el_id, override_settings)
+
 # ╔╦╗╔═╗╦╔╗╔
 # ║║║╠═╣║║║║
 # ╩ ╩╩ ╩╩╝╚╝ MAIN
 #====================================================================================================
 
-# 1 Get All Elements
-elements = FilteredElementCollector(doc).WhereElementIsNotElementType() \
-           .WhereElementIsViewIndependent() \
-           .ToElements()
-
-# 2 Sort Elements by User LastChangedBy
+if not doc.IsWorkshared:
+    forms.alert("Model is not workshared.", exitscript=True)
+
+# 1 Get All View Independent Elements (Shift+Click rebuilds the cached element index)
+current_ids = get_index(doc, rebuild=__shiftclick__).ids(view=INVALID_ID)
+
+# 2 LastChangedBy per Element: cached per model, refreshed for new / changed elements only
+cache = {} if __shiftclick__ else load_cache(doc, CACHE_NAME)
+last_user_by_id = cache.get("users", {})
+changes = changed_since(doc, cache.get("version"))
+if changes is None:
+    # No usable cache (first run, older Revit or unknown version) - read everything
+    last_user_by_id = {}
+    ids_to_scan = current_ids
+else:
+    changed, deleted = changes
+    for el_id in deleted:
+        last_user_by_id.pop(el_id, None)
+    ids_to_scan = (current_ids - set(last_user_by_id)) | (changed & current_ids)
+
+version = document_version(doc)
+failed = scan_last_changed_by(ids_to_scan, last_user_by_id)
+if failed is None:
+    script.exit()
+if failed:
+    print("{} elements have no worksharing information and were skipped.".format(failed))
+if len(last_user_by_id) != len(current_ids):
+    # Drop ids that left the model without being reported as deleted
+    last_user_by_id = dict((i, last_user_by_id[i]) for i in current_ids if i in last_user_by_id)
+save_cache(doc, CACHE_NAME, {"version": version, "users": last_user_by_id})
+
+# Sort Elements by User LastChangedBy (empty usernames are ignored)
 elements_sorted_by_last_user = defaultdict(list)
-for el in elements:
-    try:
-        wti = WorksharingUtils.GetWorksharingTooltipInfo(doc, el.Id)
-        last = wti.LastChangedBy
-        if last and last.strip():  # Ignore empty or whitespace-only usernames
-            elements_sorted_by_last_user[last].append(el.Id)
-    except:
-        pass
+for el_id in current_ids:
+    last = last_user_by_id.get(el_id)
+    if last:
+        elements_sorted_by_last_user[last].append(to_element_id(el_id))
 
 # 3 Assign Unique Colors to Users
 def generate_random_color():
@@ -67,43 +174,25 @@ def generate_random_color():
 
 user_colors = {user: generate_random_color() for user in elements_sorted_by_last_user.keys()}
 
-# 4 Apply Temporary Color to Elements in a Transaction
-override_settings = OverrideGraphicSettings()
-
+# 4 Apply Temporary Colors - the transaction stays open while the form is shown and is rolled back
+#   afterwards, so the colors disappear in one step and nothing is left in the undo list
 t = Transaction(doc, "Assign User Colors")
 t.Start()
 try:
-    for user, element_ids in elements_sorted_by_last_user.items():
-        color = user_colors[user]
-        override_settings.SetProjectionLineColor(color)
-        override_settings.SetSurfaceForegroundPatternColor(color)
-        for el_id in element_ids:
-            active_view.SetElementOverrides(el_id, override_settings)
-finally:
-    t.Commit()
-
-# 5 Show Form with Users
-user_display = ["{0}".format(user) for user in elements_sorted_by_last_user.keys()]
-
-selected_user_display = forms.SelectFromList.show(user_display, button_name='Select User')
+    if not color_by_filters(active_view, elements_sorted_by_last_user, user_colors):
+        color_visible_elements(active_view, elements_sorted_by_last_user, user_colors)
+    doc.Regenerate()
+    uidoc.RefreshActiveView()
 
-# 6 Reset All Graphics and Keep Selected User's Elements Selected
-reset_override = OverrideGraphicSettings()
+    # 5 Show Form with Users
+    user_display = ["{0}".format(user) for user in elements_sorted_by_last_user.keys()]
 
-t = Transaction(doc, "Reset Graphics and Keep Selection")
-t.Start()
-try:
-    # Reset all graphics
-    for el in elements:
-        active_view.SetElementOverrides(el.Id, reset_override)
-
-    if selected_user_display:
-        # Extract the selected user and highlight elements
-        selected_user = selected_user_display
-        selected_element_ids = elements_sorted_by_last_user[selected_user]
-
-        # Keep selected user's elements selected (without graphic overrides)
-        List_new_selection = List[ElementId](selected_element_ids)
-        uidoc.Selection.SetElementIds(List_new_selection)
+    selected_user_display = forms.SelectFromList.show(user_display, button_name='Select User')
 finally:
-    t.Commit()
+    # 6 Reset All Graphics
+    t.RollBack()
+
+# 7 Keep Selected User's Elements Selected (without graphic overrides)
+if selected_user_display:
+    selected_element_ids = elements_sorted_by_last_user[selected_user_display]
+    uidoc.Selection.SetElementIds(List[ElementId](selected_element_ids))
@@ -5,6 +5,7 @@ import sys
 import codecs
 
 from pyrevit import revit, DB, script, forms
+from pytal_index import get_index, to_element_id
 
 # Get the directory of the current script
 script_dir = os.path.dirname(__file__)
@@ -93,6 +94,8 @@ def main():
     
     # 3. Collect Elements to Move
     category_map = get_category_map(doc)
+    # Shift+Click rebuilds the cached element index
+    index = get_index(doc, rebuild=__shiftclick__)
     
     elements_to_move = [] # List of tuples (Element, WorksetId, CategoryName, WorksetName)
     
@@ -110,10 +113,12 @@ def main():
             print("Warning: Workset '{}' not found (creation failed?).".format(ws_name))
             continue
             
-        # Collect elements for this category
-        collector = DB.FilteredElementCollector(doc).OfCategoryId(cat_id).WhereElementIsNotElementType()
-        for elem in collector.ToElements():
-            elements_to_move.append((elem, ws_id, cat_name, ws_name))
+        # Collect elements for this category that are not on the target workset yet
+        ids_to_move = index.ids(category=cat_id) - index.ids(workset=ws_id)
+        for elem_id in ids_to_move:
+            elem = doc.GetElement(to_element_id(elem_id))
+            if elem:
+                elements_to_move.append((elem, ws_id, cat_name, ws_name))
 
     if not elements_to_move:
         output.print_md("## No elements found to move.")